@@ -0,0 +1,77 @@
+"""
+Gunicorn deployment profile.
+
+Picked up automatically when gunicorn starts from the project root. The app is
+imported once in the master (preload_app) and shared copy-on-write with the
+workers; each worker then warms itself up (DB connections, URL resolver,
+catalog) before it accepts traffic. Boot and warmup times are logged so cold
+start can be tracked from the deploy logs.
+
+Bind address and worker count follow gunicorn's defaults ($PORT and
+$WEB_CONCURRENCY). More than one worker needs a cache shared between processes
+(REDIS_URL, or CACHE_DIR on a single host); gunicorn refuses to start on the
+per-process fallback.
+"""
+import os
+import time
+
+_BOOT_STARTED = time.perf_counter()
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True') == 'True'
+
+# Recycle workers periodically to bound memory growth; the jitter keeps them
+# from all restarting (and re-warming) at the same moment.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', '200'))
+
+# gunicorn's single thread unless GUNICORN_THREADS is set: more than one turns sync
+# workers into gthread workers, whose heartbeat keeps running while a thread
+# streams a long response (e.g. a CSV export).
+if os.environ.get('GUNICORN_THREADS'):
+    threads = int(os.environ['GUNICORN_THREADS'])
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '5'))
+
+
+def on_starting(server):
+    # The version counters in store/cache.py must be the same in every worker
+    if server.cfg.workers > 1:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'vibe_ecommerce.settings')
+        from django.conf import settings
+
+        if settings.CACHES['default']['BACKEND'].endswith('LocMemCache'):
+            raise RuntimeError(
+                f'{server.cfg.workers} workers would each keep their own cache and serve stale data; '
+                'set REDIS_URL (or CACHE_DIR on a single host) or run one worker'
+            )
+
+
+def when_ready(server):
+    if preload_app:
+        # Imports and URL compilation happen once here and are inherited by every worker
+        from store.warmup import warm_up
+
+        timings = warm_up(connect=False, prime=False)
+        server.log.info('Master warmup: %s', timings)
+    server.log.info('Master ready in %.1f ms', (time.perf_counter() - _BOOT_STARTED) * 1000)
+
+
+def post_fork(server, worker):
+    worker._boot_started = time.perf_counter()
+    if preload_app:
+        # Never share a database socket opened in the master with the workers
+        from django.db import connections
+
+        connections.close_all()
+
+
+def post_worker_init(worker):
+    from store.warmup import warm_up
+
+    timings = warm_up()
+    worker.log.info(
+        'Worker %s warm in %.1f ms: %s',
+        worker.pid, (time.perf_counter() - worker._boot_started) * 1000, timings,
+    )
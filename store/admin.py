@@ -1,10 +1,116 @@
 from django import forms
+from django.conf import settings
 from django.contrib import admin
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import F, Sum
+from django.utils import timezone
 
-from .models import Cart, CartItem, Category, Order, OrderItem, Product
+from . import exports, shards
+from .models import (
+    Cart, CartItem, Category, ChangeLogEntry, LowStockAlert, Order, OrderItem, Product, Promotion, StockMovement,
+    WebhookDelivery, WebhookSubscription,
+)
+from .paginators import EstimatedCountPaginator
 
 # Register your models here.
 
+class ShardFilter(admin.SimpleListFilter):
+    """Which order shard to list (see store/shards.py), with its row count."""
+    title = 'shard'
+    parameter_name = 'shard'
+
+    def lookups(self, request, model_admin):
+        model = model_admin.model
+        # Counted in parallel, estimated on large tables like the changelist itself
+        counts = shards.fan_out(lambda alias: EstimatedCountPaginator(model._default_manager.using(alias), 1).count)
+        return [(alias, f'{alias} ({count})') for alias, count in zip(settings.ORDER_SHARDS, counts)]
+
+    def choices(self, changelist):
+        # No "All": a changelist lists one shard, default when none is picked
+        for alias, title in self.lookup_choices:
+            yield {
+                'selected': (self.value() or DEFAULT_DB_ALIAS) == alias,
+                'query_string': changelist.get_query_string({self.parameter_name: alias}),
+                'display': title,
+            }
+
+    def queryset(self, request, queryset):
+        # ShardedAdmin.get_queryset() already reads from the selected shard
+        return queryset
+
+def _on_shard(model, path):
+    """Whether the lookup ``path`` from ``model`` stays on the sharded models (so on one shard)."""
+    for name in path.split('__')[:-1]:
+        model = model._meta.get_field(name).related_model
+        if model._meta.label_lower not in shards.SHARDED:
+            return False
+    return True
+
+class ShardedAdmin(admin.ModelAdmin):
+    """
+    Admin for a sharded model: the changelist shows one shard at a time (default
+    unless ?shard= picks another), and an object is read from the shard its id
+    belongs to. On other shards than default, relations to default are
+    prefetched instead of joined, and list filters and search fields that would
+    need such a join are left out.
+    """
+
+    def shard(self, request):
+        if getattr(request, '_order_shard', None):
+            return request._order_shard
+        alias = request.GET.get(ShardFilter.parameter_name)
+        return alias if alias in settings.ORDER_SHARDS else DEFAULT_DB_ALIAS
+
+    def get_queryset(self, request):
+        alias = self.shard(request)
+        queryset = super().get_queryset(request).using(alias)
+        if alias != DEFAULT_DB_ALIAS:
+            queryset = queryset.prefetch_related(*(
+                path for path in self.list_select_related if not _on_shard(self.model, f'{path}__id')
+            ))
+        return queryset
+
+    def get_object(self, request, object_id, from_field=None):
+        try:
+            request._order_shard = shards.for_pk(int(object_id))
+        except (ValueError, IndexError):
+            return None
+        return super().get_object(request, object_id, from_field)
+
+    def get_list_select_related(self, request):
+        if self.shard(request) == DEFAULT_DB_ALIAS:
+            return self.list_select_related
+        # Only the part of each path on the shard, e.g. order for order__user
+        local = set()
+        for path in self.list_select_related:
+            names = path.split('__')
+            while names and not _on_shard(self.model, '__'.join(names + ['id'])):
+                names.pop()
+            if names:
+                local.add('__'.join(names))
+        return sorted(local)
+
+    def get_list_filter(self, request):
+        list_filter = [
+            spec for spec in super().get_list_filter(request)
+            if self.shard(request) == DEFAULT_DB_ALIAS or not isinstance(spec, str) or _on_shard(self.model, spec)
+        ]
+        return [ShardFilter, *list_filter] if shards.enabled() else list_filter
+
+    def get_search_fields(self, request):
+        if self.shard(request) == DEFAULT_DB_ALIAS:
+            return self.search_fields
+        return [field for field in self.search_fields if _on_shard(self.model, field)]
+
+@admin.action(description='Export selected orders as CSV')
+def export_orders_csv(modeladmin, request, queryset):
+    # The export loads users itself; drop the changelist's prefetches
+    return exports.csv_response(exports.export_orders(queryset.prefetch_related(None)), 'orders.csv')
+
+@admin.action(description='Export selected order items as CSV')
+def export_order_items_csv(modeladmin, request, queryset):
+    return exports.csv_response(exports.export_order_items(queryset.prefetch_related(None)), 'order-items.csv')
+
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
     list_display = ['name', 'description', 'created_at']
@@ -18,7 +124,10 @@ class ProductAdmin(admin.ModelAdmin):
     list_filter = ['category', 'is_active', 'created_at']
     search_fields = ['name', 'description', 'sku']
     list_editable = ['price', 'stock_quantity', 'is_active']
+    list_select_related = ['category']
     ordering = ['-created_at']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     readonly_fields = ['created_at', 'updated_at']
     
     fieldsets = (
@@ -39,20 +148,32 @@ class ProductAdmin(admin.ModelAdmin):
     )
 
 @admin.register(Cart)
-class CartAdmin(admin.ModelAdmin):
+class CartAdmin(ShardedAdmin):
     list_display = ['user', 'get_total_price', 'get_total_quantity', 'is_active', 'created_at']
     list_filter = ['is_active', 'created_at']
+    list_select_related = ['user']
     search_fields = ['user__username', 'user__email']
     readonly_fields = ['created_at', 'updated_at']
     ordering = ['-created_at']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        # Totals are aggregated in the changelist query instead of two queries per row
+        return super().get_queryset(request).annotate(
+            total_price=Sum(F('items__price') * F('items__quantity')),
+            total_quantity=Sum('items__quantity'),
+        )
     
     def get_total_price(self, obj):
-        return f"${obj.get_total_price()}"
+        return f"${obj.total_price or 0}"
     get_total_price.short_description = 'Total Price'
+    get_total_price.admin_order_field = 'total_price'
     
     def get_total_quantity(self, obj):
-        return obj.get_total_quantity()
+        return obj.total_quantity or 0
     get_total_quantity.short_description = 'Total Items'
+    get_total_quantity.admin_order_field = 'total_quantity'
 
 class CartItemAdminForm(forms.ModelForm):
     """Custom form for CartItem to make price not required and relabel it as Unit Price"""
@@ -70,13 +191,16 @@ class CartItemAdminForm(forms.ModelForm):
         self.fields['price'].help_text = 'Will auto-populate with product price if left empty. You can override if needed.'
 
 @admin.register(CartItem)
-class CartItemAdmin(admin.ModelAdmin):
+class CartItemAdmin(ShardedAdmin):
     form = CartItemAdminForm
     list_display = ['cart', 'product', 'quantity', 'price', 'currency', 'get_total_price', 'added_at']
     list_filter = ['added_at', 'product__category', 'currency']
+    list_select_related = ['cart__user', 'product']
     search_fields = ['product__name', 'cart__user__username']
     readonly_fields = ['added_at', 'updated_at', 'total_price']
     ordering = ['-added_at']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     def get_total_price(self, obj):
         return obj.get_display_total_price()
@@ -87,20 +211,28 @@ class CartItemAdmin(admin.ModelAdmin):
     total_price.short_description = 'Total Price'
 
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
-    list_display = ['id', 'user', 'status', 'total_price', 'currency', 'created_at']
+class OrderAdmin(ShardedAdmin):
+    list_display = ['id', 'user', 'status', 'total_price', 'discount_total', 'currency', 'created_at']
     list_filter = ['status', 'currency', 'created_at']
+    list_select_related = ['user']
     search_fields = ['user__username', 'user__email', 'id']
     readonly_fields = ['created_at', 'updated_at']
     ordering = ['-created_at']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = [export_orders_csv]
 
 @admin.register(OrderItem)
-class OrderItemAdmin(admin.ModelAdmin):
-    list_display = ['order', 'product', 'quantity', 'price', 'currency', 'get_total_price', 'added_at']
+class OrderItemAdmin(ShardedAdmin):
+    list_display = ['order', 'product', 'quantity', 'price', 'discount', 'currency', 'get_total_price', 'added_at']
     list_filter = ['added_at', 'product__category', 'currency']
+    list_select_related = ['order__user', 'product']
     search_fields = ['product__name', 'order__user__username']
     readonly_fields = ['added_at', 'updated_at', 'total_price']
     ordering = ['-added_at']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = [export_order_items_csv]
 
     def get_total_price(self, obj):
         return obj.get_display_total_price()
@@ -109,3 +241,79 @@ class OrderItemAdmin(admin.ModelAdmin):
     def total_price(self, obj):
         return obj.get_display_total_price()
     total_price.short_description = 'Total Price'
+
+@admin.register(Promotion)
+class PromotionAdmin(admin.ModelAdmin):
+    list_display = ['name', 'kind', 'product', 'category', 'percent_off', 'amount_off', 'min_subtotal', 'is_active', 'starts_at', 'ends_at']
+    list_filter = ['kind', 'is_active', 'category']
+    list_editable = ['is_active']
+    list_select_related = ['product', 'category']
+    search_fields = ['name']
+    raw_id_fields = ['product']
+    readonly_fields = ['created_at', 'updated_at']
+    ordering = ['-created_at']
+
+@admin.register(StockMovement)
+class StockMovementAdmin(admin.ModelAdmin):
+    list_display = ['id', 'product', 'delta', 'reason', 'order', 'created_at']
+    list_filter = ['reason', 'created_at']
+    list_select_related = ['product', 'order']
+    search_fields = ['product__name', 'product__sku', 'order__order_id']
+    ordering = ['-id']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    # The ledger is append-only
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+@admin.register(LowStockAlert)
+class LowStockAlertAdmin(admin.ModelAdmin):
+    list_display = ['product', 'stock_quantity', 'threshold', 'created_at', 'resolved_at']
+    list_filter = [('resolved_at', admin.EmptyFieldListFilter), 'created_at']
+    list_select_related = ['product']
+    search_fields = ['product__name', 'product__sku']
+    readonly_fields = ['product', 'stock_quantity', 'threshold', 'created_at']
+
+@admin.register(ChangeLogEntry)
+class ChangeLogEntryAdmin(admin.ModelAdmin):
+    list_display = ['id', 'model', 'object_id', 'action', 'user_id', 'created_at']
+    list_filter = ['model', 'action']
+    search_fields = ['object_id']
+    ordering = ['-id']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(WebhookSubscription)
+class WebhookSubscriptionAdmin(admin.ModelAdmin):
+    list_display = ['url', 'event_types', 'is_active', 'created_at']
+    list_filter = ['is_active']
+    search_fields = ['url']
+
+@admin.action(description='Retry selected deliveries now')
+def retry_deliveries(modeladmin, request, queryset):
+    queryset.exclude(status='DELIVERED').update(status='PENDING', next_attempt_at=timezone.now())
+
+@admin.register(WebhookDelivery)
+class WebhookDeliveryAdmin(admin.ModelAdmin):
+    list_display = ['id', 'subscription', 'event', 'order_key', 'status', 'attempts', 'next_attempt_at', 'delivered_at']
+    list_filter = ['status']
+    list_select_related = ['subscription', 'event']
+    search_fields = ['order_key']
+    readonly_fields = ['subscription', 'event', 'order_key', 'attempts', 'last_error', 'delivered_at']
+    actions = [retry_deliveries]
+    ordering = ['-id']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,265 @@
+"""
+Helpers shared by the benchmark management commands.
+
+Keeps the load generator, server spawning and latency statistics in one place
+so every benchmark reports numbers the same way.
+"""
+import http.client
+import math
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+
+
+def percentile(sorted_values, pct):
+    """Return the pct-th percentile (0-100) of an already sorted list."""
+    if not sorted_values:
+        return None
+    # Nearest-rank method
+    index = min(len(sorted_values) - 1, max(0, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, elapsed, errors=0):
+    """Summarize a list of latencies (seconds) into a JSON-friendly dict in milliseconds."""
+    ordered = sorted(latencies)
+    count = len(ordered)
+    return {
+        'requests': count,
+        'errors': errors,
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(count / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': _ms(percentile(ordered, 50)),
+        'p95_ms': _ms(percentile(ordered, 95)),
+        'p99_ms': _ms(percentile(ordered, 99)),
+        'max_ms': _ms(ordered[-1] if ordered else None),
+    }
+
+
+def _ms(value):
+    return round(value * 1000, 3) if value is not None else None
+
+
+def free_port():
+    """Ask the OS for a free TCP port on localhost."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=30.0):
+    """Block until something accepts connections on localhost:port."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError(f'Server on port {port} did not come up within {timeout}s')
+
+
+def spawn_gunicorn(app, port, workers=2, worker_class=None, extra_args=(), env=None):
+    """
+    Start a local gunicorn serving ``app`` (e.g. 'vibe_ecommerce.wsgi:application')
+    and wait until it listens. The caller is responsible for terminating it.
+    """
+    cmd = [
+        sys.executable, '-m', 'gunicorn', app,
+        '--bind', f'127.0.0.1:{port}',
+        '--workers', str(workers),
+        '--log-level', 'warning',
+    ]
+    if worker_class:
+        cmd += ['--worker-class', worker_class]
+    cmd += list(extra_args)
+    process_env = dict(os.environ, **(env or {}))
+    # Local benchmarks talk plain HTTP to 127.0.0.1
+    process_env.setdefault('ALLOWED_HOSTS', '127.0.0.1,localhost')
+    cache_dir = share_cache(process_env, workers)
+    process = subprocess.Popen(cmd, cwd=settings.BASE_DIR, env=process_env)
+    process.cache_dir = cache_dir
+    try:
+        wait_for_port(port)
+    except TimeoutError:
+        stop_process(process)
+        raise
+    return process
+
+
+def share_cache(process_env, workers):
+    """
+    Give several workers without REDIS_URL or CACHE_DIR a fresh CACHE_DIR to
+    share (gunicorn.conf.py refuses to start them on per-process caches).
+    Returns the directory to remove once the server stopped, or None.
+    """
+    if workers == 1 or process_env.get('REDIS_URL') or process_env.get('CACHE_DIR'):
+        return None
+    process_env['CACHE_DIR'] = tempfile.mkdtemp(prefix='vibe-cache-')
+    return process_env['CACHE_DIR']
+
+
+def stop_process(process, timeout=10):
+    process.terminate()
+    try:
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+    if getattr(process, 'cache_dir', None):
+        shutil.rmtree(process.cache_dir, ignore_errors=True)
+
+
+class HTTPSession:
+    """
+    A keep-alive HTTP/1.1 connection with a minimal cookie jar.
+    One session per load-generator thread; not thread-safe.
+    """
+
+    def __init__(self, base_url, timeout=30.0):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.https = parts.scheme == 'https'
+        self.timeout = timeout
+        self.cookies = {}
+        self.conn = None
+
+    def _connect(self):
+        cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        self.conn = cls(self.host, self.port, timeout=self.timeout)
+
+    def request(self, method, path, body=None, headers=None):
+        """Send a request and return (status, body bytes), reconnecting once on a dropped connection."""
+        all_headers = {'Host': f'{self.host}:{self.port}'}
+        if self.cookies:
+            all_headers['Cookie'] = '; '.join(f'{k}={v}' for k, v in self.cookies.items())
+        if body is not None:
+            all_headers['Content-Type'] = 'application/json'
+        all_headers.update(headers or {})
+        for attempt in range(2):
+            if self.conn is None:
+                self._connect()
+            try:
+                self.conn.request(method, path, body=body, headers=all_headers)
+                response = self.conn.getresponse()
+                payload = response.read()
+            except (http.client.HTTPException, ConnectionError, socket.timeout):
+                self.close()
+                if attempt:
+                    raise
+                continue
+            for header, value in response.getheaders():
+                if header.lower() == 'set-cookie':
+                    name, _, rest = value.partition('=')
+                    self.cookies[name.strip()] = rest.split(';', 1)[0]
+            if response.getheader('Connection', '').lower() == 'close':
+                self.close()
+            return response.status, payload
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+class ClientSession:
+    """
+    Same interface as HTTPSession, backed by Django's in-process test Client.
+    Measures the Django stack without any network or server in the way.
+    """
+
+    def __init__(self, user=None):
+        from django.test import Client
+
+        host = next((h.lstrip('.') for h in settings.ALLOWED_HOSTS if h != '*'), 'localhost')
+        self.client = Client(HTTP_HOST=host)
+        if user is not None:
+            self.client.force_login(user)
+
+    def request(self, method, path, body=None, headers=None):
+        response = self.client.generic(method, path, data=body or '', content_type='application/json')
+        if response.streaming:
+            return response.status_code, b''.join(response.streaming_content)
+        return response.status_code, response.content
+
+    def close(self):
+        pass
+
+
+def run_load(make_session, paths, concurrency, duration):
+    """
+    Hammer ``paths`` round-robin from ``concurrency`` threads for ``duration`` seconds.
+    Each entry is a path to GET or a (method, path, body) tuple.
+    ``make_session`` returns a ready (e.g. logged in) HTTPSession per thread; if it
+    raises in any thread, so does run_load.
+    Returns the summary dict produced by ``summarize``.
+    """
+    latencies = []
+    errors = [0]
+    failures = []
+    lock = threading.Lock()
+    ready = threading.Barrier(concurrency + 1)
+    go = threading.Event()
+    deadline = [0.0]
+
+    def worker(offset):
+        try:
+            session = make_session()
+        except Exception as exc:
+            # Releases the threads already waiting, and the caller
+            failures.append(exc)
+            ready.abort()
+            return
+        local_latencies = []
+        local_errors = 0
+        try:
+            ready.wait()
+        except threading.BrokenBarrierError:
+            session.close()
+            return
+        go.wait()
+        i = offset
+        while time.perf_counter() < deadline[0]:
+            entry = paths[i % len(paths)]
+            method, path, body = ('GET', entry, None) if isinstance(entry, str) else entry
+            i += 1
+            started = time.perf_counter()
+            try:
+                status, _ = session.request(method, path, body=body)
+            except OSError:
+                local_errors += 1
+                continue
+            if status >= 400:
+                local_errors += 1
+            else:
+                local_latencies.append(time.perf_counter() - started)
+        session.close()
+        with lock:
+            latencies.extend(local_latencies)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=worker, args=(n,), daemon=True) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    # Sessions log in before the clock starts
+    try:
+        ready.wait()
+    except threading.BrokenBarrierError:
+        for thread in threads:
+            thread.join()
+        raise failures[0]
+    started = time.perf_counter()
+    deadline[0] = started + duration
+    go.set()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, time.perf_counter() - started, errors[0])
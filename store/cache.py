@@ -0,0 +1,128 @@
+"""
+Shared version counters, and the per-user response cache built on them.
+
+Expensive derived structures (e.g. the compiled promotion index) are kept in
+each process and tagged with the version they were built from. Writers bump the
+version in the shared Django cache; readers compare versions and rebuild only
+when it moved. A missing (never set or evicted) counter is re-created from the
+clock, so it can never match a version an older structure was built from.
+
+Set REDIS_URL in production so every worker sees the same counters, or
+CACHE_DIR (SharedFileCache) when all workers run on one host.
+"""
+import fcntl
+import hashlib
+import os
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.http import HttpResponse
+
+from . import compression
+
+
+class SharedFileCache(FileBasedCache):
+    """
+    FileBasedCache whose add() and incr() hold an exclusive lock on the cache
+    directory: its read-modify-write would otherwise lose a concurrent bump
+    from another process.
+    """
+    @contextmanager
+    def _locked(self):
+        self._createdir()
+        with open(os.path.join(self._dir, 'lock'), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def add(self, *args, **kwargs):
+        with self._locked():
+            return super().add(*args, **kwargs)
+
+    def incr(self, *args, **kwargs):
+        with self._locked():
+            return super().incr(*args, **kwargs)
+
+
+def _key(name):
+    return f'store:version:{name}'
+
+
+def user_scope(user_id):
+    """Version name covering everything cached for one user."""
+    return f'user:{user_id}'
+
+
+def get_version(name):
+    key = _key(name)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_version(name):
+    key = _key(name)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def bump_version(name):
+    key = _key(name)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(key, version, timeout=None)
+        return version
+
+
+async def aget_versions(names):
+    """aget_version() for several names, in one cache round trip when they all exist."""
+    keys = [_key(name) for name in names]
+    found = await cache.aget_many(keys)
+    return [found[key] if key in found else await aget_version(name) for key, name in zip(keys, names)]
+
+
+def cache_per_user(*version_names, key_parts=None):
+    """
+    Cache an async view's 200 responses per authenticated user.
+
+    The key holds the user's own version (bumped by store/signals.py whenever
+    their carts or orders change), the shared versions named here, anything
+    returned by ``key_parts()`` and the full path. Versions are read before the
+    view runs, so a cached response can never be newer-keyed than its data.
+    Cached responses also get their compressed body cached (see compression.py).
+    """
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            user = await request.auser()
+            if not user.is_authenticated:
+                return await view(request, *args, **kwargs)
+            versions = await aget_versions([user_scope(user.pk), *version_names])
+            parts = [view.__name__, str(user.pk), *map(str, versions)]
+            if key_parts is not None:
+                parts.append(key_parts())
+            parts.append(request.get_full_path())
+            key = 'response:' + hashlib.sha1('|'.join(parts).encode()).hexdigest()
+
+            cached = await cache.aget(key)
+            if cached is not None:
+                content_type, content = cached
+                response = HttpResponse(content, content_type=content_type)
+            else:
+                response = await view(request, *args, **kwargs)
+                if response.status_code != 200 or response.streaming:
+                    return response
+                await cache.aset(key, (response['Content-Type'], response.content), settings.USER_RESPONSE_CACHE_TIMEOUT)
+            return compression.mark_cacheable(response, key)
+        return wrapper
+    return decorator
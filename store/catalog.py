@@ -0,0 +1,90 @@
+"""
+Product serialization and the per-product cache behind the detail and batch
+endpoints.
+
+Entries are keyed by product id and hold the serialized product. A batch read
+is one ``get_many``; the misses are loaded with a single ``in_bulk`` query and
+written back with one ``set_many``. store/signals.py deletes a product's entry
+when the product or its category is saved or deleted. A reader that loaded a
+product just before such a commit can still write the old version back, so
+entries also expire after PRODUCT_CACHE_TIMEOUT seconds.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .fields import ALL
+from .models import Product
+
+
+def _timestamp(value):
+    return timezone.localtime(value).strftime("%B %d, %Y, %I:%M %p")
+
+
+def _dimension(value, unit):
+    return f"{value} {unit}" if value is not None else None
+
+
+# Response key -> (model fields it reads, formatter). Drives product_data() and the
+# columns a ?fields= selection loads (see store/fields.py).
+PRODUCT_FIELDS = {
+    'id': (('id',), lambda product, price: product.id),
+    'name': (('name',), lambda product, price: product.name),
+    'description': (('description',), lambda product, price: product.description),
+    'price': (('price',), lambda product, price: price if price is not None else product.get_display_price()),
+    'category': (('category__name',), lambda product, price: {
+        'id': product.category.id,
+        'name': product.category.name,
+    }),
+    'stock_quantity': (('stock_quantity',), lambda product, price: product.stock_quantity),
+    'is_active': (('is_active',), lambda product, price: product.is_active),
+    'sku': (('sku',), lambda product, price: product.sku),
+    # Add units to dimensions
+    'weight': (('weight',), lambda product, price: _dimension(product.weight, 'g')),
+    'length': (('length',), lambda product, price: _dimension(product.length, 'cm')),
+    'width': (('width',), lambda product, price: _dimension(product.width, 'cm')),
+    'height': (('height',), lambda product, price: _dimension(product.height, 'cm')),
+    # Format timestamps to be human-readable
+    'created_at': (('created_at',), lambda product, price: _timestamp(product.created_at)),
+    'updated_at': (('updated_at',), lambda product, price: _timestamp(product.updated_at)),
+}
+PRODUCT_COLUMNS = {name: columns for name, (columns, _) in PRODUCT_FIELDS.items()}
+_FORMATTERS = tuple((name, format) for name, (_, format) in PRODUCT_FIELDS.items())
+
+
+def product_data(product, price=None, selection=ALL):
+    """
+    Serialize a product (with its category loaded) the way the catalog endpoints return it,
+    limited to the fields in ``selection``; only those fields are formatted.
+    """
+    if selection.everything:
+        return {name: format(product, price) for name, format in _FORMATTERS}
+    return {name: format(product, price) for name, format in _FORMATTERS if name in selection.names}
+
+
+def _key(product_id):
+    return f'product:{product_id}'
+
+
+async def aget_products(product_ids):
+    """
+    Return {id: serialized product} for the active products among ``product_ids``.
+    Costs no query when every product is cached and exactly one otherwise.
+    """
+    keys = {product_id: _key(product_id) for product_id in product_ids}
+    found = await cache.aget_many(keys.values())
+    products = {product_id: found[key] for product_id, key in keys.items() if key in found}
+    missing = [product_id for product_id in keys if product_id not in products]
+    if missing:
+        loaded = await Product.objects.filter(is_active=True).select_related('category').ain_bulk(missing)
+        fresh = {product_id: product_data(product) for product_id, product in loaded.items()}
+        if fresh:
+            await cache.aset_many(
+                {_key(product_id): data for product_id, data in fresh.items()}, settings.PRODUCT_CACHE_TIMEOUT,
+            )
+        products.update(fresh)
+    return products
+
+
+def invalidate_products(product_ids):
+    cache.delete_many([_key(product_id) for product_id in product_ids])
@@ -0,0 +1,123 @@
+"""
+Change feed for Product, Category and Order (``/api/changes/``).
+
+Every insert, update and delete appends a ChangeLogEntry in the same
+transaction as the change: model saves and deletes through the receivers in
+store/signals.py, queryset updates through explicit ``record()`` calls (stock
+and sales counters in store/inventory.py, cancellations in the views). Entry
+ids are the feed's sequence; entries carry ids only, and consumers fetch the
+current rows (e.g. with products/batch/), treating insert and update alike.
+
+Entry ids are assigned at insert but become visible at commit, so a page stops
+before the first entry younger than CHANGE_FEED_LAG seconds; an entry can only
+be missed by a transaction that stays open longer than that.
+
+``compact()`` (the ``compact_changes`` command) deletes entries superseded by
+a newer one for the same object, which never loses information for any cursor,
+and drops entries older than CHANGE_LOG_RETENTION_DAYS. Cursors from before
+the retention horizon get ExpiredCursor and must resync in full.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, Max, OuterRef, Q
+from django.utils import timezone
+
+from .models import ChangeLogEntry, LedgerCursor
+
+RETENTION = 'change-log-retention'
+# Entries deleted per statement while compacting
+COMPACT_BATCH_SIZE = 10_000
+
+
+class ExpiredCursor(Exception):
+    pass
+
+
+def record(model, object_ids, action, user_id=None):
+    """Append one entry per object in ``object_ids`` (one INSERT)."""
+    ChangeLogEntry.objects.bulk_create([
+        ChangeLogEntry(model=model, object_id=str(object_id), action=action, user_id=user_id)
+        for object_id in object_ids
+    ])
+
+
+def record_orders(orders, action):
+    """Append one entry per order in ``orders``, each visible to the order's owner."""
+    ChangeLogEntry.objects.bulk_create([
+        ChangeLogEntry(model='order', object_id=order.order_id, action=action, user_id=order.user_id)
+        for order in orders
+    ])
+
+
+def visible_to(user):
+    """Entries ``user`` may read: staff see everything, others the catalog and their own orders."""
+    entries = ChangeLogEntry.objects.all()
+    if user.is_staff:
+        return entries
+    catalog = Q(model__in=['product', 'category'])
+    if user.is_authenticated:
+        return entries.filter(catalog | Q(model='order', user_id=user.pk))
+    return entries.filter(catalog)
+
+
+def _horizon():
+    return LedgerCursor.objects.filter(name=RETENTION).values_list('position', flat=True).first() or 0
+
+
+def latest():
+    """The current sequence: a consumer's starting cursor, read before its full download."""
+    return max(ChangeLogEntry.objects.aggregate(latest=Max('id'))['latest'] or 0, _horizon())
+
+
+def page(entries, since, limit):
+    """
+    Entries after sequence ``since``, oldest first, at most ``limit``.
+    Returns (entries, next cursor, has_more). Raises ExpiredCursor when entries
+    after ``since`` may have been dropped by retention.
+    """
+    if since < _horizon():
+        raise ExpiredCursor(since)
+    rows = list(entries.filter(id__gt=since).order_by('id')[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    visible_until = timezone.now() - timedelta(seconds=settings.CHANGE_FEED_LAG)
+    for index, entry in enumerate(rows):
+        if entry.created_at > visible_until:
+            # Possibly preceded by an entry still uncommitted; serve it next time
+            rows, has_more = rows[:index], True
+            break
+    return rows, (rows[-1].id if rows else since), has_more
+
+
+def compact(now=None):
+    """Collapse superseded entries and apply retention. Returns (collapsed, expired)."""
+    now = now or timezone.now()
+    # Leave the tail readers may still be paging through alone
+    settled = ChangeLogEntry.objects.filter(
+        created_at__lte=now - timedelta(seconds=settings.CHANGE_FEED_LAG),
+    ).aggregate(upto=Max('id'))['upto']
+    if settled is None:
+        return 0, 0
+    newer = ChangeLogEntry.objects.filter(model=OuterRef('model'), object_id=OuterRef('object_id'), id__gt=OuterRef('id'))
+    collapsed = _delete_in_batches(ChangeLogEntry.objects.filter(Exists(newer), id__lte=settled))
+
+    cutoff = now - timedelta(days=settings.CHANGE_LOG_RETENTION_DAYS)
+    expired_upto = ChangeLogEntry.objects.filter(created_at__lt=cutoff).aggregate(upto=Max('id'))['upto']
+    expired = 0
+    if expired_upto is not None:
+        with transaction.atomic():
+            LedgerCursor.objects.update_or_create(name=RETENTION, defaults={'position': expired_upto})
+            expired = _delete_in_batches(ChangeLogEntry.objects.filter(id__lte=expired_upto))
+    return collapsed, expired
+
+
+def _delete_in_batches(entries):
+    deleted = 0
+    while True:
+        batch = list(entries.values_list('id', flat=True)[:COMPACT_BATCH_SIZE])
+        if not batch:
+            return deleted
+        # No relations or signals, so this is a single DELETE
+        deleted += ChangeLogEntry.objects.filter(id__in=batch).delete()[0]
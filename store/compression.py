@@ -0,0 +1,84 @@
+"""
+Negotiated response compression (see CompressionMiddleware).
+
+gzip is always available; brotli is used when the optional ``brotli`` package
+is installed and the client accepts it. Views whose body only depends on
+versioned content mark the response with ``mark_cacheable`` and the compressed
+bytes are kept in the shared cache under that key, compressed once at a high
+level, so hot responses cost no compression CPU.
+"""
+import gzip
+import hashlib
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+from django.conf import settings
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/')
+
+# Fast levels for one-off bodies, best levels for bodies that are cached and reused
+LEVELS = {
+    'br': {'dynamic': 5, 'cached': 11},
+    'gzip': {'dynamic': 6, 'cached': 9},
+}
+
+
+def available_encodings():
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate(accept_encoding):
+    """Pick the preferred encoding we support from an Accept-Encoding header, or None."""
+    accepted = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    best, best_quality = None, 0.0
+    for encoding in available_encodings():
+        quality = accepted.get(encoding, accepted.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(data, encoding, cached=False):
+    level = LEVELS[encoding]['cached' if cached else 'dynamic']
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    # mtime=0 keeps the output identical for identical input
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def is_compressible(response):
+    if response.streaming or response.has_header('Content-Encoding'):
+        return False
+    if response.status_code != 200:
+        return False
+    content_type = response.get('Content-Type', '')
+    if not content_type.startswith(COMPRESSIBLE_TYPES):
+        return False
+    return len(response.content) >= settings.COMPRESSION_MIN_SIZE
+
+
+def mark_cacheable(response, key):
+    """
+    Let CompressionMiddleware reuse the compressed body for every response with
+    the same ``key``. The key must change whenever the body would.
+    """
+    response.compression_cache_key = key
+    return response
+
+
+def cache_key(key, encoding):
+    digest = hashlib.sha1(key.encode()).hexdigest()
+    return f'compressed:{encoding}:{digest}'
@@ -0,0 +1,72 @@
+"""
+Local data files (FX rates, shipping rates, recommendations) parsed once per
+process.
+
+The file is stat()ed at most every ``check_interval`` seconds, so the request
+path normally costs one monotonic clock read. It is re-parsed only when it
+changed on disk, and the parsed table is swapped only when its ``version``
+differs, so readers keep sharing one immutable object between releases.
+"""
+import json
+import os
+import threading
+import time
+
+from django.conf import settings
+
+
+def load_json(path):
+    with open(path) as fh:
+        return json.load(fh)
+
+
+class VersionedFile:
+    """
+    ``load(path)`` reads the file (JSON by default) and ``parse`` turns that
+    into a table with a ``version``. With ``missing``, a file that does not exist
+    yet is served as ``missing()`` instead of raising.
+    """
+
+    def __init__(self, path_setting, interval_setting, parse, load=load_json, missing=None):
+        self.path_setting = path_setting
+        self.interval_setting = interval_setting
+        self.parse = parse
+        self.load = load
+        self.missing = missing
+        self._lock = threading.Lock()
+        self._table = None
+        self._signature = None
+        self._checked_at = 0.0
+
+    def get(self):
+        """Return the parsed table, reloading it only when the file's version changed."""
+        now = time.monotonic()
+        table = self._table
+        if table is not None and now - self._checked_at < getattr(settings, self.interval_setting):
+            return table
+        with self._lock:
+            if self._table is not table:
+                # Another thread refreshed while we waited
+                return self._table
+            path = getattr(settings, self.path_setting)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                if self.missing is None:
+                    raise
+                stat = None
+            signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size) if stat else None
+            if table is None or signature != self._signature:
+                loaded = self.parse(self.load(path)) if stat else self.missing()
+                if table is None or loaded.version != table.version:
+                    table = self._table = loaded
+                self._signature = signature
+            self._checked_at = now
+            return table
+
+    def invalidate(self):
+        """Drop the cached table; the next get() reloads the file."""
+        with self._lock:
+            self._table = None
+            self._signature = None
+            self._checked_at = 0.0
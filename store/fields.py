@@ -0,0 +1,82 @@
+"""
+Sparse fieldsets: ``?fields=`` on the read endpoints.
+
+``?fields=id,name,price`` returns only those keys. Lists nested in a response
+take dotted names: ``?fields=order_id,items.product_id,items.quantity`` (plain
+``items`` means every item field). Without ``?fields=`` responses are
+unchanged.
+
+Views map the selection down to the ORM with ``columns()`` and ``.only()``,
+drop joins, annotations and prefetches that only omitted fields need, and skip
+formatting omitted values, so the query, the serialization and the payload
+all shrink with the selection.
+"""
+
+
+class InvalidFields(ValueError):
+    pass
+
+
+class Selection:
+    """The requested fields of one level of a response; ``names`` is None for all of them."""
+
+    def __init__(self, names=None, children=None):
+        self.names = names
+        self.children = children or {}
+
+    @property
+    def everything(self):
+        return self.names is None
+
+    def __contains__(self, name):
+        return self.names is None or name in self.names
+
+    def wants_any(self, *names):
+        return any(name in self for name in names)
+
+    def child(self, name):
+        """The selection inside the nested list ``name``."""
+        return Selection(self.children.get(name))
+
+    def render(self, formatters, *args):
+        """{name: formatter(*args)} for the selected names; the others are never computed."""
+        if self.names is None:
+            return {name: format(*args) for name, format in formatters.items()}
+        return {name: format(*args) for name, format in formatters.items() if name in self.names}
+
+    def columns(self, mapping):
+        """The model fields (for ``.only()``) behind the selected names, from {name: fields}."""
+        names = mapping if self.names is None else self.names
+        return sorted({column for name in names for column in mapping.get(name, ())})
+
+
+ALL = Selection()
+
+
+def parse(request, allowed, nested=None):
+    """
+    Read ``?fields=`` against the top-level names in ``allowed`` and, for each
+    nested list, the names in ``nested[list name]``. Raises InvalidFields.
+    """
+    value = request.GET.get('fields')
+    if not value:
+        return ALL
+    nested = nested or {}
+    names, children = set(), {}
+    for name in filter(None, (part.strip() for part in value.split(','))):
+        parent, _, child = name.partition('.')
+        if child:
+            if child not in nested.get(parent, ()):
+                raise InvalidFields(name)
+            names.add(parent)
+            if children.get(parent, set()) is not None:
+                children.setdefault(parent, set()).add(child)
+        elif parent in allowed or parent in nested:
+            names.add(parent)
+            # The whole list, whatever else was asked of it
+            children[parent] = None
+        else:
+            raise InvalidFields(name)
+    if not names:
+        return ALL
+    return Selection(names, children)
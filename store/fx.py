@@ -0,0 +1,106 @@
+"""
+Currency conversion backed by a local FX rate file (no network).
+
+The rate table is parsed once per process and kept until the file's ``version``
+changes (see store/datafiles.py); the file is re-checked at most every
+FX_RATES_CHECK_INTERVAL seconds.
+
+Rates are quoted per unit of the base currency (USD, which is what
+``Product.price`` is stored in). Rounding is configured per currency with
+CURRENCY_ROUNDING: ``places`` (decimal places), optional ``increment`` (cash
+rounding, e.g. CHF 0.05) and ``rounding`` (a decimal module rounding mode).
+"""
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+
+from .datafiles import VersionedFile
+
+# Currency Product.price is stored in
+BASE_CURRENCY = 'USD'
+
+DEFAULT_ROUNDING = {'places': 2, 'rounding': ROUND_HALF_UP}
+
+
+class UnsupportedCurrency(ValueError):
+    pass
+
+
+class RateTable:
+    __slots__ = ('version', 'base', 'rates')
+
+    def __init__(self, version, base, rates):
+        self.version = version
+        self.base = base
+        self.rates = rates
+
+    def rate(self, from_currency, to_currency):
+        """Multiplier converting an amount in ``from_currency`` to ``to_currency``."""
+        try:
+            return self.rates[to_currency] / self.rates[from_currency]
+        except KeyError as exc:
+            raise UnsupportedCurrency(exc.args[0]) from None
+
+
+def _parse(data):
+    rates = {code.upper(): Decimal(value) for code, value in data['rates'].items()}
+    base = data.get('base', 'USD').upper()
+    rates.setdefault(base, Decimal(1))
+    return RateTable(str(data['version']), base, rates)
+
+
+_rates_file = VersionedFile('FX_RATES_FILE', 'FX_RATES_CHECK_INTERVAL', _parse)
+
+
+def get_rates():
+    """Return the current RateTable, reloading it only when the file's version changed."""
+    return _rates_file.get()
+
+
+def invalidate():
+    """Drop the cached table; the next get_rates() reloads the file."""
+    _rates_file.invalidate()
+
+
+def normalize_currency(code):
+    """Upper-case ``code`` and check it is in the rate table; raises UnsupportedCurrency."""
+    if code is not None and not isinstance(code, str):
+        raise UnsupportedCurrency(code)
+    code = (code or '').strip().upper()
+    if code not in get_rates().rates:
+        raise UnsupportedCurrency(code)
+    return code
+
+
+def _rounding_rule(currency):
+    rules = getattr(settings, 'CURRENCY_ROUNDING', {})
+    rule = {**DEFAULT_ROUNDING, **rules.get('default', {}), **rules.get(currency, {})}
+    quantum = Decimal(1).scaleb(-rule['places'])
+    increment = Decimal(rule['increment']) if rule.get('increment') else None
+    return quantum, increment, rule['rounding']
+
+
+def rounder(currency):
+    """Return a function that rounds an amount according to ``currency``'s rule."""
+    quantum, increment, mode = _rounding_rule(currency)
+    if increment is None:
+        return lambda amount: amount.quantize(quantum, rounding=mode)
+    return lambda amount: ((amount / increment).quantize(Decimal(1), rounding=mode) * increment).quantize(quantum)
+
+
+def convert_many(amounts, to_currency):
+    """
+    Convert an iterable of (amount, currency) pairs to ``to_currency`` in one pass:
+    the table, the rounding rule and each distinct cross rate are looked up once.
+    Returns a list of rounded Decimals in input order.
+    """
+    table = get_rates()
+    round_amount = rounder(to_currency)
+    cross_rates = {}
+    converted = []
+    for amount, currency in amounts:
+        rate = cross_rates.get(currency)
+        if rate is None:
+            rate = cross_rates[currency] = table.rate(currency, to_currency)
+        converted.append(round_amount(Decimal(amount) * rate))
+    return converted
@@ -0,0 +1,140 @@
+"""
+A small asyncio HTTP/1.1 client with a bounded keep-alive connection pool,
+for delivering webhooks without adding an HTTP client dependency.
+
+Only what webhook delivery needs: POST with a body, responses framed by
+Content-Length, chunked encoding or connection close, http and https. At most
+``max_connections`` requests are in flight at once, and idle connections are
+reused per (scheme, host, port).
+"""
+import asyncio
+import ssl
+from urllib.parse import urlsplit
+
+
+class HTTPError(Exception):
+    pass
+
+
+class Response:
+    __slots__ = ('status', 'headers', 'body')
+
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+
+class ConnectionPool:
+    def __init__(self, max_connections=50, timeout=10.0, max_idle_per_host=10):
+        self.timeout = timeout
+        self.max_idle_per_host = max_idle_per_host
+        self._slots = asyncio.Semaphore(max_connections)
+        self._idle = {}
+        self._ssl = None
+
+    async def post(self, url, body, headers=None):
+        """POST ``body`` (bytes) to ``url``; raises HTTPError on connection or protocol errors and timeouts."""
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise HTTPError(f'Unsupported URL: {url}')
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80))
+        target = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+        head = [
+            f'POST {target} HTTP/1.1',
+            f'Host: {parts.netloc}',
+            f'Content-Length: {len(body)}',
+        ] + [f'{name}: {value}' for name, value in (headers or {}).items()]
+        request = ('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body
+
+        async with self._slots:
+            try:
+                return await asyncio.wait_for(self._send(key, request), self.timeout)
+            except asyncio.TimeoutError as exc:
+                raise HTTPError(f'Timed out after {self.timeout}s') from exc
+
+    async def _send(self, key, request):
+        idle = self._idle.get(key)
+        if idle:
+            reader, writer = idle.pop()
+            try:
+                return await self._exchange(key, reader, writer, request)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # The server may have closed a kept-alive connection; retry once on a new one.
+                # Deliveries are at-least-once anyway, receivers dedupe by event id.
+                writer.close()
+            except BaseException:
+                writer.close()
+                raise
+        reader, writer = await self._connect(key)
+        try:
+            return await self._exchange(key, reader, writer, request)
+        except (ConnectionError, asyncio.IncompleteReadError) as exc:
+            writer.close()
+            raise HTTPError(str(exc) or exc.__class__.__name__) from exc
+        except BaseException:
+            # Including the cancellation of a timeout: the connection state is unknown
+            writer.close()
+            raise
+
+    async def _connect(self, key):
+        scheme, host, port = key
+        if scheme == 'https' and self._ssl is None:
+            self._ssl = ssl.create_default_context()
+        try:
+            return await asyncio.open_connection(host, port, ssl=self._ssl if scheme == 'https' else None)
+        except OSError as exc:
+            raise HTTPError(f'Cannot connect to {host}:{port}: {exc}') from exc
+
+    async def _exchange(self, key, reader, writer, request):
+        writer.write(request)
+        await writer.drain()
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError('Connection closed')
+        try:
+            version, status, _ = status_line.decode('latin-1').split(' ', 2)
+            status = int(status)
+        except ValueError as exc:
+            writer.close()
+            raise HTTPError(f'Bad status line: {status_line!r}') from exc
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+        if 'chunked' in headers.get('transfer-encoding', '').lower():
+            body = await self._read_chunked(reader)
+        elif 'content-length' in headers:
+            body = await reader.readexactly(int(headers['content-length']))
+        else:
+            body = await reader.read()
+            keep_alive = False
+
+        if keep_alive and len(self._idle.setdefault(key, [])) < self.max_idle_per_host:
+            self._idle[key].append((reader, writer))
+        else:
+            writer.close()
+        return Response(status, headers, body)
+
+    async def _read_chunked(self, reader):
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b';')[0].strip(), 16)
+            if size == 0:
+                # Trailers, up to the blank line
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                return b''.join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+
+    async def close(self):
+        for connections in self._idle.values():
+            for _, writer in connections:
+                writer.close()
+        self._idle.clear()
@@ -0,0 +1,219 @@
+"""
+Stock ledger.
+
+Every change of ``Product.stock_quantity`` appends StockMovement rows (written
+with ``bulk_create``, never updated or deleted): admin edits through
+Product.save(), sales at checkout and restocking when an order is cancelled.
+An edit applies the change made to the stock it loaded, so sales in between
+are kept.
+Checkout and cancellation change stock with one conditional UPDATE for the
+whole order, so overselling is impossible without locking rows in Python. The
+same UPDATE maintains the sales rankings (store/rankings.py).
+
+Two incremental jobs read the ledger from a LedgerCursor position (see the
+``process_inventory`` command):
+
+- ``take_snapshots`` writes a StockSnapshot for each product that moved since
+  the last run, so ``ledger_stock`` rebuilds stock from the latest snapshot plus
+  the few movements after it instead of the whole history.
+- ``detect_low_stock`` re-evaluates only the products that moved and opens or
+  resolves LowStockAlert rows.
+
+Movement ids are assigned at insert but become visible at commit, so a job
+only reads movements older than INVENTORY_CURSOR_LAG seconds; a transaction
+that committed later than that would be skipped.
+"""
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, Max, OuterRef, Q, Subquery, Sum, When
+from django.utils import timezone
+
+from . import changes, rankings
+from .cache import bump_version
+from .catalog import invalidate_products
+from .models import LedgerCursor, LowStockAlert, Product, StockMovement, StockSnapshot
+from .signals import STOCK
+
+SNAPSHOTS = 'stock-snapshots'
+LOW_STOCK = 'low-stock'
+
+# Products rebuilt per ledger_stock() call while snapshotting
+SNAPSHOT_BATCH_SIZE = 500
+
+
+class InsufficientStock(Exception):
+    pass
+
+
+def _quantities(items):
+    quantities = {}
+    for product_id, quantity in items:
+        quantities[product_id] = quantities.get(product_id, 0) + quantity
+    return quantities
+
+
+def _apply(quantities, reason, order, require_stock, also=None):
+    """
+    Change the stock of every product in ``quantities`` (id -> delta) in one
+    UPDATE, together with any other ``also`` updates, and log it.
+    """
+    products = Product.objects.filter(pk__in=quantities)
+    if require_stock:
+        # Each row only matches when it can cover its own decrement
+        condition = Q()
+        for product_id, delta in quantities.items():
+            condition |= Q(pk=product_id, stock_quantity__gte=-delta)
+        products = products.filter(condition)
+    updated = products.update(stock_quantity=Case(
+        *(When(pk=product_id, then=F('stock_quantity') + delta) for product_id, delta in quantities.items()),
+        default=F('stock_quantity'),
+        output_field=Product._meta.get_field('stock_quantity'),
+    ), **(also or {}))
+    if require_stock and updated != len(quantities):
+        short = Product.objects.filter(
+            pk__in=quantities,
+        ).values_list('pk', 'name', 'stock_quantity')
+        names = [name for pk, name, stock in short if stock < -quantities[pk]]
+        raise InsufficientStock(f"Not enough stock for: {', '.join(sorted(names)) or 'unknown product'}")
+    StockMovement.objects.bulk_create([
+        StockMovement(product_id=product_id, delta=delta, reason=reason, order=order)
+        for product_id, delta in quantities.items()
+    ])
+    # Queryset updates skip the signals in store/signals.py
+    changes.record('product', quantities, 'update')
+    transaction.on_commit(partial(invalidate_products, list(quantities)))
+    transaction.on_commit(partial(bump_version, STOCK))
+
+
+def take_stock(order, items):
+    """
+    Decrement stock for ``items`` of (product_id, quantity) sold in ``order``.
+    Raises InsufficientStock, changing nothing, if any product cannot cover its
+    quantity. Call inside the order's transaction.
+    """
+    units = _quantities(items)
+    _apply(
+        {pk: -quantity for pk, quantity in units.items()}, 'SALE', order, require_stock=True,
+        # Sales counters ride on the same UPDATE
+        also=rankings.sales_updates(units, order.created_at),
+    )
+
+
+def restock(order):
+    """
+    Return what a cancelled ``order`` took from stock. Read from its SALE
+    movements, so orders placed before the ledger existed restock nothing.
+    """
+    sold = StockMovement.objects.filter(order=order, reason='SALE').order_by().values_list('product_id', 'delta')
+    quantities = {product_id: -delta for product_id, delta in sold}
+    if quantities:
+        # Takes back exactly what the sale added to the counters
+        _apply(
+            quantities, 'CANCELLATION', order, require_stock=False,
+            also=rankings.sales_updates({pk: -quantity for pk, quantity in quantities.items()}, order.created_at),
+        )
+
+
+def ledger_stock(product_ids, upto=None):
+    """
+    Rebuild {product_id: stock} from the ledger, as of movement ``upto``
+    (inclusive; default all): the latest snapshot of each product plus its
+    movements after that snapshot.
+    """
+    stock = {product_id: 0 for product_id in product_ids}
+    if not stock:
+        return stock
+    movements = StockMovement.objects.all()
+    earlier = StockSnapshot.objects.filter(product_id=OuterRef('product_id'))
+    if upto is not None:
+        movements = movements.filter(id__lte=upto)
+        earlier = earlier.filter(movement_id__lte=upto)
+    snapshots = StockSnapshot.objects.filter(
+        product_id__in=stock,
+        movement_id=Subquery(earlier.order_by('-movement_id').values('movement_id')[:1]),
+    ).values_list('product_id', 'quantity', 'movement_id')
+    since = {}
+    for product_id, quantity, movement_id in snapshots:
+        stock[product_id] = quantity
+        since[product_id] = movement_id
+    after = Q()
+    for product_id in stock:
+        if product_id in since:
+            after |= Q(product_id=product_id, id__gt=since[product_id])
+        else:
+            after |= Q(product_id=product_id)
+    moved = movements.filter(after).values('product_id').annotate(delta=Sum('delta')).order_by()
+    for row in moved:
+        stock[row['product_id']] += row['delta']
+    return stock
+
+
+def _advance(name, process):
+    """
+    Run ``process(after, upto)`` over the movements ``after < id <= upto`` not yet
+    seen by job ``name`` and move its cursor to ``upto``. Returns what
+    ``process`` returned, or None when there was nothing new.
+    """
+    horizon = timezone.now() - timedelta(seconds=settings.INVENTORY_CURSOR_LAG)
+    with transaction.atomic():
+        cursor, _ = LedgerCursor.objects.get_or_create(name=name)
+        # Serializes concurrent runs of the same job
+        cursor = LedgerCursor.objects.select_for_update().get(pk=cursor.pk)
+        upto = StockMovement.objects.filter(
+            id__gt=cursor.position, created_at__lte=horizon,
+        ).aggregate(upto=Max('id'))['upto']
+        if upto is None:
+            return None
+        result = process(cursor.position, upto)
+        cursor.position = upto
+        cursor.save(update_fields=['position', 'updated_at'])
+        return result
+
+
+def _moved(after, upto):
+    return StockMovement.objects.filter(id__gt=after, id__lte=upto)
+
+
+def take_snapshots():
+    """Snapshot every product that moved since the last run. Returns the number of snapshots written."""
+    def process(after, upto):
+        moved = list(_moved(after, upto).values_list('product_id', flat=True).order_by().distinct())
+        for start in range(0, len(moved), SNAPSHOT_BATCH_SIZE):
+            stock = ledger_stock(moved[start:start + SNAPSHOT_BATCH_SIZE], upto)
+            StockSnapshot.objects.bulk_create([
+                StockSnapshot(product_id=product_id, quantity=quantity, movement_id=upto)
+                for product_id, quantity in stock.items()
+            ])
+        return len(moved)
+
+    return _advance(SNAPSHOTS, process) or 0
+
+
+def detect_low_stock():
+    """
+    Re-evaluate the products that moved since the last run: open an alert for
+    those at or below LOW_STOCK_THRESHOLD, resolve the open alerts of those above.
+    Returns (opened, resolved).
+    """
+    threshold = settings.LOW_STOCK_THRESHOLD
+
+    def process(after, upto):
+        moved = _moved(after, upto).values('product_id').order_by().distinct()
+        products = Product.objects.filter(pk__in=moved, is_active=True)
+        low = dict(products.filter(stock_quantity__lte=threshold).values_list('pk', 'stock_quantity'))
+        open_alerts = LowStockAlert.objects.filter(resolved_at__isnull=True)
+        already_open = set(open_alerts.filter(product_id__in=low).values_list('product_id', flat=True))
+        opened = LowStockAlert.objects.bulk_create([
+            LowStockAlert(product_id=product_id, stock_quantity=stock, threshold=threshold)
+            for product_id, stock in low.items()
+            if product_id not in already_open
+        ])
+        resolved = open_alerts.filter(product_id__in=moved).exclude(product_id__in=list(low)).update(
+            resolved_at=timezone.now(),
+        )
+        return len(opened), resolved
+
+    return _advance(LOW_STOCK, process) or (0, 0)
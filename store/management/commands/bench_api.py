@@ -0,0 +1,228 @@
+import json
+import random
+import threading
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from store import bench, picking
+from store.models import Order, PickList, Product
+from store.urls import urlpatterns
+
+from .seed_bench import BENCH_PASSWORD, PREFIX
+
+WSGI_APP = 'vibe_ecommerce.wsgi:application'
+
+
+class Scenario:
+    """
+    One endpoint under test. ``prepare`` runs untimed (e.g. put something in the cart
+    before timing checkout) and returns the (method, path, body) that is timed;
+    ``finish`` runs untimed afterwards to restore the session.
+    """
+
+    def __init__(self, name, prepare, finish=None):
+        self.name = name
+        self.prepare = prepare
+        self.finish = finish
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive every endpoint in store/urls.py against the seed_bench dataset and report "
+        "throughput and p50/p95/p99 latency per endpoint as JSON. Runs in-process through "
+        "the Django test client by default, or over HTTP with --url / --spawn."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200, help='Timed requests per endpoint')
+        parser.add_argument('--concurrency', type=int, default=1, help='Client threads (HTTP modes only)')
+        parser.add_argument('--url', help='Benchmark an already running server, e.g. http://127.0.0.1:8000')
+        parser.add_argument('--spawn', action='store_true', help='Start a local gunicorn for the run')
+        parser.add_argument('--workers', type=int, default=2, help='Gunicorn workers with --spawn')
+        parser.add_argument('--endpoint', action='append', dest='endpoints', help='Only run these URL names')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', help='Also write the JSON report to this file')
+
+    def handle(self, *args, **options):
+        if options['url'] and options['spawn']:
+            raise CommandError('Use either --url or --spawn, not both.')
+        http_mode = bool(options['url'] or options['spawn'])
+        if not http_mode and options['concurrency'] != 1:
+            raise CommandError('--concurrency needs --url or --spawn; the test client runs in-process.')
+
+        users = list(User.objects.filter(username__startswith=f'{PREFIX.lower()}_user_').order_by('id')[:max(1, options['concurrency'])])
+        if not users:
+            raise CommandError('No benchmark users found; run "manage.py seed_bench" first.')
+        self.product_ids = list(
+            Product.objects.filter(sku__startswith=f'{PREFIX}-', is_active=True, stock_quantity__gte=100)
+            .order_by('id').values_list('id', flat=True)[:1000]
+        )
+        if not self.product_ids:
+            raise CommandError('No benchmark products with stock found; run "manage.py seed_bench" first.')
+
+        scenarios = self.scenarios()
+        missing = [p.name for p in urlpatterns if p.name not in scenarios]
+        if missing:
+            self.stderr.write(f'Warning: no benchmark scenario for {", ".join(missing)}')
+        names = options['endpoints'] or [p.name for p in urlpatterns if p.name in scenarios]
+
+        process = None
+        base_url = options['url']
+        if options['spawn']:
+            port = bench.free_port()
+            process = bench.spawn_gunicorn(WSGI_APP, port, workers=options['workers'])
+            base_url = f'http://127.0.0.1:{port}'
+
+        try:
+            if http_mode:
+                sessions = [self.http_session(base_url, user) for user in users[:options['concurrency']]]
+            else:
+                sessions = [bench.ClientSession(users[0])]
+            report = {
+                'mode': 'http' if http_mode else 'client',
+                'iterations': options['iterations'],
+                'concurrency': len(sessions),
+                'endpoints': {},
+            }
+            for name in names:
+                self.stderr.write(f'  {name}...')
+                report['endpoints'][name] = self.run_scenario(
+                    scenarios[name], sessions, users, options['iterations'], options['seed'],
+                )
+        finally:
+            if process is not None:
+                bench.stop_process(process)
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(output)
+        self.stdout.write(output)
+
+    def http_session(self, base_url, user):
+        session = bench.HTTPSession(base_url)
+        status, body = session.request('POST', '/api/auth/login/', json.dumps({
+            'username': user.username, 'password': BENCH_PASSWORD,
+        }))
+        if status != 200:
+            raise CommandError(f'Login as {user.username} failed ({status}): {body[:200]!r}')
+        return session
+
+    def run_scenario(self, scenario, sessions, users, iterations, seed):
+        latencies = []
+        errors = [0]
+        lock = threading.Lock()
+        per_session = max(1, iterations // len(sessions))
+
+        def worker(index):
+            session, user = sessions[index], users[index]
+            rng = random.Random(seed + index)
+            local = []
+            local_errors = 0
+            for _ in range(per_session):
+                try:
+                    method, path, body = scenario.prepare(session, user, rng)
+                except (KeyError, IndexError, ValueError, OSError):
+                    # An untimed setup request failed (e.g. the checkout feeding cancel-order)
+                    local_errors += 1
+                    continue
+                started = time.perf_counter()
+                status, _ = session.request(method, path, body)
+                elapsed = time.perf_counter() - started
+                if scenario.finish is not None:
+                    scenario.finish(session, user, rng)
+                if status >= 400:
+                    local_errors += 1
+                else:
+                    local.append(elapsed)
+            with lock:
+                latencies.extend(local)
+                errors[0] += local_errors
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(sessions))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return bench.summarize(latencies, time.perf_counter() - started, errors[0])
+
+    # Scenarios: keyed by URL name in store/urls.py
+
+    def scenarios(self):
+        def add_product(session, rng):
+            body = json.dumps({'product_id': rng.choice(self.product_ids), 'quantity': 1})
+            session.request('POST', '/api/cart/add/', body)
+
+        def cart_item_id(session, rng):
+            add_product(session, rng)
+            _, body = session.request('GET', '/api/cart/')
+            return json.loads(body)['items'][0]['item_id']
+
+        def checkout_body():
+            return json.dumps({'shipping_address': '1 Benchmark Way', 'cod': True})
+
+        def pending_order_id(session, rng):
+            add_product(session, rng)
+            _, body = session.request('POST', '/api/checkout/', checkout_body())
+            return json.loads(body)['order_id']
+
+        def any_order_id(user):
+            return Order.objects.filter(user=user).values_list('order_id', flat=True).first()
+
+        def pick_list_id():
+            # Reprinting: packing a wave per iteration would soon run out of waiting orders
+            existing = PickList.objects.values_list('id', flat=True).first()
+            return existing or picking.create(limit=1000).pk
+
+        def login(session, user, rng):
+            return 'POST', '/api/auth/login/', json.dumps({'username': user.username, 'password': BENCH_PASSWORD})
+
+        def logout(session, user, rng):
+            session.request(*login(session, user, rng))
+            return 'POST', '/api/auth/logout/', None
+
+        def checkout(session, user, rng):
+            add_product(session, rng)
+            return 'POST', '/api/checkout/', checkout_body()
+
+        def order_detail(session, user, rng):
+            order_id = any_order_id(user) or pending_order_id(session, rng)
+            return 'GET', f'/api/orders/{order_id}/', None
+
+        scenarios = [
+            Scenario('login-user', login),
+            Scenario('logout-user', logout, finish=lambda s, u, r: s.request(*login(s, u, r))),
+            Scenario('check-auth-status', lambda s, u, r: ('GET', '/api/auth/status/', None)),
+            Scenario('product-list', lambda s, u, r: ('GET', '/api/products/', None)),
+            Scenario('product-list-fields', lambda s, u, r: ('GET', '/api/products/?fields=id,name,price', None)),
+            Scenario('product-detail', lambda s, u, r: ('GET', f'/api/products/{r.choice(self.product_ids)}/', None)),
+            Scenario('product-batch', lambda s, u, r: (
+                'GET', '/api/products/batch/?ids=' + ','.join(map(str, r.sample(self.product_ids, min(50, len(self.product_ids))))), None,
+            )),
+            Scenario('product-recommendations', lambda s, u, r: (
+                'GET', f'/api/products/{r.choice(self.product_ids)}/recommendations/', None,
+            )),
+            # Run build_catalog_snapshot first, or this measures the 404
+            Scenario('catalog-snapshot', lambda s, u, r: ('GET', '/api/catalog/snapshot/', None)),
+            Scenario('list-changes', lambda s, u, r: ('GET', '/api/changes/?since=0&limit=100', None)),
+            Scenario('get-cart', lambda s, u, r: ('GET', '/api/cart/', None)),
+            Scenario('add-to-cart', lambda s, u, r: (
+                'POST', '/api/cart/add/', json.dumps({'product_id': r.choice(self.product_ids), 'quantity': 1}),
+            )),
+            Scenario('delete-cart-item', lambda s, u, r: ('DELETE', f'/api/cart/delete/{cart_item_id(s, r)}/', None)),
+            Scenario('shipping-quote', lambda s, u, r: ('POST', '/api/shipping/quote/', json.dumps({
+                'items': [{'product_id': product_id, 'quantity': 1} for product_id in r.sample(self.product_ids, 3)],
+            }))),
+            Scenario('checkout', checkout),
+            Scenario('list-orders', lambda s, u, r: ('GET', '/api/orders/', None)),
+            Scenario('order-detail', order_detail),
+            Scenario('cancel-order', lambda s, u, r: ('POST', f'/api/orders/{pending_order_id(s, r)}/cancel/', None)),
+            Scenario('export-orders', lambda s, u, r: ('GET', '/api/export/orders/?status=DELIVERED', None)),
+            Scenario('export-order-items', lambda s, u, r: ('GET', '/api/export/order-items/?status=DELIVERED', None)),
+            Scenario('picklist', lambda s, u, r: ('GET', f'/api/fulfillment/picklist/?id={pick_list_id()}', None)),
+            Scenario('metrics', lambda s, u, r: ('GET', '/api/metrics/', None)),
+        ]
+        return {scenario.name: scenario for scenario in scenarios}
@@ -0,0 +1,90 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from store import bench
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure gunicorn cold start with the gunicorn.conf.py profile (preload + warmup) "
+        "against a bare gunicorn: time until the first successful response and the "
+        "latency of the first requests each worker serves."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/products/', help='Endpoint to probe')
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--first-requests', type=int, default=10, help='Requests timed after the server is up')
+        parser.add_argument('--runs', type=int, default=3, help='Boots per profile; the median is reported')
+
+    def handle(self, *args, **options):
+        profile = str(settings.BASE_DIR / 'gunicorn.conf.py')
+        with tempfile.NamedTemporaryFile('w', suffix='.py') as bare:
+            results = {
+                'bare': self._measure(bare.name, options),
+                'profile': self._measure(profile, options),
+            }
+        results['config'] = {k: options[k] for k in ('path', 'workers', 'first_requests', 'runs')}
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def _measure(self, config_file, options):
+        runs = [self._boot(config_file, options) for _ in range(options['runs'])]
+        median = sorted(runs, key=lambda run: run['time_to_first_response_ms'])[len(runs) // 2]
+        return {**median, 'all_runs_time_to_first_response_ms': [r['time_to_first_response_ms'] for r in runs]}
+
+    def _boot(self, config_file, options):
+        port = bench.free_port()
+        env = dict(os.environ)
+        env.setdefault('ALLOWED_HOSTS', '127.0.0.1,localhost')
+        cache_dir = bench.share_cache(env, options['workers'])
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            [
+                sys.executable, '-m', 'gunicorn', 'vibe_ecommerce.wsgi:application',
+                '--config', config_file,
+                '--bind', f'127.0.0.1:{port}',
+                '--workers', str(options['workers']),
+                '--log-level', 'warning',
+            ],
+            cwd=settings.BASE_DIR,
+            env=env,
+        )
+        process.cache_dir = cache_dir
+        try:
+            session = bench.HTTPSession(f'http://127.0.0.1:{port}')
+            while True:
+                if process.poll() is not None:
+                    raise RuntimeError(f'gunicorn exited with status {process.returncode}')
+                try:
+                    status, _ = session.request('GET', options['path'])
+                    if status == 200:
+                        break
+                except OSError:
+                    pass
+                time.sleep(0.01)
+            up = time.perf_counter() - started
+
+            latencies = []
+            for _ in range(options['first_requests']):
+                # A fresh connection per request spreads the probes across workers
+                session.close()
+                request_started = time.perf_counter()
+                session.request('GET', options['path'])
+                latencies.append(time.perf_counter() - request_started)
+            session.close()
+        finally:
+            bench.stop_process(process)
+
+        summary = bench.summarize(latencies, sum(latencies))
+        return {
+            'time_to_first_response_ms': round(up * 1000, 1),
+            'first_requests_p50_ms': summary['p50_ms'],
+            'first_requests_max_ms': summary['max_ms'],
+        }
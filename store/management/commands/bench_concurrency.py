@@ -0,0 +1,68 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from store import bench
+
+WSGI_APP = 'vibe_ecommerce.wsgi:application'
+ASGI_APP = 'vibe_ecommerce.asgi:application'
+ASGI_WORKER = 'uvicorn_worker.UvicornWorker'
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare concurrent-connection throughput of the read endpoints "
+        "served by sync gunicorn (WSGI) versus uvicorn workers (ASGI)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=64, help='Concurrent client connections')
+        parser.add_argument('--duration', type=float, default=10.0, help='Seconds of load per server')
+        parser.add_argument('--workers', type=int, default=2, help='Gunicorn workers for each server')
+        parser.add_argument('--username', help='User to log in as for the authenticated endpoints')
+        parser.add_argument('--password', help='Password for --username')
+        parser.add_argument(
+            '--path', action='append', dest='paths',
+            help='Endpoint to hit (repeatable). Defaults to the async read endpoints.',
+        )
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or ['/api/products/']
+        if not options['paths'] and options['username']:
+            paths += ['/api/cart/', '/api/orders/']
+
+        results = {}
+        for label, app, worker_class in [('wsgi', WSGI_APP, None), ('asgi', ASGI_APP, ASGI_WORKER)]:
+            port = bench.free_port()
+            self.stderr.write(f'Benchmarking {label} on port {port}...')
+            process = bench.spawn_gunicorn(app, port, workers=options['workers'], worker_class=worker_class)
+            try:
+                results[label] = bench.run_load(
+                    lambda: self._session(port, options),
+                    paths,
+                    options['concurrency'],
+                    options['duration'],
+                )
+            finally:
+                bench.stop_process(process)
+
+        wsgi_rps = results['wsgi']['throughput_rps']
+        results['asgi_vs_wsgi_throughput'] = round(results['asgi']['throughput_rps'] / wsgi_rps, 2) if wsgi_rps else None
+        results['config'] = {
+            'paths': paths,
+            'concurrency': options['concurrency'],
+            'duration_s': options['duration'],
+            'workers': options['workers'],
+        }
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def _session(self, port, options):
+        session = bench.HTTPSession(f'http://127.0.0.1:{port}')
+        if options['username']:
+            status, body = session.request('POST', '/api/auth/login/', body=json.dumps({
+                'username': options['username'],
+                'password': options['password'],
+            }))
+            if status != 200:
+                raise RuntimeError(f'Login failed ({status}): {body[:200]!r}')
+        return session
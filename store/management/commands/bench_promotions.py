@@ -0,0 +1,124 @@
+import json
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from store import bench, fx, promotions
+from store.models import Promotion
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark cart pricing against a large active rule set (10k rules by default): "
+        "compile time of the promotion index and per-cart pricing latency, compared "
+        "with testing every rule against every line."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rules', type=int, default=10_000)
+        parser.add_argument('--products', type=int, default=50_000)
+        parser.add_argument('--categories', type=int, default=200)
+        parser.add_argument('--carts', type=int, default=2_000)
+        parser.add_argument('--lines', type=int, default=10, help='Lines per cart')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        # Rules are built in memory: the benchmark measures the engine, not the database
+        rules = [self._rule(rng, n, options) for n in range(options['rules'])]
+        carts = [
+            [self._line(rng, options) for _ in range(options['lines'])]
+            for _ in range(options['carts'])
+        ]
+
+        started = time.perf_counter()
+        index = promotions.PromotionIndex('bench', rules, timezone.now())
+        compile_ms = (time.perf_counter() - started) * 1000
+
+        results = {
+            'compile_ms': round(compile_ms, 3),
+            'indexed': self._run(carts, index.price),
+            'naive': self._run(carts, lambda lines: naive_price(rules, lines)),
+            'config': {k: options[k] for k in ('rules', 'products', 'categories', 'carts', 'lines', 'seed')},
+        }
+        # Both strategies must agree, or the speedup means nothing
+        for lines in carts[:100]:
+            if index.price(lines).total != naive_price(rules, lines).total:
+                raise AssertionError(f'Indexed and naive pricing disagree for {lines}')
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def _rule(self, rng, n, options):
+        kind = rng.choices(['PERCENT', 'BUY_X_GET_Y', 'THRESHOLD'], weights=[6, 3, 1])[0]
+        promotion = Promotion(id=n + 1, name=f'Rule {n}', kind=kind)
+        if kind == 'THRESHOLD':
+            promotion.min_subtotal = Decimal(rng.randrange(50, 5000))
+            if rng.random() < 0.5:
+                promotion.percent_off = Decimal(rng.randrange(1, 20))
+            else:
+                promotion.amount_off = Decimal(rng.randrange(5, 100))
+            return promotion
+        if kind == 'PERCENT':
+            promotion.percent_off = Decimal(rng.randrange(1, 50))
+        else:
+            promotion.buy_quantity, promotion.get_quantity = rng.randrange(1, 4), 1
+        if rng.random() < 0.7:
+            promotion.product_id = rng.randrange(1, options['products'] + 1)
+        else:
+            promotion.category_id = rng.randrange(1, options['categories'] + 1)
+        return promotion
+
+    def _line(self, rng, options):
+        return (
+            rng.randrange(1, options['products'] + 1),
+            rng.randrange(1, options['categories'] + 1),
+            Decimal(rng.randrange(100, 50_000)) / 100,
+            rng.randrange(1, 6),
+        )
+
+    def _run(self, carts, price):
+        latencies = []
+        started = time.perf_counter()
+        for lines in carts:
+            request_started = time.perf_counter()
+            price(lines)
+            latencies.append(time.perf_counter() - request_started)
+        return bench.summarize(latencies, time.perf_counter() - started)
+
+
+def naive_price(rules, lines):
+    """Reference pricing: every rule is tested against every line (same results as the index)."""
+    round_amount = fx.rounder(fx.BASE_CURRENCY)
+    priced = []
+    for product_id, category_id, unit_price, quantity in lines:
+        best, best_name = Decimal('0.00'), None
+        for promotion in rules:
+            if promotion.kind == 'THRESHOLD':
+                continue
+            if promotion.product_id and promotion.product_id != product_id:
+                continue
+            if not promotion.product_id and promotion.category_id and promotion.category_id != category_id:
+                continue
+            if promotion.kind == 'PERCENT':
+                amount = round_amount(unit_price * quantity * promotion.percent_off / promotions.HUNDRED)
+            else:
+                free = quantity // (promotion.buy_quantity + promotion.get_quantity) * promotion.get_quantity
+                amount = unit_price * free
+            if amount > best:
+                best, best_name = amount, promotion.name
+        priced.append(promotions.LinePricing(unit_price * quantity, best, best_name))
+    subtotal = sum((line.subtotal for line in priced), Decimal('0.00'))
+    discounted = subtotal - sum(line.discount for line in priced)
+    cart_discount, cart_name = Decimal('0.00'), None
+    for promotion in rules:
+        if promotion.kind != 'THRESHOLD' or discounted < promotion.min_subtotal:
+            continue
+        if promotion.percent_off:
+            amount = round_amount(discounted * promotion.percent_off / promotions.HUNDRED)
+        else:
+            amount = round_amount(promotion.amount_off)
+        if amount > cart_discount:
+            cart_discount, cart_name = min(amount, discounted), promotion.name
+    return promotions.CartPricing(priced, subtotal, cart_discount, cart_name)
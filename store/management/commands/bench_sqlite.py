@@ -0,0 +1,92 @@
+import itertools
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from store import bench
+from store.management.commands.seed_bench import BENCH_PASSWORD, bench_username
+
+WSGI_APP = 'vibe_ecommerce.wsgi:application'
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare read, write and mixed throughput of the tuned SQLite profile (WAL, "
+        "pragmas, BEGIN IMMEDIATE; see store/sqlite.py) against SQLite's defaults. Each "
+        "profile gets a fresh seeded database file served by a local gunicorn."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=16, help='Concurrent client connections')
+        parser.add_argument('--duration', type=float, default=10.0, help='Seconds of load per phase')
+        parser.add_argument('--workers', type=int, default=2, help='Gunicorn workers')
+        parser.add_argument('--products', type=int, default=2000, help='Products seeded')
+
+    def handle(self, *args, **options):
+        results = {}
+        for profile in ('default', 'tuned'):
+            with tempfile.TemporaryDirectory() as directory:
+                self.stderr.write(f'Benchmarking the {profile} profile...')
+                results[profile] = self._measure(profile, os.path.join(directory, 'bench.sqlite3'), options)
+        for phase in ('read', 'write', 'mixed'):
+            default_rps = results['default'][phase]['throughput_rps']
+            results[f'{phase}_tuned_vs_default'] = (
+                round(results['tuned'][phase]['throughput_rps'] / default_rps, 2) if default_rps else None
+            )
+        results['config'] = {k: options[k] for k in ('concurrency', 'duration', 'workers', 'products')}
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def _measure(self, profile, path, options):
+        env = {'DATABASE_URL': f'sqlite:///{path}', 'SQLITE_PROFILE': profile}
+        manage = [sys.executable, 'manage.py']
+        process_env = dict(os.environ, **env)
+        for command in (
+            ['migrate', '--verbosity', '0'],
+            ['seed_bench', '--categories', '10', '--products', str(options['products']),
+             '--users', str(options['concurrency'] * 3), '--cart-ratio', '1', '--orders', '1000'],
+        ):
+            subprocess.run(manage + command, cwd=settings.BASE_DIR, env=process_env, check=True, stdout=subprocess.DEVNULL)
+        with sqlite3.connect(path) as db:
+            # Every user starts with a cart, and enough stock that checkouts never run out
+            db.execute('UPDATE store_product SET stock_quantity = 1000000000, is_active = 1')
+            product_id = db.execute('SELECT MIN(id) FROM store_product').fetchone()[0]
+        db.close()
+
+        add = ('POST', '/api/cart/add/', json.dumps({'product_id': product_id, 'quantity': 1}))
+        checkout = ('POST', '/api/checkout/', json.dumps({}))
+        phases = {
+            'read': ['/api/products/?sort=newest&limit=20', '/api/orders/'],
+            'write': [add, checkout],
+            'mixed': ['/api/products/?sort=newest&limit=20', add, '/api/orders/', checkout],
+        }
+        port = bench.free_port()
+        process = bench.spawn_gunicorn(WSGI_APP, port, workers=options['workers'], env=env)
+        # Each connection of each phase logs in as a fresh bench user, so every writer
+        # has its own cart and starts with the seeded one
+        users = itertools.count()
+        try:
+            return {
+                phase: bench.run_load(self._sessions(port, users), paths, options['concurrency'], options['duration'])
+                for phase, paths in phases.items()
+            }
+        finally:
+            bench.stop_process(process)
+
+    def _sessions(self, port, users):
+        def make_session():
+            session = bench.HTTPSession(f'http://127.0.0.1:{port}')
+            status, body = session.request('POST', '/api/auth/login/', body=json.dumps({
+                'username': bench_username(next(users)),
+                'password': BENCH_PASSWORD,
+            }))
+            if status != 200:
+                raise RuntimeError(f'Login failed ({status}): {body[:200]!r}')
+            return session
+
+        return make_session
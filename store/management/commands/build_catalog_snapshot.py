@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from store import snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the active catalog as paginated, content-hashed, precompressed JSON under "
+        "STATIC_ROOT and point catalog/snapshot/ at its manifest. With --if-stale, only when "
+        "catalog changes are pending and have settled; --watch keeps doing that until interrupted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--if-stale', action='store_true', help='Only build when a rebuild is due')
+        parser.add_argument('--watch', action='store_true', help='Rebuild whenever one is due, until interrupted')
+        parser.add_argument('--poll', type=float, default=5.0, help='Seconds between checks with --watch')
+
+    def handle(self, *args, **options):
+        if not options['watch']:
+            if options['if_stale'] and not snapshots.is_due():
+                self.stdout.write('Catalog snapshot is up to date')
+                return
+            self.build()
+            return
+        try:
+            while True:
+                if snapshots.is_due():
+                    self.build()
+                time.sleep(options['poll'])
+        except KeyboardInterrupt:
+            pass
+
+    def build(self):
+        started = time.perf_counter()
+        pointer = snapshots.build()
+        self.stdout.write(self.style.SUCCESS(
+            f'Catalog snapshot {pointer.version}: {pointer.count} products at {pointer.manifest} '
+            f'({time.perf_counter() - started:.1f}s)'
+        ))
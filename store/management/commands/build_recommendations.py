@@ -0,0 +1,44 @@
+import time
+from itertools import chain
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from store import recommendations
+from store.models import OrderItem
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the \"frequently bought together\" file from order history: stream "
+        "(order, product) pairs, count co-occurrences and keep the top-K neighbours per "
+        "product in RECOMMENDATIONS_FILE, which web workers memory-map."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=settings.RECOMMENDATIONS_TOP_K)
+        parser.add_argument(
+            '--max-basket', type=int, default=settings.RECOMMENDATIONS_MAX_BASKET,
+            help='Skip orders with more distinct products than this',
+        )
+        parser.add_argument('--chunk-size', type=int, default=20_000, help='Rows fetched per round trip')
+        parser.add_argument('--output', default=settings.RECOMMENDATIONS_FILE)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        # The (order, product) pairs only, in order, streamed with a server-side cursor where supported;
+        # shard after shard, which keeps each order's pairs together
+        pairs = chain.from_iterable(
+            OrderItem.objects.using(alias).exclude(order__status='CANCELLED')
+            .order_by('order_id')
+            .values_list('order_id', 'product_id')
+            .iterator(chunk_size=options['chunk_size'])
+            for alias in settings.ORDER_SHARDS
+        )
+        counts = recommendations.count_pairs(pairs, options['max_basket'])
+        counted = time.perf_counter()
+        products, neighbours = recommendations.write(options['output'], counts, options['top_k'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {neighbours} neighbours for {products} products to {options["output"]} '
+            f'(counting {counted - started:.1f}s, writing {time.perf_counter() - counted:.1f}s)'
+        ))
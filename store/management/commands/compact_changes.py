@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from store import changes
+
+
+class Command(BaseCommand):
+    help = (
+        "Compact the change feed: delete entries superseded by a newer change to the same "
+        "object, then entries older than CHANGE_LOG_RETENTION_DAYS (cursors from before "
+        "that point must resync). Meant to run periodically, e.g. hourly."
+    )
+
+    def handle(self, *args, **options):
+        collapsed, expired = changes.compact()
+        self.stdout.write(f'Superseded entries removed: {collapsed}')
+        self.stdout.write(f'Expired entries removed: {expired}')
@@ -0,0 +1,63 @@
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from store import picking
+from store.models import PickList
+
+
+class Command(BaseCommand):
+    help = (
+        "Pack a wave of waiting orders: move the oldest PENDING/ACCEPTED orders to PACKED and "
+        "write their pick list (quantities per product, by category and SKU) as JSON or CSV. "
+        "With --reprint, write an existing pick list again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--status', action='append', choices=picking.WAITING,
+            help='Only orders in this status (repeatable); default both',
+        )
+        parser.add_argument('--limit', type=int, default=settings.PICKLIST_MAX_ORDERS, help='Orders in the wave at most')
+        parser.add_argument('--created-before', help='Only orders created before this day (YYYY-MM-DD)')
+        parser.add_argument('--format', choices=('json', 'csv'), default='csv')
+        parser.add_argument('--output', help='File to write to; default stdout')
+        parser.add_argument('--reprint', type=int, metavar='ID', help='Write pick list ID again instead of packing')
+
+    def handle(self, *args, **options):
+        if not 1 <= options['limit'] <= settings.PICKLIST_MAX_ORDERS:
+            raise CommandError(f'--limit must be between 1 and {settings.PICKLIST_MAX_ORDERS}')
+        started = time.perf_counter()
+        if options['reprint']:
+            try:
+                pick_list = PickList.objects.get(pk=options['reprint'])
+            except PickList.DoesNotExist:
+                raise CommandError(f'No pick list {options["reprint"]}')
+        else:
+            created_before = None
+            if options['created_before']:
+                day = parse_date(options['created_before'])
+                if day is None:
+                    raise CommandError('--created-before must be YYYY-MM-DD')
+                created_before = timezone.make_aware(datetime.combine(day, datetime.min.time()))
+            pick_list = picking.create(options['status'] or picking.WAITING, options['limit'], created_before)
+            if pick_list is None:
+                self.stderr.write('No orders waiting to be packed')
+                return
+        packed = time.perf_counter()
+
+        chunks = picking.iter_csv(pick_list) if options['format'] == 'csv' else picking.iter_json(pick_list)
+        if options['output']:
+            with open(options['output'], 'w', newline='') as fh:
+                fh.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+        self.stderr.write(
+            f'Pick list #{pick_list.pk}: {pick_list.order_count} orders '
+            f'(packing {packed - started:.2f}s, list {time.perf_counter() - packed:.2f}s)'
+        )
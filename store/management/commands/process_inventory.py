@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+
+from store import inventory
+from store.models import Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the incremental stock ledger jobs: snapshot the products whose stock moved "
+        "since the last run and open or resolve their low-stock alerts. Meant to run "
+        "periodically (e.g. every minute from cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify', action='store_true',
+            help='Also rebuild every product\'s stock from the ledger and report mismatches',
+        )
+
+    def handle(self, *args, **options):
+        snapshots = inventory.take_snapshots()
+        opened, resolved = inventory.detect_low_stock()
+        self.stdout.write(f'Snapshots written: {snapshots}')
+        self.stdout.write(f'Low-stock alerts opened: {opened}, resolved: {resolved}')
+        if options['verify']:
+            self.verify()
+
+    def verify(self):
+        mismatches = 0
+        products = Product.objects.values_list('pk', 'stock_quantity').order_by('pk')
+        batch = []
+        for row in products.iterator(chunk_size=inventory.SNAPSHOT_BATCH_SIZE):
+            batch.append(row)
+            if len(batch) == inventory.SNAPSHOT_BATCH_SIZE:
+                mismatches += self._verify_batch(batch)
+                batch = []
+        mismatches += self._verify_batch(batch)
+        style = self.style.SUCCESS if not mismatches else self.style.ERROR
+        self.stdout.write(style(f'Ledger mismatches: {mismatches}'))
+
+    def _verify_batch(self, batch):
+        ledger = inventory.ledger_stock([pk for pk, _ in batch])
+        mismatches = 0
+        for pk, stock in batch:
+            if ledger[pk] != stock:
+                mismatches += 1
+                self.stdout.write(f'  product {pk}: stock {stock}, ledger {ledger[pk]}')
+        return mismatches
@@ -0,0 +1,180 @@
+import random
+import time
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum
+
+from store.models import Cart, CartItem, Category, Order, OrderItem, Product, StockMovement
+
+# Everything generated here is tagged with this prefix so it can be found and flushed
+PREFIX = 'BENCH'
+BENCH_PASSWORD = 'bench-password'
+ORDER_STATUSES = [code for code, _ in Order.STATUS_CHOICES]
+
+
+def bench_username(n):
+    return f'{PREFIX.lower()}_user_{n:06d}'
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-generate a deterministic benchmark dataset: categories, products, users, "
+        f"active carts and orders with items. Users log in with password '{BENCH_PASSWORD}'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=42, help='Random seed; same seed, same data')
+        parser.add_argument('--categories', type=int, default=50)
+        parser.add_argument('--products', type=int, default=1_000_000)
+        parser.add_argument('--users', type=int, default=10_000)
+        parser.add_argument('--cart-ratio', type=float, default=0.5, help='Fraction of users with an active cart')
+        parser.add_argument('--max-cart-lines', type=int, default=10)
+        parser.add_argument('--orders', type=int, default=200_000)
+        parser.add_argument('--max-order-lines', type=int, default=5)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--flush', action='store_true', help='Delete previously generated benchmark data first')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        started = time.perf_counter()
+
+        if options['flush']:
+            self.flush()
+
+        category_ids = self.seed_categories(options['categories'])
+        product_ids = self.seed_products(options['products'], category_ids)
+        user_ids = self.seed_users(options['users'])
+        self.seed_carts(user_ids, product_ids, options['cart_ratio'], options['max_cart_lines'])
+        self.seed_orders(user_ids, product_ids, options['orders'], options['max_order_lines'])
+
+        self.stdout.write(self.style.SUCCESS(f'Seeded benchmark data in {time.perf_counter() - started:.1f}s'))
+
+    def flush(self):
+        self.stdout.write('Flushing previous benchmark data...')
+        with transaction.atomic():
+            OrderItem.objects.filter(order__order_id__startswith=f'{PREFIX}-').delete()
+            Order.objects.filter(order_id__startswith=f'{PREFIX}-').delete()
+            User.objects.filter(username__startswith=f'{PREFIX.lower()}_user_').delete()
+            Product.objects.filter(sku__startswith=f'{PREFIX}-').delete()
+            Category.objects.filter(name__startswith=f'{PREFIX} ').delete()
+
+    def bulk_insert(self, model, rows, total, label):
+        """Insert the objects produced by the ``rows`` generator in batches of --batch-size."""
+        batch = []
+        inserted = 0
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                inserted += self._flush_batch(model, batch)
+                self.stdout.write(f'  {label}: {inserted}/{total}', ending='\r')
+        inserted += self._flush_batch(model, batch)
+        self.stdout.write(f'  {label}: {inserted}/{total}')
+
+    def _flush_batch(self, model, batch):
+        count = len(batch)
+        if count:
+            with transaction.atomic():
+                model.objects.bulk_create(batch, batch_size=self.batch_size)
+            batch.clear()
+        return count
+
+    def seed_categories(self, count):
+        self.bulk_insert(Category, (
+            Category(name=f'{PREFIX} Category {n:04d}', description=f'Benchmark category {n}')
+            for n in range(count)
+        ), count, 'categories')
+        return list(Category.objects.filter(name__startswith=f'{PREFIX} ').order_by('id').values_list('id', flat=True))
+
+    def seed_products(self, count, category_ids):
+        rng = self.rng
+
+        def rows():
+            for n in range(count):
+                yield Product(
+                    name=f'{PREFIX} Product {n:07d}',
+                    description=f'Benchmark product {n}. ' * rng.randint(1, 20),
+                    price=Decimal(rng.randint(100, 500_000)) / 100,
+                    category_id=rng.choice(category_ids),
+                    stock_quantity=rng.randint(0, 1000),
+                    is_active=rng.random() < 0.95,
+                    sku=f'{PREFIX}-{n:07d}',
+                    weight=Decimal(rng.randint(10, 500_000)) / 100,
+                    length=Decimal(rng.randint(100, 20_000)) / 100,
+                    width=Decimal(rng.randint(100, 20_000)) / 100,
+                    height=Decimal(rng.randint(100, 20_000)) / 100,
+                )
+
+        self.bulk_insert(Product, rows(), count, 'products')
+        products = Product.objects.filter(sku__startswith=f'{PREFIX}-').order_by('id')
+        # bulk_create skips Product.save(), so the stock ledger is seeded here
+        self.bulk_insert(StockMovement, (
+            StockMovement(product_id=pk, delta=stock, reason='INITIAL')
+            for pk, stock in products.exclude(stock_quantity=0).values_list('id', 'stock_quantity').iterator()
+        ), count, 'stock movements')
+        return list(products.values_list('id', flat=True))
+
+    def seed_users(self, count):
+        # Hash once: hashing per user would dominate the runtime
+        password = make_password(BENCH_PASSWORD)
+        self.bulk_insert(User, (
+            # The first user is staff so staff-only endpoints can be benchmarked too
+            User(username=bench_username(n), email=f'{bench_username(n)}@example.com', password=password, is_staff=n == 0)
+            for n in range(count)
+        ), count, 'users')
+        return list(User.objects.filter(username__startswith=f'{PREFIX.lower()}_user_').order_by('id').values_list('id', flat=True))
+
+    def seed_carts(self, user_ids, product_ids, ratio, max_lines):
+        rng = self.rng
+        cart_users = [user_id for user_id in user_ids if rng.random() < ratio]
+        self.bulk_insert(Cart, (Cart(user_id=user_id, is_active=True) for user_id in cart_users), len(cart_users), 'carts')
+        carts = Cart.objects.filter(user__username__startswith=f'{PREFIX.lower()}_user_', is_active=True).order_by('id').values_list('id', flat=True).iterator()
+
+        def rows():
+            for cart_id in carts:
+                for product_id in rng.sample(product_ids, rng.randint(1, max_lines)):
+                    yield CartItem(
+                        cart_id=cart_id, product_id=product_id, quantity=rng.randint(1, 3),
+                        price=Decimal(rng.randint(100, 500_000)) / 100,
+                    )
+
+        self.bulk_insert(CartItem, rows(), '?', 'cart items')
+
+    def seed_orders(self, user_ids, product_ids, count, max_lines):
+        rng = self.rng
+        self.bulk_insert(Order, (
+            Order(
+                order_id=f'{PREFIX}-{n:08d}',
+                user_id=rng.choice(user_ids),
+                status=rng.choice(ORDER_STATUSES),
+                total_price=0,
+                shipping_address='1 Benchmark Way',
+                billing_address='1 Benchmark Way',
+                cod=True,
+            )
+            for n in range(count)
+        ), count, 'orders')
+        orders = Order.objects.filter(order_id__startswith=f'{PREFIX}-').order_by('id').values_list('id', flat=True).iterator()
+
+        def rows():
+            for order_id in orders:
+                for product_id in rng.sample(product_ids, rng.randint(1, max_lines)):
+                    yield OrderItem(
+                        order_id=order_id, product_id=product_id, quantity=rng.randint(1, 3),
+                        price=Decimal(rng.randint(100, 500_000)) / 100,
+                    )
+
+        self.bulk_insert(OrderItem, rows(), '?', 'order items')
+
+        # Fill in order totals from the generated lines in one statement
+        line_totals = (
+            OrderItem.objects.filter(order=OuterRef('pk'))
+            .values('order')
+            .annotate(total=Sum(F('price') * F('quantity'), output_field=DecimalField(max_digits=10, decimal_places=2)))
+            .values('total')
+        )
+        Order.objects.filter(order_id__startswith=f'{PREFIX}-').update(total_price=Subquery(line_totals))
@@ -0,0 +1,232 @@
+import json
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Sum
+
+from store import bench
+from store.models import CartItem, Category, Order, OrderItem, Product, StockMovement
+
+WSGI_APP = 'vibe_ecommerce.wsgi:application'
+# Everything created here is tagged so a rerun can flush it
+PREFIX = 'stress'
+PASSWORD = 'stress-password'
+
+
+class Command(BaseCommand):
+    help = (
+        "Stress add_to_cart, checkout and cancel_order with many concurrent clients sharing "
+        "a few users and SKUs against a local gunicorn on the configured database (SQLite "
+        "in WAL mode or Postgres), then check invariants: no oversell, no duplicate order_id, "
+        "no lost cart lines, no server errors. Reports transactions per second and fails "
+        "when an invariant does not hold."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=200, help='Concurrent client connections')
+        parser.add_argument('--users', type=int, default=20, help='Users the clients share')
+        parser.add_argument('--skus', type=int, default=5, help='Products the clients compete for')
+        parser.add_argument('--stock', type=int, default=500, help='Initial stock of each product')
+        parser.add_argument('--duration', type=float, default=20.0, help='Seconds of load')
+        parser.add_argument('--workers', type=int, default=2, help='Gunicorn workers')
+        parser.add_argument('--threads', type=int, default=8, help='Threads per gunicorn worker')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        users, products = self._setup(options)
+        initial_stock = {product.pk: options['stock'] for product in products}
+        # The server processes get their own connections; SQLite must not see ours hold a lock
+        connections.close_all()
+
+        port = bench.free_port()
+        process = bench.spawn_gunicorn(
+            WSGI_APP, port, workers=options['workers'],
+            env={'GUNICORN_THREADS': str(options['threads'])},
+        )
+        try:
+            cookies = {user.pk: self._login(port, user.username) for user in users}
+            stats = self._run(port, users, products, cookies, options)
+        finally:
+            bench.stop_process(process)
+
+        violations = self._check(users, products, initial_stock, stats)
+        elapsed = stats['elapsed']
+        committed = stats['ok']['add'] + stats['ok']['checkout'] + stats['ok']['cancel']
+        report = {
+            'transactions': committed,
+            'transactions_per_s': round(committed / elapsed, 1),
+            'requests_per_s': round(stats['requests'] / elapsed, 1),
+            'ok': dict(stats['ok']),
+            'rejected': dict(stats['rejected']),
+            'server_errors': dict(stats['errors']),
+            'latency': bench.summarize(stats['latencies'], elapsed, sum(stats['errors'].values())),
+            'violations': violations,
+            'config': {k: options[k] for k in ('clients', 'users', 'skus', 'stock', 'duration', 'workers', 'threads', 'seed')},
+        }
+        self.stdout.write(json.dumps(report, indent=2))
+        if violations:
+            raise CommandError(f'{len(violations)} invariant violation(s)')
+
+    def _setup(self, options):
+        User.objects.filter(username__startswith=f'{PREFIX}_user_').delete()
+        Product.objects.filter(sku__startswith=f'{PREFIX.upper()}-').delete()
+        password = make_password(PASSWORD)
+        User.objects.bulk_create([
+            User(username=f'{PREFIX}_user_{n:04d}', password=password) for n in range(options['users'])
+        ])
+        category, _ = Category.objects.get_or_create(name='Stress test')
+        products = [
+            # create() goes through Product.save(), so the stock ledger starts consistent
+            Product.objects.create(
+                name=f'Stress SKU {n}', description='', category=category, price=10 + n,
+                stock_quantity=options['stock'], sku=f'{PREFIX.upper()}-{n:04d}',
+            )
+            for n in range(options['skus'])
+        ]
+        users = list(User.objects.filter(username__startswith=f'{PREFIX}_user_').order_by('pk'))
+        return users, products
+
+    def _login(self, port, username):
+        # One login per user, shared by all of its clients: password hashing would
+        # otherwise dominate the warm-up
+        session = bench.HTTPSession(f'http://127.0.0.1:{port}')
+        status, body = session.request('POST', '/api/auth/login/', body=json.dumps({
+            'username': username, 'password': PASSWORD,
+        }))
+        if status != 200:
+            raise CommandError(f'Login failed ({status}): {body[:200]!r}')
+        session.close()
+        return dict(session.cookies)
+
+    def _run(self, port, users, products, cookies, options):
+        lock = threading.Lock()
+        stats = {
+            'ok': Counter(), 'rejected': Counter(), 'errors': Counter(), 'latencies': [], 'requests': 0,
+            # Quantities the server accepted into each user's cart, per product
+            'added': Counter(),
+            'orders': [], 'cancelled': [],
+        }
+        ready = threading.Barrier(options['clients'] + 1)
+        deadline = [0.0]
+
+        def client(n):
+            rng = random.Random(options['seed'] + n)
+            user = users[n % len(users)]
+            session = bench.HTTPSession(f'http://127.0.0.1:{port}')
+            session.cookies.update(cookies[user.pk])
+            local = {
+                'ok': Counter(), 'rejected': Counter(), 'errors': Counter(), 'latencies': [], 'requests': 0,
+                'added': Counter(), 'orders': [], 'cancelled': [],
+            }
+            ready.wait()
+            while time.perf_counter() < deadline[0]:
+                roll = rng.random()
+                if roll < 0.6:
+                    kind, product = 'add', rng.choice(products)
+                    quantity = rng.randint(1, 3)
+                    method, path, body = 'POST', '/api/cart/add/', json.dumps({'product_id': product.pk, 'quantity': quantity})
+                elif roll < 0.85:
+                    kind, method, path, body = 'checkout', 'POST', '/api/checkout/', json.dumps({})
+                elif roll < 0.95 and local['orders']:
+                    kind, method, body = 'cancel', 'POST', None
+                    path = f"/api/orders/{rng.choice(local['orders'])}/cancel/"
+                else:
+                    kind, method, path, body = 'cart', 'GET', '/api/cart/', None
+                started = time.perf_counter()
+                try:
+                    status, payload = session.request(method, path, body=body)
+                except OSError:
+                    local['errors'][f'{kind} connection'] += 1
+                    continue
+                local['requests'] += 1
+                local['latencies'].append(time.perf_counter() - started)
+                if status >= 500:
+                    local['errors'][f'{kind} {status}'] += 1
+                elif status >= 400:
+                    local['rejected'][f'{kind} {status}'] += 1
+                else:
+                    local['ok'][kind] += 1
+                    if kind == 'add':
+                        local['added'][(user.pk, product.pk)] += quantity
+                    elif kind == 'checkout':
+                        local['orders'].append(json.loads(payload)['order_id'])
+                    elif kind == 'cancel':
+                        local['cancelled'].append(path.split('/')[3])
+            session.close()
+            with lock:
+                for key in ('ok', 'rejected', 'errors', 'added'):
+                    stats[key].update(local[key])
+                for key in ('latencies', 'orders', 'cancelled'):
+                    stats[key].extend(local[key])
+                stats['requests'] += local['requests']
+
+        threads = [threading.Thread(target=client, args=(n,), daemon=True) for n in range(options['clients'])]
+        for thread in threads:
+            thread.start()
+        started = time.perf_counter()
+        deadline[0] = started + options['duration']
+        ready.wait()
+        for thread in threads:
+            thread.join()
+        stats['elapsed'] = time.perf_counter() - started
+        return stats
+
+    def _check(self, users, products, initial_stock, stats):
+        violations = []
+        orders = Order.objects.filter(user__in=users)
+
+        # Every order the clients were told about exists once, and no other was placed
+        placed = Counter(stats['orders'])
+        duplicates = [order_id for order_id, count in placed.items() if count > 1]
+        if duplicates:
+            violations.append(f'order_id returned more than once: {duplicates[:10]}')
+        stored = set(orders.values_list('order_id', flat=True))
+        if stored != set(placed):
+            violations.append(
+                f'orders in the database ({len(stored)}) differ from orders confirmed to clients ({len(placed)})'
+            )
+        cancelled = set(orders.filter(status='CANCELLED').values_list('order_id', flat=True))
+        if len(stats['cancelled']) != len(set(stats['cancelled'])) or cancelled != set(stats['cancelled']):
+            violations.append(
+                f'{len(stats["cancelled"])} cancellations confirmed, {len(cancelled)} orders cancelled'
+            )
+
+        # No oversell: stock never negative and equal to what was not sold or was returned
+        sold = dict(
+            OrderItem.objects.filter(order__user__in=users).exclude(order__status='CANCELLED')
+            .values_list('product').annotate(total=Sum('quantity')).order_by()
+        )
+        ledger = dict(
+            StockMovement.objects.filter(product__in=products)
+            .values_list('product').annotate(total=Sum('delta')).order_by()
+        )
+        for product in Product.objects.filter(pk__in=initial_stock):
+            expected = initial_stock[product.pk] - sold.get(product.pk, 0)
+            if product.stock_quantity < 0 or product.stock_quantity != expected:
+                violations.append(f'{product.sku}: stock {product.stock_quantity}, expected {expected}')
+            if ledger.get(product.pk) != product.stock_quantity:
+                violations.append(f'{product.sku}: ledger sums to {ledger.get(product.pk)}, stock is {product.stock_quantity}')
+
+        # No lost cart lines: everything accepted into a cart was ordered or is still in the cart
+        accounted = defaultdict(int)
+        for user_id, product_id, quantity in OrderItem.objects.filter(order__user__in=users).values_list(
+            'order__user', 'product', 'quantity',
+        ):
+            accounted[(user_id, product_id)] += quantity
+        for user_id, product_id, quantity in CartItem.objects.filter(cart__user__in=users, cart__is_active=True).values_list(
+            'cart__user', 'product', 'quantity',
+        ):
+            accounted[(user_id, product_id)] += quantity
+        lost = {key: stats['added'][key] - accounted.get(key, 0) for key in stats['added'] if stats['added'][key] != accounted.get(key, 0)}
+        if lost:
+            violations.append(f'cart quantities accepted but neither ordered nor in the cart: {dict(list(lost.items())[:10])}')
+
+        if stats['errors']:
+            violations.append(f'server errors: {dict(stats["errors"])}')
+        return violations
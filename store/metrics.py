@@ -0,0 +1,156 @@
+"""
+Per-process request metrics.
+
+Histograms are plain lists of bucket counters updated without locks: under a
+threaded worker two concurrent observations can very rarely lose an increment,
+which is an acceptable trade for keeping the hot path free of lock contention.
+Each gunicorn worker keeps its own numbers, so /api/metrics/ reports the worker
+that served the scrape; aggregate across workers in Prometheus. Requests made
+inside ``not_recorded()``, like the warmup's, stay out of the histograms.
+"""
+import time
+from bisect import bisect_left
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+from django.http import JsonResponse as DjangoJsonResponse
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+_current_stats = ContextVar('store_request_stats', default=None)
+_recording = ContextVar('store_metrics_recording', default=True)
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'total')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # One counter per bucket plus the +Inf bucket
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+
+class Registry:
+    """Histograms keyed by metric name and a single ``view`` label."""
+
+    def __init__(self):
+        self.metrics = {}
+
+    def histogram(self, name, help_text, buckets):
+        # setdefault keeps registration race-free without a lock
+        return self.metrics.setdefault(name, (help_text, buckets, {}))
+
+    def observe(self, name, view, value):
+        _, buckets, series = self.metrics[name]
+        histogram = series.get(view)
+        if histogram is None:
+            histogram = series.setdefault(view, Histogram(buckets))
+        histogram.observe(value)
+
+    def render(self):
+        """Render every histogram in the Prometheus text exposition format."""
+        lines = []
+        for name, (help_text, buckets, series) in sorted(self.metrics.items()):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} histogram')
+            for view, histogram in sorted(series.items()):
+                label = f'view="{view}"'
+                cumulative = 0
+                for bound, count in zip(buckets + ('+Inf',), list(histogram.counts)):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{label},le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_sum{{{label}}} {histogram.total}')
+                lines.append(f'{name}_count{{{label}}} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+registry.histogram('store_request_duration_seconds', 'Total time spent handling the request.', LATENCY_BUCKETS)
+registry.histogram('store_request_db_seconds', 'Time spent executing database queries.', LATENCY_BUCKETS)
+registry.histogram('store_request_serialization_seconds', 'Time spent encoding JSON responses.', LATENCY_BUCKETS)
+registry.histogram('store_request_queries', 'Number of database queries per request.', QUERY_COUNT_BUCKETS)
+registry.histogram('store_request_compression_seconds', 'Time spent compressing response bodies.', LATENCY_BUCKETS)
+registry.histogram('store_response_bytes', 'Response body size before compression.', SIZE_BUCKETS)
+registry.histogram('store_response_sent_bytes', 'Response body size as sent.', SIZE_BUCKETS)
+
+
+class RequestStats:
+    """
+    Timings for one request, filled in by the DB execute wrapper, JsonResponse
+    and CompressionMiddleware.
+    """
+    __slots__ = ('queries', 'db_time', 'serialize_time', 'encoding', 'compress_time', 'compression_cached', 'raw_bytes')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.encoding = None
+        self.compress_time = 0.0
+        self.compression_cached = False
+        self.raw_bytes = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+    def capture(self):
+        """Context manager that installs this object as execute wrapper on every connection."""
+        stack = ExitStack()
+        for conn in connections.all():
+            stack.enter_context(conn.execute_wrapper(self))
+        return stack
+
+
+def start_request():
+    """Begin collecting stats for the current context; returns (stats, token)."""
+    stats = RequestStats()
+    return stats, _current_stats.set(stats)
+
+
+def end_request(token):
+    _current_stats.reset(token)
+
+
+@contextmanager
+def not_recorded():
+    """Leave the requests handled inside out of the histograms."""
+    token = _recording.set(False)
+    try:
+        yield
+    finally:
+        _recording.reset(token)
+
+
+def recording():
+    return _recording.get()
+
+
+def current_stats():
+    """The RequestStats of the request being handled, or None outside PerformanceMiddleware."""
+    return _current_stats.get()
+
+
+class JsonResponse(DjangoJsonResponse):
+    """JsonResponse that records its encoding time on the current request's stats."""
+
+    def __init__(self, *args, **kwargs):
+        stats = _current_stats.get()
+        if stats is None:
+            super().__init__(*args, **kwargs)
+            return
+        started = time.perf_counter()
+        super().__init__(*args, **kwargs)
+        stats.serialize_time += time.perf_counter() - started
@@ -0,0 +1,211 @@
+import os
+import time
+from urllib.parse import urlparse
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+from whitenoise.middleware import WhiteNoiseMiddleware
+from whitenoise.responders import MissingFileError
+
+from . import compression, metrics, snapshots
+
+
+class PerformanceMiddleware:
+    """
+    Records per-endpoint latency, query count, DB time and JSON serialization
+    time into the per-process histograms in ``store.metrics`` and reports the
+    same numbers to the client in a ``Server-Timing`` header.
+
+    Should be first in MIDDLEWARE so session/auth queries are included.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        stats, token = metrics.start_request()
+        try:
+            with stats.capture():
+                response = self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        return self.finish(request, response, stats, started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        stats, token = metrics.start_request()
+        try:
+            with stats.capture():
+                response = await self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        return self.finish(request, response, stats, started)
+
+    def finish(self, request, response, stats, started):
+        total = time.perf_counter() - started
+        match = request.resolver_match
+        view = match.view_name if match is not None else 'unresolved'
+
+        recorded = metrics.recording()
+        registry = metrics.registry
+        if recorded:
+            registry.observe('store_request_duration_seconds', view, total)
+            registry.observe('store_request_db_seconds', view, stats.db_time)
+            registry.observe('store_request_serialization_seconds', view, stats.serialize_time)
+            registry.observe('store_request_queries', view, stats.queries)
+
+        timing = (
+            f'db;dur={stats.db_time * 1000:.3f};desc="{stats.queries} queries", '
+            f'ser;dur={stats.serialize_time * 1000:.3f}, '
+        )
+        if not response.streaming:
+            sent = len(response.content)
+            raw = stats.raw_bytes if stats.raw_bytes is not None else sent
+            if recorded:
+                registry.observe('store_response_bytes', view, raw)
+                registry.observe('store_response_sent_bytes', view, sent)
+            if stats.encoding:
+                if recorded:
+                    registry.observe('store_request_compression_seconds', view, stats.compress_time)
+                cached = ' cached' if stats.compression_cached else ''
+                timing += f'comp;dur={stats.compress_time * 1000:.3f};desc="{stats.encoding}{cached} {raw}/{sent} bytes", '
+        response['Server-Timing'] = timing + f'total;dur={total * 1000:.3f}'
+        return response
+
+
+class CompressionMiddleware:
+    """
+    Compresses JSON and text responses of at least COMPRESSION_MIN_SIZE bytes with
+    the best encoding the client accepts (brotli when installed, else gzip).
+    Responses marked with ``compression.mark_cacheable`` are compressed once and
+    served from the shared cache afterwards. Sizes and compression time are
+    recorded on the request stats for PerformanceMiddleware to report.
+
+    Goes right after PerformanceMiddleware, before anything that reads the body.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        encoding, key = self.plan(request, response)
+        if encoding is None:
+            return response
+        body = cache.get(key) if key else None
+        cached = body is not None
+        if not cached:
+            body = self.compress(response, encoding, key)
+            if key:
+                cache.set(key, body, settings.COMPRESSION_CACHE_TIMEOUT)
+        return self.apply(response, encoding, body, cached)
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        encoding, key = self.plan(request, response)
+        if encoding is None:
+            return response
+        body = await cache.aget(key) if key else None
+        cached = body is not None
+        if not cached:
+            body = self.compress(response, encoding, key)
+            if key:
+                await cache.aset(key, body, settings.COMPRESSION_CACHE_TIMEOUT)
+        return self.apply(response, encoding, body, cached)
+
+    def plan(self, request, response):
+        """Return (encoding, cache key) for the response, or (None, None) to send it as is."""
+        if not compression.is_compressible(response):
+            return None, None
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = compression.negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return None, None
+        key = getattr(response, 'compression_cache_key', None)
+        return encoding, key and compression.cache_key(key, encoding)
+
+    def compress(self, response, encoding, key):
+        started = time.perf_counter()
+        body = compression.compress(response.content, encoding, cached=bool(key))
+        stats = metrics.current_stats()
+        if stats is not None:
+            stats.compress_time += time.perf_counter() - started
+        return body
+
+    def apply(self, response, encoding, body, cached):
+        if len(body) >= len(response.content):
+            # Not worth it; send the original
+            return response
+        stats = metrics.current_stats()
+        if stats is not None:
+            stats.encoding = encoding
+            stats.compression_cached = cached
+            stats.raw_bytes = len(response.content)
+        response.content = body
+        response['Content-Length'] = str(len(body))
+        response['Content-Encoding'] = encoding
+        # Same weakening as Django's GZipMiddleware: the bytes changed, the entity did not
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise, plus the catalog snapshot files (see store/snapshots.py).
+
+    WhiteNoise indexes STATIC_ROOT once at startup, so files a later
+    ``build_catalog_snapshot`` writes would 404. Requests under the snapshot
+    directory that miss the index are looked up on disk and added to it, and
+    snapshot files, being content-addressed, get far-future immutable cache
+    headers. Takes WhiteNoiseMiddleware's place in MIDDLEWARE.
+    """
+
+    def __init__(self, get_response=None, settings=settings):
+        # Before WhiteNoise indexes STATIC_ROOT: immutable_file_test() needs it
+        self.snapshot_prefix = urlparse(snapshots.url_prefix()).path
+        super().__init__(get_response, settings)
+
+    def __call__(self, request):
+        path = request.path_info
+        if path.startswith(self.snapshot_prefix) and path not in self.files and not self.autorefresh:
+            static_file = self.find_snapshot(path)
+            if static_file is not None:
+                self.files[path] = static_file
+        try:
+            return super().__call__(request)
+        except FileNotFoundError:
+            # Collected by a newer build since it was indexed
+            self.files.pop(path, None)
+            return self.get_response(request)
+
+    def find_snapshot(self, url):
+        name = url[len(self.snapshot_prefix):]
+        # Only names snapshots.build() writes, which also rules out any path traversal
+        if not snapshots.SNAPSHOT_NAME.fullmatch(name):
+            return None
+        try:
+            return self.get_static_file(os.path.join(snapshots.directory(), name), url)
+        except MissingFileError:
+            return None
+
+    def immutable_file_test(self, path, url):
+        if url.startswith(self.snapshot_prefix) and snapshots.SNAPSHOT_NAME.fullmatch(url[len(self.snapshot_prefix):]):
+            return True
+        return super().immutable_file_test(path, url)
@@ -10,7 +10,7 @@ def backfill_cart_item_prices(apps, schema_editor):
     CartItem = apps.get_model('store', 'CartItem')
     
     # Update all cart items that don't have a price set
-    for cart_item in CartItem.objects.filter(price__isnull=True):
+    for cart_item in CartItem.objects.using(schema_editor.connection.alias).filter(price__isnull=True):
         cart_item.price = cart_item.product.price
         cart_item.save()
 
@@ -20,7 +20,7 @@ def reverse_backfill_cart_item_prices(apps, schema_editor):
     Reverse migration - set price field back to null
     """
     CartItem = apps.get_model('store', 'CartItem')
-    CartItem.objects.update(price=None)
+    CartItem.objects.using(schema_editor.connection.alias).update(price=None)
 
 
 class Migration(migrations.Migration):
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.3 on 2026-10-19 02:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def deactivate_duplicate_carts(apps, schema_editor):
+    """Keep only the newest active cart per user so the unique constraint can be added."""
+    Cart = apps.get_model('store', 'Cart')
+    carts = Cart.objects.using(schema_editor.connection.alias)
+    seen = set()
+    stale = []
+    for cart_id, user_id in carts.filter(is_active=True).order_by('user_id', '-created_at', '-id').values_list('id', 'user_id'):
+        if user_id in seen:
+            stale.append(cart_id)
+        seen.add(user_id)
+    if stale:
+        carts.filter(id__in=stale).update(is_active=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0009_order_cod_order_order_id_alter_order_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='order',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('ACCEPTED', 'Accepted'), ('PACKED', 'Packed'), ('DISPATCHED', 'Dispatched'), ('IN_TRANSIT', 'In Transit'), ('OUT_FOR_DELIVERY', 'Out for Delivery'), ('DELIVERED', 'Delivered'), ('CANCELLED', 'Cancelled')], default='PENDING', help_text='Order status', max_length=32),
+        ),
+        migrations.AddIndex(
+            model_name='cart',
+            index=models.Index(fields=['user', 'is_active'], name='cart_user_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['user', '-created_at'], name='order_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['created_at'], name='order_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['category', '-created_at'], name='product_active_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at'], name='product_active_created_idx'),
+        ),
+        migrations.RunPython(deactivate_duplicate_carts, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='cart',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('user',), name='cart_one_active_per_user'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.3 on 2026-10-19 02:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0010_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='discount_total',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='All promotion discounts, included in total_price', max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='discount',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Promotion discount on this line', max_digits=10),
+        ),
+        migrations.CreateModel(
+            name='Promotion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('kind', models.CharField(choices=[('PERCENT', 'Percentage off'), ('BUY_X_GET_Y', 'Buy X get Y free'), ('THRESHOLD', 'Spend threshold')], max_length=32)),
+                ('percent_off', models.DecimalField(blank=True, decimal_places=2, help_text='PERCENT, THRESHOLD: percentage off', max_digits=5, null=True)),
+                ('amount_off', models.DecimalField(blank=True, decimal_places=2, help_text='THRESHOLD: fixed amount off, in USD ($)', max_digits=10, null=True)),
+                ('buy_quantity', models.PositiveIntegerField(blank=True, help_text='BUY_X_GET_Y: units to buy', null=True)),
+                ('get_quantity', models.PositiveIntegerField(blank=True, help_text='BUY_X_GET_Y: units then given free', null=True)),
+                ('min_subtotal', models.DecimalField(blank=True, decimal_places=2, help_text='THRESHOLD: minimum cart subtotal, in USD ($)', max_digits=10, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('starts_at', models.DateTimeField(blank=True, null=True)),
+                ('ends_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(blank=True, help_text='Only this category (PERCENT, BUY_X_GET_Y)', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='promotions', to='store.category')),
+                ('product', models.ForeignKey(blank=True, help_text='Only this product (PERCENT, BUY_X_GET_Y)', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='promotions', to='store.product')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.3 on 2026-10-19 02:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0011_promotions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='shipping_price',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Included in total_price', max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='shipping_zone',
+            field=models.CharField(blank=True, max_length=32),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='orders', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.2.3 on 2026-10-19 02:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def record_initial_stock(apps, schema_editor):
+    # Existing stock becomes the first movement of each product, so the ledger adds up
+    Product = apps.get_model('store', 'Product')
+    StockMovement = apps.get_model('store', 'StockMovement')
+    db = schema_editor.connection.alias
+    stock = Product.objects.using(db).exclude(stock_quantity=0).values_list('pk', 'stock_quantity')
+    StockMovement.objects.using(db).bulk_create(
+        (StockMovement(product_id=pk, delta=quantity, reason='INITIAL') for pk, quantity in stock.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0012_order_shipping'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True)),
+                ('position', models.BigIntegerField(default=0, help_text='Last StockMovement id processed')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LowStockAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stock_quantity', models.IntegerField(help_text='Stock when the alert was raised')),
+                ('threshold', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('resolved_at', models.DateTimeField(blank=True, null=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='low_stock_alerts', to='store.product')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('resolved_at__isnull', True)), fields=('product',), name='lowstockalert_one_open_per_product')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('delta', models.IntegerField(help_text='Change in stock_quantity (negative for sales)')),
+                ('reason', models.CharField(choices=[('INITIAL', 'Initial stock'), ('ADJUSTMENT', 'Manual adjustment'), ('SALE', 'Sale'), ('CANCELLATION', 'Order cancellation')], max_length=32)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('order', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stock_movements', to='store.order')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_movements', to='store.product')),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['product', 'id'], name='stockmovement_product_id_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.IntegerField()),
+                ('movement_id', models.BigIntegerField(help_text='Last StockMovement included')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_snapshots', to='store.product')),
+            ],
+            options={
+                'ordering': ['-movement_id'],
+                'indexes': [models.Index(fields=['product', '-movement_id'], name='stocksnapshot_latest_idx')],
+            },
+        ),
+        migrations.RunPython(record_initial_stock, migrations.RunPython.noop),
+    ]
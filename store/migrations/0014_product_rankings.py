@@ -0,0 +1,61 @@
+# Generated by Django 5.2.3 on 2026-10-19 02:37
+
+from datetime import datetime, timezone
+
+from django.db import migrations, models
+
+# TRENDING_HALF_LIFE_DAYS and TRENDING_EPOCH when this migration was written
+HALF_LIFE_DAYS = 7
+EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def backfill_rankings(apps, schema_editor):
+    # Same weighting as store/rankings.py, inlined so this migration never changes
+    OrderItem = apps.get_model('store', 'OrderItem')
+    Product = apps.get_model('store', 'Product')
+    half_life = HALF_LIFE_DAYS * 86400
+    totals = {}
+    db = schema_editor.connection.alias
+    items = OrderItem.objects.using(db).exclude(order__status='CANCELLED').values_list('product_id', 'quantity', 'order__created_at')
+    for product_id, quantity, created_at in items.iterator(chunk_size=10_000):
+        count, score = totals.get(product_id, (0, 0.0))
+        weight = 2.0 ** ((created_at - EPOCH).total_seconds() / half_life)
+        totals[product_id] = (count + quantity, score + quantity * weight)
+    products = [
+        Product(pk=product_id, sales_count=count, trending_score=score)
+        for product_id, (count, score) in totals.items()
+    ]
+    Product.objects.using(db).bulk_update(products, ['sales_count', 'trending_score'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0013_stock_ledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='sales_count',
+            field=models.PositiveIntegerField(default=0, help_text='Units sold (see store/rankings.py)'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='trending_score',
+            field=models.FloatField(default=0, help_text='Units sold with time decay (see store/rankings.py)'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-created_at', '-id'], name='product_newest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-sales_count', '-id'], name='product_bestselling_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-trending_score', '-id'], name='product_trending_idx'),
+        ),
+        migrations.RunPython(backfill_rankings, migrations.RunPython.noop),
+    ]
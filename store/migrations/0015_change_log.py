@@ -0,0 +1,28 @@
+# Generated by Django 5.2.3 on 2026-10-19 02:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0014_product_rankings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(choices=[('product', 'Product'), ('category', 'Category'), ('order', 'Order')], max_length=16)),
+                ('object_id', models.CharField(help_text='pk, or order_id for orders', max_length=64)),
+                ('action', models.CharField(choices=[('insert', 'Insert'), ('update', 'Update'), ('delete', 'Delete')], max_length=8)),
+                ('user_id', models.BigIntegerField(blank=True, help_text='Owner, for orders', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['model', 'object_id', '-id'], name='changelog_object_idx'), models.Index(condition=models.Q(('user_id__isnull', False)), fields=['user_id', 'id'], name='changelog_user_idx')],
+            },
+        ),
+    ]
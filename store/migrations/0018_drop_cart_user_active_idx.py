@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2026-10-19 04:51
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0017_pick_lists'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='cart',
+            name='cart_user_active_idx',
+        ),
+    ]
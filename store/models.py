@@ -1,7 +1,15 @@
+from datetime import datetime, time, timedelta
+
 from django.contrib.auth.models import User
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, models, router, transaction
 from django.utils import timezone
 
+from . import shards
+
+# Order numbers tried by Order.save() when concurrent checkouts collide
+ORDER_ID_ATTEMPTS = 20
+
 # Create your models here.
 
 class Category(models.Model):
@@ -31,11 +39,24 @@ class Product(models.Model):
     length = models.DecimalField(max_digits=6, decimal_places=2, blank=True, null=True, help_text="in cm")
     width = models.DecimalField(max_digits=6, decimal_places=2, blank=True, null=True, help_text="in cm")
     height = models.DecimalField(max_digits=6, decimal_places=2, blank=True, null=True, help_text="in cm")
+    sales_count = models.PositiveIntegerField(default=0, help_text="Units sold (see store/rankings.py)")
+    trending_score = models.FloatField(default=0, help_text="Units sold with time decay (see store/rankings.py)")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of products/ for each ?sort=
+            models.Index(fields=['-created_at', '-id'], name='product_newest_idx'),
+            models.Index(fields=['-sales_count', '-id'], name='product_bestselling_idx'),
+            models.Index(fields=['-trending_score', '-id'], name='product_trending_idx'),
+            # Catalog browsing: active products of a category, newest first. Partial on
+            # is_active because SQLite cannot use a boolean column as an equality prefix.
+            models.Index(fields=['category', '-created_at'], condition=models.Q(is_active=True), name='product_active_category_idx'),
+            # Active catalog, newest first; inactive products are left out of the index
+            models.Index(fields=['-created_at'], condition=models.Q(is_active=True), name='product_active_created_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -48,11 +69,43 @@ class Product(models.Model):
         """Return formatted price"""
         return f"${self.price}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remembered so save() can record the change in the stock ledger
+        if 'stock_quantity' in field_names:
+            instance._loaded_stock_quantity = values[field_names.index('stock_quantity')]
+        return instance
+
     def save(self, *args, **kwargs):
         # Auto-generate SKU if not provided
         if not self.sku:
             self.sku = f"SKU-{self.id or 'NEW'}-{timezone.now().strftime('%Y%m%d')}"
-        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'stock_quantity' not in update_fields:
+            super().save(*args, **kwargs)
+            return
+        with transaction.atomic():
+            adding = self._state.adding
+            previous = 0
+            if not adding:
+                # Locked and re-read: sales since this instance was loaded stay in the stock
+                current = Product.objects.select_for_update().filter(
+                    pk=self.pk,
+                ).values_list('stock_quantity', flat=True).first()
+                if current is not None:
+                    previous = current
+                    if hasattr(self, '_loaded_stock_quantity'):
+                        # An edit applies the change made to the loaded value, never below zero
+                        self.stock_quantity = max(current + self.stock_quantity - self._loaded_stock_quantity, 0)
+            super().save(*args, **kwargs)
+            if self.stock_quantity != previous:
+                StockMovement.objects.bulk_create([StockMovement(
+                    product=self,
+                    delta=self.stock_quantity - previous,
+                    reason='INITIAL' if adding else 'ADJUSTMENT',
+                )])
+        self._loaded_stock_quantity = self.stock_quantity
 
 class Cart(models.Model):
     """Shopping cart model"""
@@ -61,8 +114,14 @@ class Cart(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
 
+    objects = shards.ShardedQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
+        constraints = [
+            # Cart.objects.get(user=..., is_active=True) relies on this
+            models.UniqueConstraint(fields=['user'], condition=models.Q(is_active=True), name='cart_one_active_per_user'),
+        ]
 
     def __str__(self):
         return f"Cart for {self.user.username} - {self.created_at.strftime('%Y-%m-%d')}"
@@ -93,6 +152,8 @@ class CartItem(models.Model):
     added_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = shards.ShardedQuerySet.as_manager()
+
     class Meta:
         unique_together = ['cart', 'product']
         ordering = ['-added_at']
@@ -134,18 +195,33 @@ class Order(models.Model):
         ("CANCELLED", "Cancelled"),
     ]
     order_id = models.CharField(max_length=32, unique=True, blank=True, help_text="Unique Order ID (auto-generated)")
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='orders')
+    # No single-column index: order_user_created_idx leads with user
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='orders', db_index=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     status = models.CharField(max_length=32, choices=STATUS_CHOICES, default='PENDING', help_text="Order status")
     total_price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    discount_total = models.DecimalField(max_digits=10, decimal_places=2, default=0, help_text="All promotion discounts, included in total_price")
+    shipping_price = models.DecimalField(max_digits=10, decimal_places=2, default=0, help_text="Included in total_price")
+    shipping_zone = models.CharField(max_length=32, blank=True)
     currency = models.CharField(max_length=8, default='USD', help_text="Currency code, e.g. USD, EUR")
     shipping_address = models.TextField(blank=True)
     billing_address = models.TextField(blank=True)
     cod = models.BooleanField(default=False, help_text="Is this order Cash on Delivery?")
+    pick_list = models.ForeignKey('PickList', on_delete=models.SET_NULL, blank=True, null=True, related_name='orders', help_text="Wave it was packed in (see store/picking.py)")
+
+    objects = shards.ShardedQuerySet.as_manager()
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # list_orders: a user's orders, newest first
+            models.Index(fields=['user', '-created_at'], name='order_user_created_idx'),
+            # Order.save: today's orders when generating the next order_id
+            models.Index(fields=['created_at'], name='order_created_idx'),
+            # Pick lists: the oldest orders waiting in a status
+            models.Index(fields=['status', 'id'], name='order_status_idx'),
+        ]
 
     def __str__(self):
         return f"Order {self.order_id or self.id} by {self.user.username} ({self.status})"
@@ -156,19 +232,50 @@ class Order(models.Model):
     def get_total_price(self):
         return sum(item.get_total_price() for item in self.items.all())
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remembered so a status change can be published (see store/outbox.py)
+        if 'status' in field_names:
+            instance._loaded_status = values[field_names.index('status')]
+        return instance
+
     def save(self, *args, **kwargs):
-        if not self.order_id:
-            from datetime import datetime
-            today = datetime.now().strftime('%Y%m%d')
-            last_order = Order.objects.filter(created_at__date=datetime.now().date()).order_by('-id').first()
-            next_num = 1
-            if last_order and last_order.order_id and last_order.order_id.startswith(f'ORD-{today}'):
-                try:
-                    next_num = int(last_order.order_id.split('-')[-1]) + 1
-                except Exception:
-                    pass
-            self.order_id = f"ORD-{today}-{next_num:04d}"
-        super().save(*args, **kwargs)
+        db = kwargs.get('using') or self._state.db or router.db_for_write(Order, instance=self)
+        if self.order_id:
+            # The outbox event written by the post_save receiver commits or rolls back with
+            # the order; no savepoint when the caller already holds a transaction
+            with shards.atomic(db, savepoint=False):
+                super().save(*args, **kwargs)
+            return
+        local_date = timezone.localdate()
+        today = local_date.strftime('%Y%m%d')
+        # Shards number their orders apart: ORD-<day>-<shard>-<n> beyond shard 0
+        prefix = f'ORD-{today}-{shards.index(db)}' if shards.index(db) else f'ORD-{today}'
+        # A range on created_at (instead of created_at__date) can use the index
+        day_start = timezone.make_aware(datetime.combine(local_date, time.min))
+        last_order = Order.objects.using(db).filter(
+            created_at__gte=day_start, created_at__lt=day_start + timedelta(days=1),
+        ).order_by('-id').first()
+        next_num = 1
+        if last_order and last_order.order_id and last_order.order_id.startswith(prefix):
+            try:
+                next_num = int(last_order.order_id.split('-')[-1]) + 1
+            except Exception:
+                pass
+        # Concurrent checkouts can read the same last order; the unique order_id rejects
+        # all but one, and the others move on to the next number
+        for attempt in range(ORDER_ID_ATTEMPTS):
+            self.order_id = f"{prefix}-{next_num + attempt:04d}"
+            try:
+                with shards.atomic(db):
+                    super().save(*args, **kwargs)
+                return
+            except IntegrityError:
+                if not Order.objects.using(db).filter(order_id=self.order_id).exists():
+                    raise
+        self.order_id = ''
+        raise IntegrityError(f'No free order_id after {ORDER_ID_ATTEMPTS} attempts')
 
 class OrderItem(models.Model):
     """Individual item in an order (structure mirrors CartItem)"""
@@ -176,20 +283,243 @@ class OrderItem(models.Model):
     product = models.ForeignKey(Product, on_delete=models.PROTECT, related_name='order_items')
     quantity = models.PositiveIntegerField(default=1)
     price = models.DecimalField(max_digits=10, decimal_places=2, help_text="Price at the time of ordering")
+    discount = models.DecimalField(max_digits=10, decimal_places=2, default=0, help_text="Promotion discount on this line")
     currency = models.CharField(max_length=8, default='USD', help_text="Currency code, e.g. USD, EUR")
     added_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = shards.ShardedQuerySet.as_manager()
+
     class Meta:
         ordering = ['-added_at']
 
     def __str__(self):
-        return f"{self.quantity}x {self.product.name} in Order #{self.order.id} ({self.currency})"
+        return f"{self.quantity}x {self.product.name} in Order #{self.order_id} ({self.currency})"
 
     def get_total_price(self):
         if self.price is not None:
-            return self.price * self.quantity
+            return self.price * self.quantity - self.discount
         return 0
 
     def get_display_total_price(self):
-        return f"{self.currency} {self.get_total_price()}"
\ No newline at end of file
+        return f"{self.currency} {self.get_total_price()}"
+
+class Promotion(models.Model):
+    """Discount rule applied when pricing carts (compiled by store/promotions.py)"""
+    KIND_CHOICES = [
+        ("PERCENT", "Percentage off"),
+        ("BUY_X_GET_Y", "Buy X get Y free"),
+        ("THRESHOLD", "Spend threshold"),
+    ]
+    name = models.CharField(max_length=200)
+    kind = models.CharField(max_length=32, choices=KIND_CHOICES)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, blank=True, null=True, related_name='promotions', help_text="Only this product (PERCENT, BUY_X_GET_Y)")
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, blank=True, null=True, related_name='promotions', help_text="Only this category (PERCENT, BUY_X_GET_Y)")
+    percent_off = models.DecimalField(max_digits=5, decimal_places=2, blank=True, null=True, help_text="PERCENT, THRESHOLD: percentage off")
+    amount_off = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True, help_text="THRESHOLD: fixed amount off, in USD ($)")
+    buy_quantity = models.PositiveIntegerField(blank=True, null=True, help_text="BUY_X_GET_Y: units to buy")
+    get_quantity = models.PositiveIntegerField(blank=True, null=True, help_text="BUY_X_GET_Y: units then given free")
+    min_subtotal = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True, help_text="THRESHOLD: minimum cart subtotal, in USD ($)")
+    is_active = models.BooleanField(default=True)
+    starts_at = models.DateTimeField(blank=True, null=True)
+    ends_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return self.name
+
+    def clean(self):
+        if self.kind == 'PERCENT' and not self.percent_off:
+            raise ValidationError({'percent_off': 'Required for percentage promotions.'})
+        if self.kind == 'BUY_X_GET_Y' and not (self.buy_quantity and self.get_quantity):
+            raise ValidationError('Buy X get Y promotions need buy and get quantities.')
+        if self.kind == 'THRESHOLD':
+            if self.min_subtotal is None:
+                raise ValidationError({'min_subtotal': 'Required for threshold promotions.'})
+            if not (self.percent_off or self.amount_off):
+                raise ValidationError('Threshold promotions need a percentage or an amount off.')
+            if self.product_id or self.category_id:
+                raise ValidationError('Threshold promotions apply to the whole cart.')
+        if self.percent_off is not None and not 0 < self.percent_off <= 100:
+            raise ValidationError({'percent_off': 'Must be between 0 and 100.'})
+        if self.starts_at and self.ends_at and self.ends_at <= self.starts_at:
+            raise ValidationError({'ends_at': 'Must be after starts_at.'})
+
+class StockMovement(models.Model):
+    """Append-only ledger entry: one change of a product's stock_quantity"""
+    REASON_CHOICES = [
+        ("INITIAL", "Initial stock"),
+        ("ADJUSTMENT", "Manual adjustment"),
+        ("SALE", "Sale"),
+        ("CANCELLATION", "Order cancellation"),
+    ]
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='stock_movements')
+    delta = models.IntegerField(help_text="Change in stock_quantity (negative for sales)")
+    reason = models.CharField(max_length=32, choices=REASON_CHOICES)
+    order = models.ForeignKey(Order, on_delete=models.SET_NULL, blank=True, null=True, related_name='stock_movements')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            # Rebuilding one product's stock: its movements after a snapshot
+            models.Index(fields=['product', 'id'], name='stockmovement_product_id_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.delta:+d} {self.product_id} ({self.reason})"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Stock movements are append-only")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("Stock movements are append-only")
+
+class StockSnapshot(models.Model):
+    """A product's stock as of (and including) movement ``movement_id``"""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='stock_snapshots')
+    quantity = models.IntegerField()
+    movement_id = models.BigIntegerField(help_text="Last StockMovement included")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-movement_id']
+        indexes = [
+            models.Index(fields=['product', '-movement_id'], name='stocksnapshot_latest_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id}: {self.quantity} @ {self.movement_id}"
+
+class LowStockAlert(models.Model):
+    """Raised when a product's stock drops to LOW_STOCK_THRESHOLD or below; resolved when it recovers"""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='low_stock_alerts')
+    stock_quantity = models.IntegerField(help_text="Stock when the alert was raised")
+    threshold = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    resolved_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['product'], condition=models.Q(resolved_at__isnull=True), name='lowstockalert_one_open_per_product'),
+        ]
+
+    def __str__(self):
+        return f"Low stock: {self.product_id} ({self.stock_quantity})"
+
+class LedgerCursor(models.Model):
+    """Position of an incremental job in an append-only log (StockMovement, ChangeLogEntry)"""
+    name = models.CharField(max_length=64, unique=True)
+    position = models.BigIntegerField(default=0, help_text="Last StockMovement id processed")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.position}"
+
+class ChangeLogEntry(models.Model):
+    """One insert, update or delete of a synced model; ids are the change feed's sequence"""
+    MODEL_CHOICES = [
+        ("product", "Product"),
+        ("category", "Category"),
+        ("order", "Order"),
+    ]
+    ACTION_CHOICES = [
+        ("insert", "Insert"),
+        ("update", "Update"),
+        ("delete", "Delete"),
+    ]
+    model = models.CharField(max_length=16, choices=MODEL_CHOICES)
+    object_id = models.CharField(max_length=64, help_text="pk, or order_id for orders")
+    action = models.CharField(max_length=8, choices=ACTION_CHOICES)
+    user_id = models.BigIntegerField(blank=True, null=True, help_text="Owner, for orders")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            # Compaction: the latest entry of each object
+            models.Index(fields=['model', 'object_id', '-id'], name='changelog_object_idx'),
+            # A user's own orders in the feed
+            models.Index(fields=['user_id', 'id'], condition=models.Q(user_id__isnull=False), name='changelog_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.id} {self.action} {self.model} {self.object_id}"
+
+class WebhookSubscription(models.Model):
+    """An integrator endpoint receiving order events (see store/outbox.py)"""
+    url = models.URLField(max_length=500)
+    secret = models.CharField(max_length=128, help_text="Signs each request body (HMAC-SHA256)")
+    event_types = models.CharField(max_length=200, blank=True, help_text="Comma separated, e.g. order.created; blank for all")
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.url
+
+    def wants(self, event_type):
+        return not self.event_types or event_type in {name.strip() for name in self.event_types.split(',')}
+
+class OutboxEvent(models.Model):
+    """An order event, written in the same transaction as the order change"""
+    EVENT_CHOICES = [
+        ("order.created", "Order created"),
+        ("order.status_changed", "Order status changed"),
+    ]
+    event_type = models.CharField(max_length=32, choices=EVENT_CHOICES)
+    order_key = models.CharField(max_length=32, help_text="order_id; events of one order are delivered in order")
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"#{self.id} {self.event_type} {self.order_key}"
+
+class WebhookDelivery(models.Model):
+    """One event owed to one subscription"""
+    STATUS_CHOICES = [
+        ("PENDING", "Pending"),
+        ("DELIVERED", "Delivered"),
+        ("FAILED", "Failed"),
+    ]
+    subscription = models.ForeignKey(WebhookSubscription, on_delete=models.CASCADE, related_name='deliveries')
+    event = models.ForeignKey(OutboxEvent, on_delete=models.CASCADE, related_name='deliveries')
+    order_key = models.CharField(max_length=32, help_text="Copied from the event for per-order ordering")
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField()
+    last_error = models.TextField(blank=True)
+    delivered_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            # Due deliveries, oldest first
+            models.Index(fields=['next_attempt_at', 'id'], condition=models.Q(status='PENDING'), name='delivery_due_idx'),
+            # Per-order ordering: an older pending delivery of the same order blocks the rest
+            models.Index(fields=['subscription', 'order_key', 'id'], condition=models.Q(status='PENDING'), name='delivery_order_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.event_id} -> {self.subscription_id} ({self.status})"
+
+class PickList(models.Model):
+    """A wave of orders moved to PACKED together, picked from one aggregated list (see store/picking.py)"""
+    created_at = models.DateTimeField(auto_now_add=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, blank=True, null=True, related_name='+')
+    order_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-id']
+
+    def __str__(self):
+        return f"Pick list #{self.id} ({self.order_count} orders)"
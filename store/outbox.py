@@ -0,0 +1,246 @@
+"""
+Transactional outbox for order webhooks.
+
+Order events are written to OutboxEvent in the same transaction as the order
+change (the Order post_save receiver in store/signals.py, and cancel_order),
+so an event exists exactly when its change committed and requests never wait
+on an integrator. The ``dispatch_webhooks`` command then:
+
+1. fans new events out into one WebhookDelivery per interested subscription,
+   reading the outbox from a LedgerCursor like the stock ledger jobs do;
+2. claims due deliveries (leased, with SKIP LOCKED where supported, so several
+   dispatchers can run) and POSTs them in batches over a bounded asyncio
+   connection pool (store/httpclient.py);
+3. marks them delivered, or schedules a retry with exponential backoff and
+   gives up after WEBHOOK_MAX_ATTEMPTS.
+
+Per-order ordering: a delivery is only claimed together with, or after, every
+older pending delivery of the same order to the same subscription, and a
+subscription's deliveries are split into lanes by order, each lane sending its
+batches one after the other and stopping at the first failure. Delivery is at least once;
+receivers dedupe by event id.
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import math
+import random
+import zlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Exists, F, Max, OuterRef, Q
+from django.utils import timezone
+
+from .httpclient import HTTPError
+from .models import LedgerCursor, OutboxEvent, WebhookDelivery, WebhookSubscription
+
+CURSOR = 'webhook-outbox'
+
+
+def _event(event_type, order, data):
+    return OutboxEvent(
+        event_type=event_type,
+        order_key=order.order_id,
+        payload={
+            'order_id': order.order_id,
+            'user_id': order.user_id,
+            'status': order.status,
+            'total_price': str(order.total_price),
+            'currency': order.currency,
+            **data,
+        },
+    )
+
+
+def record(event_type, order, **data):
+    """Append an event for ``order``; call inside the transaction changing it."""
+    _event(event_type, order, data).save()
+
+
+def record_many(event_type, orders, data):
+    """record() for many orders with bulk INSERTs; ``data(order)`` is each event's extra payload."""
+    OutboxEvent.objects.bulk_create([_event(event_type, order, data(order)) for order in orders])
+
+
+def fan_out(now=None):
+    """Create the deliveries of events not fanned out yet. Returns the number created."""
+    horizon = (now or timezone.now()) - timedelta(seconds=settings.WEBHOOK_OUTBOX_LAG)
+    with transaction.atomic():
+        cursor, _ = LedgerCursor.objects.get_or_create(name=CURSOR)
+        cursor = LedgerCursor.objects.select_for_update().get(pk=cursor.pk)
+        events = OutboxEvent.objects.filter(id__gt=cursor.position, created_at__lte=horizon)
+        upto = events.aggregate(upto=Max('id'))['upto']
+        if upto is None:
+            return 0
+        subscriptions = list(WebhookSubscription.objects.filter(is_active=True))
+        now = timezone.now()
+        created = 0
+        batch = []
+        for event in events.filter(id__lte=upto).only('id', 'event_type', 'order_key').iterator():
+            for subscription in subscriptions:
+                if subscription.wants(event.event_type):
+                    batch.append(WebhookDelivery(
+                        subscription=subscription, event=event, order_key=event.order_key, next_attempt_at=now,
+                    ))
+            if len(batch) >= 1000:
+                created += len(WebhookDelivery.objects.bulk_create(batch))
+                batch = []
+        created += len(WebhookDelivery.objects.bulk_create(batch))
+        cursor.position = upto
+        cursor.save(update_fields=['position', 'updated_at'])
+        return created
+
+
+def claim(limit, connections=None):
+    """
+    Lease up to ``limit`` due deliveries, oldest first. Only the oldest pending
+    delivery of an order (to a subscription) can be claimed on its own; its
+    lock stands for the whole order, whose later due deliveries are claimed
+    with it. Another dispatcher never sees a locked head, and never claims the
+    deliveries behind it. The lease lasts as long as sending them over a pool
+    of ``connections`` (default WEBHOOK_MAX_CONNECTIONS) can take.
+    """
+    now = timezone.now()
+    older = WebhookDelivery.objects.filter(
+        status='PENDING',
+        subscription=OuterRef('subscription'),
+        order_key=OuterRef('order_key'),
+        id__lt=OuterRef('id'),
+    )
+    heads = (
+        WebhookDelivery.objects.filter(status='PENDING', next_attempt_at__lte=now)
+        .exclude(Exists(older))
+        .order_by('id')
+    )
+    with transaction.atomic():
+        if connection.features.has_select_for_update_skip_locked:
+            heads = heads.select_for_update(skip_locked=True, of=('self',))
+        claimed = list(heads.select_related('event', 'subscription')[:limit])
+        if claimed and len(claimed) < limit:
+            orders = Q()
+            for head in claimed:
+                orders |= Q(subscription=head.subscription_id, order_key=head.order_key)
+            # Up to the first one still waiting to be retried
+            followers = (
+                WebhookDelivery.objects.filter(orders, status='PENDING', next_attempt_at__lte=now)
+                .exclude(pk__in=[head.pk for head in claimed])
+                .exclude(Exists(older.filter(next_attempt_at__gt=now)))
+                .order_by('id')
+            )
+            claimed += followers.select_related('event', 'subscription')[:limit - len(claimed)]
+            claimed.sort(key=lambda delivery: delivery.pk)
+        if claimed:
+            lease = now + timedelta(seconds=lease_seconds(claimed, connections or settings.WEBHOOK_MAX_CONNECTIONS))
+            WebhookDelivery.objects.filter(pk__in=[delivery.pk for delivery in claimed]).update(next_attempt_at=lease)
+    return claimed
+
+
+def lanes(deliveries):
+    """Group claimed deliveries into lanes of (subscription, batches); an order always maps to one lane."""
+    grouped = {}
+    for delivery in deliveries:
+        lane = zlib.crc32(delivery.order_key.encode()) % settings.WEBHOOK_LANES_PER_SUBSCRIPTION
+        grouped.setdefault((delivery.subscription_id, lane), []).append(delivery)
+    size = settings.WEBHOOK_BATCH_SIZE
+    return [
+        (members[0].subscription, [members[start:start + size] for start in range(0, len(members), size)])
+        for members in grouped.values()
+    ]
+
+
+def lease_seconds(deliveries, connections):
+    """
+    The longest deliver() can take: the longest lane sends its batches one
+    after the other, and batches may wait for one of ``connections``.
+    """
+    batches = [len(lane_batches) for _, lane_batches in lanes(deliveries)]
+    rounds = max(batches) + math.ceil(sum(batches) / connections)
+    # One more timeout as a margin for the database work around the requests
+    return (rounds + 1) * settings.WEBHOOK_TIMEOUT
+
+
+def body(deliveries):
+    return json.dumps({'events': [
+        {
+            'id': delivery.event_id,
+            'type': delivery.event.event_type,
+            'order_id': delivery.order_key,
+            'created_at': delivery.event.created_at.isoformat(),
+            'data': delivery.event.payload,
+        }
+        for delivery in deliveries
+    ]}, separators=(',', ':')).encode()
+
+
+def signature(secret, payload):
+    return 'sha256=' + hmac.new(secret.encode(), payload, hashlib.sha256).hexdigest()
+
+
+async def send_lane(pool, subscription, batches):
+    """
+    POST a lane's batches in order. Returns (delivered, failed with error, not attempted):
+    after a failure the rest of the lane waits, so an order's events never overtake each other.
+    """
+    delivered = []
+    for index, batch in enumerate(batches):
+        payload = body(batch)
+        try:
+            response = await pool.post(subscription.url, payload, {
+                'Content-Type': 'application/json',
+                'User-Agent': 'vibe-ecommerce-webhooks',
+                'X-Webhook-Signature': signature(subscription.secret, payload),
+            })
+            error = None if 200 <= response.status < 300 else f'HTTP {response.status}'
+        except (HTTPError, ValueError) as exc:
+            error = str(exc) or exc.__class__.__name__
+        if error:
+            rest = [delivery for later in batches[index + 1:] for delivery in later]
+            return delivered, (batch, error), rest
+        delivered.extend(batch)
+    return delivered, None, []
+
+
+def backoff(attempts):
+    """Seconds before retry number ``attempts``: exponential, capped, with jitter."""
+    delay = min(settings.WEBHOOK_BACKOFF_BASE * 2 ** (attempts - 1), settings.WEBHOOK_BACKOFF_MAX)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def settle(results):
+    """Record the outcome of send_lane() calls. Returns (delivered, retried, given up)."""
+    now = timezone.now()
+    delivered, retried, failed = [], 0, 0
+    released = []
+    errors = {}
+    for sent, failure, rest in results:
+        delivered.extend(delivery.pk for delivery in sent)
+        released.extend(delivery.pk for delivery in rest)
+        if failure:
+            batch, error = failure
+            for delivery in batch:
+                errors.setdefault((delivery.attempts + 1, error), []).append(delivery.pk)
+    with transaction.atomic():
+        if delivered:
+            WebhookDelivery.objects.filter(pk__in=delivered).update(status='DELIVERED', delivered_at=now)
+        if released:
+            # Never sent: back in the queue without using up an attempt
+            WebhookDelivery.objects.filter(pk__in=released).update(next_attempt_at=now)
+        for (attempts, error), pks in errors.items():
+            deliveries = WebhookDelivery.objects.filter(pk__in=pks)
+            if attempts >= settings.WEBHOOK_MAX_ATTEMPTS:
+                failed += deliveries.update(status='FAILED', attempts=F('attempts') + 1, last_error=error[:1000])
+            else:
+                retried += deliveries.update(
+                    attempts=F('attempts') + 1,
+                    next_attempt_at=now + timedelta(seconds=backoff(attempts)),
+                    last_error=error[:1000],
+                )
+    return len(delivered), retried, failed
+
+
+async def deliver(pool, deliveries):
+    """Send claimed ``deliveries``: lanes run concurrently, bounded by the pool."""
+    return await asyncio.gather(*(send_lane(pool, subscription, batches) for subscription, batches in lanes(deliveries)))
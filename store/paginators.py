@@ -0,0 +1,98 @@
+import base64
+import binascii
+import datetime
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+def estimated_row_count(queryset):
+    """
+    Return the planner's row estimate for the queryset's table, or None when there
+    is none (filtered queryset, table never analyzed, unsupported backend).
+    Only meaningful for unfiltered querysets, since it describes the whole table.
+    """
+    if queryset.query.where:
+        return None
+    conn = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    try:
+        with conn.cursor() as cursor:
+            if conn.vendor == 'postgresql':
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+            elif conn.vendor == 'sqlite':
+                # Populated by ANALYZE, one row per index; the first number is the rows in that
+                # index, fewer than the table's for a partial index, so take the largest
+                cursor.execute('SELECT MAX(CAST(stat AS INTEGER)) FROM sqlite_stat1 WHERE tbl = %s', [table])
+            else:
+                return None
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if row is None or row[0] is None:
+        return None
+    estimate = int(str(row[0]).split()[0])
+    # reltuples is -1 for tables that were never vacuumed/analyzed
+    return estimate if estimate >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that trusts the database's row estimate instead of running COUNT(*)
+    on large unfiltered tables (ADMIN_ESTIMATED_COUNT_THRESHOLD rows and up).
+    Filtered querysets and small tables still get an exact count.
+    """
+
+    @cached_property
+    def count(self):
+        threshold = getattr(settings, 'ADMIN_ESTIMATED_COUNT_THRESHOLD', 100_000)
+        if hasattr(self.object_list, 'query'):
+            estimate = estimated_row_count(self.object_list)
+            if estimate is not None and estimate >= threshold:
+                return estimate
+        return super().count
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    # Full isoformat: a cursor must keep the microseconds to resume at the exact row
+    values = [value.isoformat() if isinstance(value, datetime.datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+def keyset_page(queryset, field, cursor=None, limit=50):
+    """
+    One page of ``queryset`` ordered by ``-field, -id``, continuing after
+    ``cursor`` (an opaque string from a previous page). Each page is an index
+    range scan whatever its depth, unlike OFFSET. Returns the ordered queryset
+    for the page (fetch it, then pass the rows to ``next_cursor``).
+    Raises InvalidCursor for a malformed cursor.
+    """
+    queryset = queryset.order_by(f'-{field}', '-id')
+    if cursor:
+        try:
+            value, pk = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+            value = queryset.model._meta.get_field(field).to_python(value)
+            pk = int(pk)
+        except (ValueError, TypeError, ValidationError, binascii.Error) as exc:
+            raise InvalidCursor(cursor) from exc
+        queryset = queryset.filter(Q(**{f'{field}__lt': value}) | Q(**{field: value, 'id__lt': pk}))
+    # One extra row tells whether there is a next page
+    return queryset[:limit + 1]
+
+
+def next_cursor(rows, field, limit):
+    """Trim ``rows`` fetched from keyset_page() to ``limit`` and return (rows, cursor of the next page or None)."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, field), last.pk])
@@ -0,0 +1,159 @@
+"""
+Warehouse pick lists.
+
+``create()`` packs a wave: in one transaction it locks the oldest orders
+waiting in PENDING or ACCEPTED (up to PICKLIST_MAX_ORDERS), moves them to
+PACKED and tags them with a new PickList in one conditional UPDATE, and writes
+the change feed entries and outbox events Order.save() would have written, in
+bulk. ``lines()`` is then one grouped query over the wave's order items: the
+quantity of each product to pick, sorted by category and SKU so a picker walks
+the shelves once.
+
+The locked rows cannot change before the UPDATE, and where SKIP LOCKED is
+supported concurrent waves take disjoint orders, so no order is ever packed
+twice or packed after it was cancelled. Since orders keep their pick list, a
+list can be printed again at any time.
+
+With order shards (store/shards.py) a wave holds a transaction on every shard,
+takes the oldest waiting orders across all of them and updates each shard's
+share; ``lines()`` then sums per shard in parallel and names the products from
+default.
+"""
+import heapq
+import json
+from collections import defaultdict
+from contextlib import ExitStack
+from itertools import chain
+from operator import attrgetter
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from . import changes, exports, outbox, shards
+from .models import Order, OrderItem, PickList, Product
+from .signals import invalidate_user_on_commit
+
+WAITING = ('PENDING', 'ACCEPTED')
+
+LINE_COLUMNS = [
+    ('category', lambda line: line['category']),
+    ('sku', lambda line: line['sku']),
+    ('name', lambda line: line['name']),
+    ('product_id', lambda line: line['product_id']),
+    ('quantity', lambda line: line['quantity']),
+    ('orders', lambda line: line['orders']),
+]
+
+
+def create(statuses=WAITING, limit=None, created_before=None, user=None):
+    """
+    Pack the oldest orders in ``statuses`` (created before ``created_before``, at
+    most ``limit``) as a new PickList. Returns None when no order is waiting.
+    """
+    limit = limit or settings.PICKLIST_MAX_ORDERS
+    with ExitStack() as stack:
+        waiting = []
+        # Default (shard 0) first, so its transaction commits last
+        for alias in settings.ORDER_SHARDS:
+            stack.enter_context(transaction.atomic(using=alias))
+            waiting.append(_lock_waiting(alias, statuses, created_before, limit))
+        if len(waiting) == 1:
+            orders = waiting[0]
+        else:
+            # The oldest across shards; the rest stay waiting for the next wave
+            orders = heapq.nsmallest(limit, chain(*waiting), key=attrgetter('created_at', 'pk'))
+        if not orders:
+            return None
+        pick_list = PickList.objects.create(created_by=user, order_count=len(orders))
+        by_shard = defaultdict(list)
+        for order in orders:
+            by_shard[order._state.db].append(order.pk)
+        for alias, ids in by_shard.items():
+            Order.objects.using(alias).filter(pk__in=ids, status__in=statuses).update(
+                status='PACKED', pick_list=pick_list, updated_at=timezone.now(),
+            )
+        previous = {}
+        for order in orders:
+            previous[order.pk], order.status = order.status, 'PACKED'
+        changes.record_orders(orders, 'update')
+        outbox.record_many('order.status_changed', orders, lambda order: {'previous_status': previous[order.pk]})
+        for alias, user_id in {(order._state.db, order.user_id) for order in orders}:
+            invalidate_user_on_commit(user_id=user_id, using=alias)
+    return pick_list
+
+
+def _lock_waiting(alias, statuses, created_before, limit):
+    waiting = Order.objects.using(alias).filter(status__in=statuses).order_by('id')
+    if created_before is not None:
+        waiting = waiting.filter(created_at__lt=created_before)
+    if connections[alias].features.has_select_for_update_skip_locked:
+        waiting = waiting.select_for_update(skip_locked=True, of=('self',))
+    return list(waiting.only('id', 'order_id', 'user_id', 'status', 'total_price', 'currency', 'created_at')[:limit])
+
+
+def lines(pick_list):
+    """The products to pick for ``pick_list``, summed over its orders, in walking order."""
+    if shards.enabled():
+        return _sharded_lines(pick_list)
+    return (
+        OrderItem.objects.filter(order__pick_list=pick_list)
+        .values('product_id')
+        .annotate(
+            category=F('product__category__name'),
+            sku=F('product__sku'),
+            name=F('product__name'),
+            quantity=Sum('quantity'),
+            orders=Count('order', distinct=True),
+        )
+        .order_by('category', 'sku', 'product_id')
+        .iterator(chunk_size=exports.CHUNK_SIZE)
+    )
+
+
+def _sharded_lines(pick_list):
+    def shard_totals(alias):
+        return list(
+            OrderItem.objects.using(alias).filter(order__pick_list=pick_list)
+            .values('product_id')
+            .annotate(quantity=Sum('quantity'), orders=Count('order', distinct=True))
+            .order_by()
+        )
+
+    totals = {}
+    # An order is on one shard only, so order counts add up too
+    for rows in shards.fan_out(shard_totals):
+        for row in rows:
+            quantity, orders = totals.get(row['product_id'], (0, 0))
+            totals[row['product_id']] = (quantity + row['quantity'], orders + row['orders'])
+    products = Product.objects.filter(pk__in=totals).values_list('pk', 'category__name', 'sku', 'name')
+    result = [
+        {
+            'product_id': pk, 'category': category, 'sku': sku, 'name': name,
+            'quantity': totals[pk][0], 'orders': totals[pk][1],
+        }
+        for pk, category, sku, name in products.iterator(chunk_size=exports.CHUNK_SIZE)
+    ]
+    result.sort(key=lambda line: (line['category'], line['sku'], line['product_id']))
+    return result
+
+
+def iter_csv(pick_list):
+    return exports.iter_csv(lines(pick_list), LINE_COLUMNS)
+
+
+def iter_json(pick_list):
+    """Yield the pick list as one JSON object in chunks of FLUSH_EVERY lines, like exports.iter_csv()."""
+    prefix = json.dumps({
+        'pick_list': pick_list.pk,
+        'created_at': pick_list.created_at.isoformat(),
+        'order_count': pick_list.order_count,
+    })[:-1] + ', "lines": ['
+    batch = []
+    for line in lines(pick_list):
+        batch.append(json.dumps(line))
+        if len(batch) == exports.FLUSH_EVERY:
+            yield prefix + ', '.join(batch)
+            prefix, batch = ', ', []
+    yield (prefix + ', '.join(batch) if batch else prefix.rstrip(', ')) + ']}'
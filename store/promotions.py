@@ -0,0 +1,236 @@
+"""
+Promotion engine.
+
+Active promotions are compiled, once per rule-set version, into a
+PromotionIndex. Line rules are bucketed by product, by category and "whole
+catalog"; within a bucket only the best percentage rule is kept, since it always
+beats the others. Threshold rules are sorted by minimum subtotal with running
+maxima, so the best qualifying one is a bisect away. Pricing a cart touches only
+the buckets of its own lines, however many rules are active.
+
+Discounts do not stack: each line gets its single best line discount, then the
+best threshold discount applies to the discounted subtotal. Fixed amounts
+(``amount_off``, ``min_subtotal``) are in the base currency and are converted
+with the FX rate table, so a cart priced in any currency gets the same deal.
+
+The version lives in the shared cache (store/cache.py) and is bumped by
+store/signals.py whenever a Promotion is saved or deleted. An index also expires
+at the next ``starts_at``/``ends_at`` boundary of the rules it was built from.
+"""
+import bisect
+import threading
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+from django.utils import timezone
+
+from . import fx
+from .cache import aget_version, get_version
+from .models import Promotion
+from .signals import PROMOTIONS
+
+HUNDRED = Decimal(100)
+
+
+class Rule:
+    __slots__ = ('id', 'name', 'percent', 'buy', 'get', 'amount', 'min_subtotal')
+
+    def __init__(self, promotion):
+        self.id = promotion.id
+        self.name = promotion.name
+        self.percent = promotion.percent_off / HUNDRED if promotion.percent_off else None
+        self.buy = promotion.buy_quantity
+        self.get = promotion.get_quantity
+        self.amount = promotion.amount_off or None
+        self.min_subtotal = promotion.min_subtotal
+
+
+class Bucket:
+    """Line rules sharing a key: the best percentage rule and every buy-X-get-Y rule."""
+    __slots__ = ('percent', 'buy_x_get_y')
+
+    def __init__(self):
+        self.percent = None
+        self.buy_x_get_y = []
+
+    def add(self, kind, rule):
+        if kind == 'PERCENT':
+            if self.percent is None or rule.percent > self.percent.percent:
+                self.percent = rule
+        else:
+            self.buy_x_get_y.append(rule)
+
+
+class LinePricing:
+    __slots__ = ('subtotal', 'discount', 'total', 'promotion')
+
+    def __init__(self, subtotal, discount, promotion):
+        self.subtotal = subtotal
+        self.discount = discount
+        self.total = subtotal - discount
+        self.promotion = promotion
+
+
+class CartPricing:
+    __slots__ = ('lines', 'subtotal', 'cart_discount', 'cart_promotion', 'discount', 'total')
+
+    def __init__(self, lines, subtotal, cart_discount, cart_promotion):
+        self.lines = lines
+        self.subtotal = subtotal
+        self.cart_discount = cart_discount
+        self.cart_promotion = cart_promotion
+        self.discount = sum((line.discount for line in lines), cart_discount)
+        self.total = subtotal - self.discount
+
+
+class PromotionIndex:
+    def __init__(self, version, promotions, now):
+        self.version = version
+        self.valid_until = None
+        self.by_product = {}
+        self.by_category = {}
+        self.everywhere = Bucket()
+        thresholds = []
+        for promotion in promotions:
+            if promotion.starts_at and promotion.starts_at > now:
+                self._expire_at(promotion.starts_at)
+                continue
+            if promotion.ends_at:
+                if promotion.ends_at <= now:
+                    continue
+                self._expire_at(promotion.ends_at)
+            rule = Rule(promotion)
+            if promotion.kind == 'THRESHOLD':
+                thresholds.append(rule)
+            elif promotion.product_id:
+                self.by_product.setdefault(promotion.product_id, Bucket()).add(promotion.kind, rule)
+            elif promotion.category_id:
+                self.by_category.setdefault(promotion.category_id, Bucket()).add(promotion.kind, rule)
+            else:
+                self.everywhere.add(promotion.kind, rule)
+        self.has_line_rules = bool(
+            self.by_product or self.by_category or self.everywhere.percent or self.everywhere.buy_x_get_y
+        )
+
+        # Running best percentage and best amount over thresholds sorted by minimum,
+        # so the best rule among the first n thresholds is entry n - 1
+        thresholds.sort(key=lambda rule: rule.min_subtotal)
+        self.threshold_mins = [rule.min_subtotal for rule in thresholds]
+        self.threshold_best_percent = []
+        self.threshold_best_amount = []
+        best_percent = best_amount = None
+        for rule in thresholds:
+            if rule.percent and (best_percent is None or rule.percent > best_percent.percent):
+                best_percent = rule
+            if rule.amount and (best_amount is None or rule.amount > best_amount.amount):
+                best_amount = rule
+            self.threshold_best_percent.append(best_percent)
+            self.threshold_best_amount.append(best_amount)
+
+    def _expire_at(self, moment):
+        if self.valid_until is None or moment < self.valid_until:
+            self.valid_until = moment
+
+    def is_current(self, version):
+        return self.version == version and (self.valid_until is None or timezone.now() < self.valid_until)
+
+    def line_discount(self, product_id, category_id, unit_price, quantity, round_amount):
+        best, best_rule = 0, None
+        for bucket in (self.by_product.get(product_id), self.by_category.get(category_id), self.everywhere):
+            if bucket is None:
+                continue
+            if bucket.percent is not None:
+                amount = round_amount(unit_price * quantity * bucket.percent.percent)
+                if amount > best:
+                    best, best_rule = amount, bucket.percent
+            for rule in bucket.buy_x_get_y:
+                amount = unit_price * (quantity // (rule.buy + rule.get) * rule.get)
+                if amount > best:
+                    best, best_rule = amount, rule
+        return best, best_rule
+
+    def cart_discount(self, subtotal, rate, round_amount):
+        qualifying = bisect.bisect_right(self.threshold_mins, subtotal / rate)
+        if not qualifying:
+            return 0, None
+        best, best_rule = 0, None
+        percent_rule = self.threshold_best_percent[qualifying - 1]
+        if percent_rule is not None:
+            best, best_rule = round_amount(subtotal * percent_rule.percent), percent_rule
+        amount_rule = self.threshold_best_amount[qualifying - 1]
+        if amount_rule is not None:
+            amount = round_amount(amount_rule.amount * rate)
+            if amount > best:
+                best, best_rule = amount, amount_rule
+        return min(best, subtotal), best_rule
+
+    def price(self, lines, currency=fx.BASE_CURRENCY):
+        """
+        Price ``lines`` of (product_id, category_id, unit_price, quantity), with unit
+        prices already in ``currency``. Returns a CartPricing in that currency.
+        """
+        round_amount = fx.rounder(currency)
+        zero = round_amount(Decimal(0))
+        priced = []
+        for product_id, category_id, unit_price, quantity in lines:
+            subtotal = unit_price * quantity
+            discount, rule = zero, None
+            if self.has_line_rules:
+                discount, rule = self.line_discount(product_id, category_id, unit_price, quantity, round_amount)
+            priced.append(LinePricing(subtotal, discount or zero, rule and rule.name))
+        subtotal = sum((line.subtotal for line in priced), zero)
+        cart_discount, cart_rule = zero, None
+        if self.threshold_mins and subtotal:
+            rate = fx.get_rates().rate(fx.BASE_CURRENCY, currency)
+            cart_discount, cart_rule = self.cart_discount(
+                subtotal - sum(line.discount for line in priced), rate, round_amount,
+            )
+        return CartPricing(priced, subtotal, cart_discount or zero, cart_rule and cart_rule.name)
+
+
+_lock = threading.Lock()
+_state = {'index': None}
+
+
+def _rebuild(version):
+    with _lock:
+        index = _state['index']
+        if index is not None and index.is_current(version):
+            # Another thread rebuilt while we waited
+            return index
+        now = timezone.now()
+        promotions = Promotion.objects.filter(is_active=True).filter(Q(ends_at__isnull=True) | Q(ends_at__gt=now))
+        index = _state['index'] = PromotionIndex(version, promotions.iterator(), now)
+        return index
+
+
+def get_index():
+    """Return the PromotionIndex for the current rule-set version, compiling it if needed."""
+    version = get_version(PROMOTIONS)
+    index = _state['index']
+    if index is not None and index.is_current(version):
+        return index
+    return _rebuild(version)
+
+
+async def aget_index():
+    version = await aget_version(PROMOTIONS)
+    index = _state['index']
+    if index is not None and index.is_current(version):
+        return index
+    return await sync_to_async(_rebuild)(version)
+
+
+def invalidate():
+    """Drop the compiled index; the next lookup recompiles it."""
+    with _lock:
+        _state['index'] = None
+
+
+def price_cart(lines, currency=fx.BASE_CURRENCY):
+    return get_index().price(lines, currency)
+
+
+async def aprice_cart(lines, currency=fx.BASE_CURRENCY):
+    return (await aget_index()).price(lines, currency)
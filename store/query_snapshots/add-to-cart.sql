@@ -0,0 +1,13 @@
+-- 12 queries
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?) LIMIT ?;
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ? LIMIT ?;
+SELECT "store_product"."id", "store_product"."name", "store_product"."description", "store_product"."price", "store_product"."category_id", "store_product"."stock_quantity", "store_product"."is_active", "store_product"."sku", "store_product"."weight", "store_product"."length", "store_product"."width", "store_product"."height", "store_product"."sales_count", "store_product"."trending_score", "store_product"."created_at", "store_product"."updated_at" FROM "store_product" WHERE ("store_product"."id" = ? AND "store_product"."is_active") LIMIT ?;
+SAVEPOINT "sp";
+SELECT "store_cart"."id", "store_cart"."user_id", "store_cart"."created_at", "store_cart"."updated_at", "store_cart"."is_active" FROM "store_cart" WHERE ("store_cart"."is_active" AND "store_cart"."user_id" = ?) LIMIT ?;
+SELECT "store_cartitem"."id", "store_cartitem"."cart_id", "store_cartitem"."product_id", "store_cartitem"."quantity", "store_cartitem"."price", "store_cartitem"."currency", "store_cartitem"."added_at", "store_cartitem"."updated_at" FROM "store_cartitem" WHERE ("store_cartitem"."cart_id" = ? AND "store_cartitem"."product_id" = ?) LIMIT ?;
+SAVEPOINT "sp";
+INSERT INTO "store_cartitem" ("cart_id", "product_id", "quantity", "price", "currency", "added_at", "updated_at") VALUES (?, ?, ?, ?, ?, ?, ?) RETURNING "store_cartitem"."id";
+RELEASE SAVEPOINT "sp";
+UPDATE "store_cartitem" SET "cart_id" = ?, "product_id" = ?, "quantity" = ?, "price" = ?, "currency" = ?, "added_at" = ?, "updated_at" = ? WHERE "store_cartitem"."id" = ?;
+RELEASE SAVEPOINT "sp";
+SELECT "store_cartitem"."id", "store_cartitem"."cart_id", "store_cartitem"."product_id", "store_cartitem"."quantity", "store_cartitem"."price", "store_cartitem"."currency", "store_cartitem"."added_at", "store_cartitem"."updated_at" FROM "store_cartitem" WHERE "store_cartitem"."cart_id" = ? ORDER BY "store_cartitem"."added_at" DESC;
@@ -0,0 +1,13 @@
+-- 12 queries
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?) LIMIT ?;
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ? LIMIT ?;
+SELECT "store_order"."id", "store_order"."order_id", "store_order"."user_id", "store_order"."created_at", "store_order"."updated_at", "store_order"."status", "store_order"."total_price", "store_order"."discount_total", "store_order"."shipping_price", "store_order"."shipping_zone", "store_order"."currency", "store_order"."shipping_address", "store_order"."billing_address", "store_order"."cod", "store_order"."pick_list_id" FROM "store_order" WHERE ("store_order"."order_id" = ? AND "store_order"."user_id" = ?) LIMIT ?;
+SAVEPOINT "sp";
+UPDATE "store_order" SET "status" = ?, "updated_at" = ? WHERE ("store_order"."id" = ? AND "store_order"."status" IN (...));
+INSERT INTO "store_changelogentry" ("model", "object_id", "action", "user_id", "created_at") VALUES (?, ?, ?, ?, ?) RETURNING "store_changelogentry"."id";
+INSERT INTO "store_outboxevent" ("event_type", "order_key", "payload", "created_at") VALUES (?, ?, ?, ?) RETURNING "store_outboxevent"."id";
+SELECT "store_stockmovement"."product_id" AS "product_id", "store_stockmovement"."delta" AS "delta" FROM "store_stockmovement" WHERE ("store_stockmovement"."order_id" = ? AND "store_stockmovement"."reason" = ?);
+UPDATE "store_product" SET "stock_quantity" = CASE WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + ?) ELSE "store_product"."stock_quantity" END, "sales_count" = CASE WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + -?) ELSE "store_product"."sales_count" END, "trending_score" = CASE WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + -?) ELSE "store_product"."trending_score" END WHERE "store_product"."id" IN (...);
+INSERT INTO "store_stockmovement" ("product_id", "delta", "reason", "order_id", "created_at") VALUES (...), ... RETURNING "store_stockmovement"."id";
+INSERT INTO "store_changelogentry" ("model", "object_id", "action", "user_id", "created_at") VALUES (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?) RETURNING "store_changelogentry"."id";
+RELEASE SAVEPOINT "sp";
@@ -0,0 +1,22 @@
+-- 21 queries
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?) LIMIT ?;
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ? LIMIT ?;
+SELECT "store_cart"."id", "store_cart"."user_id", "store_cart"."created_at", "store_cart"."updated_at", "store_cart"."is_active" FROM "store_cart" WHERE ("store_cart"."is_active" AND "store_cart"."user_id" = ?) LIMIT ?;
+SELECT "store_cartitem"."id", "store_cartitem"."cart_id", "store_cartitem"."product_id", "store_cartitem"."quantity", "store_cartitem"."price", "store_cartitem"."currency", "store_cartitem"."added_at", "store_cartitem"."updated_at", "store_product"."id", "store_product"."name", "store_product"."description", "store_product"."price", "store_product"."category_id", "store_product"."stock_quantity", "store_product"."is_active", "store_product"."sku", "store_product"."weight", "store_product"."length", "store_product"."width", "store_product"."height", "store_product"."sales_count", "store_product"."trending_score", "store_product"."created_at", "store_product"."updated_at" FROM "store_cartitem" INNER JOIN "store_product" ON ("store_cartitem"."product_id" = "store_product"."id") WHERE "store_cartitem"."cart_id" = ? ORDER BY "store_cartitem"."added_at" DESC;
+SELECT "store_promotion"."id", "store_promotion"."name", "store_promotion"."kind", "store_promotion"."product_id", "store_promotion"."category_id", "store_promotion"."percent_off", "store_promotion"."amount_off", "store_promotion"."buy_quantity", "store_promotion"."get_quantity", "store_promotion"."min_subtotal", "store_promotion"."is_active", "store_promotion"."starts_at", "store_promotion"."ends_at", "store_promotion"."created_at", "store_promotion"."updated_at" FROM "store_promotion" WHERE ("store_promotion"."is_active" AND ("store_promotion"."ends_at" IS NULL OR "store_promotion"."ends_at" > ?)) ORDER BY "store_promotion"."created_at" DESC;
+SAVEPOINT "sp";
+UPDATE "store_cart" SET "is_active" = ?, "updated_at" = ? WHERE ("store_cart"."is_active" AND "store_cart"."id" = ?);
+SELECT "store_cartitem"."id" AS "pk", "store_cartitem"."quantity" AS "quantity" FROM "store_cartitem" WHERE "store_cartitem"."cart_id" = ?;
+SELECT "store_order"."id", "store_order"."order_id", "store_order"."user_id", "store_order"."created_at", "store_order"."updated_at", "store_order"."status", "store_order"."total_price", "store_order"."discount_total", "store_order"."shipping_price", "store_order"."shipping_zone", "store_order"."currency", "store_order"."shipping_address", "store_order"."billing_address", "store_order"."cod", "store_order"."pick_list_id" FROM "store_order" WHERE ("store_order"."created_at" >= ? AND "store_order"."created_at" < ?) ORDER BY "store_order"."id" DESC LIMIT ?;
+SAVEPOINT "sp";
+INSERT INTO "store_order" ("order_id", "user_id", "created_at", "updated_at", "status", "total_price", "discount_total", "shipping_price", "shipping_zone", "currency", "shipping_address", "billing_address", "cod", "pick_list_id") VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, NULL) RETURNING "store_order"."id";
+INSERT INTO "store_changelogentry" ("model", "object_id", "action", "user_id", "created_at") VALUES (?, ?, ?, ?, ?) RETURNING "store_changelogentry"."id";
+INSERT INTO "store_outboxevent" ("event_type", "order_key", "payload", "created_at") VALUES (?, ?, ?, ?) RETURNING "store_outboxevent"."id";
+RELEASE SAVEPOINT "sp";
+UPDATE "store_product" SET "stock_quantity" = CASE WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) WHEN ("store_product"."id" = ?) THEN ("store_product"."stock_quantity" + -?) ELSE "store_product"."stock_quantity" END, "sales_count" = CASE WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."sales_count" + ?) ELSE "store_product"."sales_count" END, "trending_score" = CASE WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) WHEN ("store_product"."id" = ?) THEN ("store_product"."trending_score" + ?) ELSE "store_product"."trending_score" END WHERE ("store_product"."id" IN (...) AND (("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?) OR ("store_product"."id" = ? AND "store_product"."stock_quantity" >= ?)));
+INSERT INTO "store_stockmovement" ("product_id", "delta", "reason", "order_id", "created_at") VALUES (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?), (?, -?, ?, ?, ?) RETURNING "store_stockmovement"."id";
+INSERT INTO "store_changelogentry" ("model", "object_id", "action", "user_id", "created_at") VALUES (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?), (?, ?, ?, NULL, ?) RETURNING "store_changelogentry"."id";
+INSERT INTO "store_orderitem" ("order_id", "product_id", "quantity", "price", "discount", "currency", "added_at", "updated_at") VALUES (...), ... RETURNING "store_orderitem"."id";
+SELECT "store_cartitem"."id", "store_cartitem"."cart_id", "store_cartitem"."product_id", "store_cartitem"."quantity", "store_cartitem"."price", "store_cartitem"."currency", "store_cartitem"."added_at", "store_cartitem"."updated_at" FROM "store_cartitem" WHERE "store_cartitem"."cart_id" = ?;
+DELETE FROM "store_cartitem" WHERE "store_cartitem"."id" IN (...);
+RELEASE SAVEPOINT "sp";
@@ -0,0 +1,5 @@
+-- 4 queries
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?) LIMIT ?;
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ? LIMIT ?;
+SELECT "store_cart"."id", "store_cart"."user_id", "store_cart"."created_at", "store_cart"."updated_at", "store_cart"."is_active" FROM "store_cart" WHERE ("store_cart"."is_active" AND "store_cart"."user_id" = ?) LIMIT ?;
+SELECT "store_cartitem"."id", "store_cartitem"."product_id", "store_cartitem"."quantity" FROM "store_cartitem" WHERE "store_cartitem"."cart_id" = ? ORDER BY "store_cartitem"."added_at" DESC;
@@ -0,0 +1,5 @@
+-- 4 queries
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?) LIMIT ?;
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ? LIMIT ?;
+SELECT "store_ledgercursor"."position" AS "position" FROM "store_ledgercursor" WHERE "store_ledgercursor"."name" = ? ORDER BY "store_ledgercursor"."id" ASC LIMIT ?;
+SELECT "store_changelogentry"."id", "store_changelogentry"."model", "store_changelogentry"."object_id", "store_changelogentry"."action", "store_changelogentry"."user_id", "store_changelogentry"."created_at" FROM "store_changelogentry" WHERE (("store_changelogentry"."model" IN (...) OR ("store_changelogentry"."model" = ? AND "store_changelogentry"."user_id" = ?)) AND "store_changelogentry"."id" > ?) ORDER BY "store_changelogentry"."id" ASC LIMIT ?;
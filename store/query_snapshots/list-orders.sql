@@ -0,0 +1,4 @@
+-- 3 queries
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?) LIMIT ?;
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ? LIMIT ?;
+SELECT "store_order"."id", "store_order"."order_id", "store_order"."user_id", "store_order"."created_at", "store_order"."updated_at", "store_order"."status", "store_order"."total_price", "store_order"."discount_total", "store_order"."shipping_price", "store_order"."shipping_zone", "store_order"."currency", "store_order"."shipping_address", "store_order"."billing_address", "store_order"."cod", "store_order"."pick_list_id", SUM("store_orderitem"."quantity") AS "total_items" FROM "store_order" LEFT OUTER JOIN "store_orderitem" ON ("store_order"."id" = "store_orderitem"."order_id") WHERE "store_order"."user_id" = ? GROUP BY "store_order"."id", "store_order"."order_id", "store_order"."user_id", "store_order"."created_at", "store_order"."updated_at", "store_order"."status", "store_order"."total_price", "store_order"."discount_total", "store_order"."shipping_price", "store_order"."shipping_zone", "store_order"."currency", "store_order"."shipping_address", "store_order"."billing_address", "store_order"."cod", "store_order"."pick_list_id" ORDER BY "store_order"."created_at" DESC;
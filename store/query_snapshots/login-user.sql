@@ -0,0 +1,10 @@
+-- 9 queries
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."username" = ? LIMIT ?;
+SELECT ? AS "a" FROM "django_session" WHERE "django_session"."session_key" = ? LIMIT ?;
+SAVEPOINT "sp";
+INSERT INTO "django_session" ("session_key", "session_data", "expire_date") VALUES (?, ?, ?);
+RELEASE SAVEPOINT "sp";
+UPDATE "auth_user" SET "last_login" = ? WHERE "auth_user"."id" = ?;
+SAVEPOINT "sp";
+UPDATE "django_session" SET "session_data" = ?, "expire_date" = ? WHERE "django_session"."session_key" = ?;
+RELEASE SAVEPOINT "sp";
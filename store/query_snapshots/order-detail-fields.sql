@@ -0,0 +1,5 @@
+-- 4 queries
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?) LIMIT ?;
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ? LIMIT ?;
+SELECT "store_order"."id", "store_order"."status" FROM "store_order" WHERE ("store_order"."order_id" = ? AND "store_order"."user_id" = ?) LIMIT ?;
+SELECT "store_orderitem"."id", "store_orderitem"."order_id", "store_orderitem"."product_id" FROM "store_orderitem" WHERE "store_orderitem"."order_id" IN (...) ORDER BY "store_orderitem"."added_at" DESC;
@@ -0,0 +1,6 @@
+-- 5 queries
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?) LIMIT ?;
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ? LIMIT ?;
+SELECT "store_order"."id", "store_order"."order_id", "store_order"."user_id", "store_order"."created_at", "store_order"."updated_at", "store_order"."status", "store_order"."total_price", "store_order"."discount_total", "store_order"."shipping_price", "store_order"."shipping_zone", "store_order"."currency", "store_order"."shipping_address", "store_order"."billing_address", "store_order"."cod", "store_order"."pick_list_id" FROM "store_order" WHERE ("store_order"."order_id" = ? AND "store_order"."user_id" = ?) LIMIT ?;
+SELECT "store_orderitem"."id", "store_orderitem"."order_id", "store_orderitem"."product_id", "store_orderitem"."quantity", "store_orderitem"."price", "store_orderitem"."discount", "store_orderitem"."currency", "store_orderitem"."added_at", "store_orderitem"."updated_at" FROM "store_orderitem" WHERE "store_orderitem"."order_id" IN (...) ORDER BY "store_orderitem"."added_at" DESC;
+SELECT "store_product"."id", "store_product"."name", "store_product"."description", "store_product"."price", "store_product"."category_id", "store_product"."stock_quantity", "store_product"."is_active", "store_product"."sku", "store_product"."weight", "store_product"."length", "store_product"."width", "store_product"."height", "store_product"."sales_count", "store_product"."trending_score", "store_product"."created_at", "store_product"."updated_at" FROM "store_product" WHERE ("store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ? OR "store_product"."id" = ?);
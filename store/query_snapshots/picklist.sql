@@ -0,0 +1,11 @@
+-- 10 queries
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?) LIMIT ?;
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ? LIMIT ?;
+SAVEPOINT "sp";
+SELECT "store_order"."id", "store_order"."order_id", "store_order"."user_id", "store_order"."created_at", "store_order"."status", "store_order"."total_price", "store_order"."currency" FROM "store_order" WHERE "store_order"."status" IN (...) ORDER BY "store_order"."id" ASC LIMIT ?;
+INSERT INTO "store_picklist" ("created_at", "created_by_id", "order_count") VALUES (?, ?, ?) RETURNING "store_picklist"."id";
+UPDATE "store_order" SET "status" = ?, "pick_list_id" = ?, "updated_at" = ? WHERE ("store_order"."id" IN (...) AND "store_order"."status" IN (...));
+INSERT INTO "store_changelogentry" ("model", "object_id", "action", "user_id", "created_at") VALUES (...), ... RETURNING "store_changelogentry"."id";
+INSERT INTO "store_outboxevent" ("event_type", "order_key", "payload", "created_at") VALUES (...), ... RETURNING "store_outboxevent"."id";
+RELEASE SAVEPOINT "sp";
+SELECT "store_orderitem"."product_id" AS "product_id", "store_category"."name" AS "category", "store_product"."sku" AS "sku", "store_product"."name" AS "name", SUM("store_orderitem"."quantity") AS "quantity", COUNT(DISTINCT "store_orderitem"."order_id") AS "orders" FROM "store_orderitem" INNER JOIN "store_order" ON ("store_orderitem"."order_id" = "store_order"."id") INNER JOIN "store_product" ON ("store_orderitem"."product_id" = "store_product"."id") INNER JOIN "store_category" ON ("store_product"."category_id" = "store_category"."id") WHERE "store_order"."pick_list_id" = ? GROUP BY ?, ?, ?, ? ORDER BY ? ASC, ? ASC, ? ASC;
@@ -0,0 +1,2 @@
+-- 1 queries
+SELECT "store_product"."id", "store_product"."name", "store_product"."price" FROM "store_product" ORDER BY "store_product"."created_at" DESC;
@@ -0,0 +1,2 @@
+-- 1 queries
+SELECT "store_product"."id", "store_product"."name", "store_product"."description", "store_product"."price", "store_product"."category_id", "store_product"."stock_quantity", "store_product"."is_active", "store_product"."sku", "store_product"."weight", "store_product"."length", "store_product"."width", "store_product"."height", "store_product"."sales_count", "store_product"."trending_score", "store_product"."created_at", "store_product"."updated_at", "store_category"."id", "store_category"."name", "store_category"."description", "store_category"."created_at", "store_category"."updated_at" FROM "store_product" INNER JOIN "store_category" ON ("store_product"."category_id" = "store_category"."id") ORDER BY "store_product"."created_at" DESC;
@@ -0,0 +1,2 @@
+-- 1 queries
+SELECT "store_product"."id", "store_product"."weight", "store_product"."length", "store_product"."width", "store_product"."height" FROM "store_product" WHERE ("store_product"."is_active" AND "store_product"."id" IN (...)) ORDER BY "store_product"."created_at" DESC;
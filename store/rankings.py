@@ -0,0 +1,53 @@
+"""
+Bestseller and trending counters, kept on Product and updated with the stock.
+
+``sales_count`` is the number of units sold (cancellations subtract theirs).
+``trending_score`` is units sold with exponential time decay, half-life
+TRENDING_HALF_LIFE_DAYS. Instead of decaying every score periodically, a sale
+at time t adds ``2 ** ((t - TRENDING_EPOCH) / half-life)``: all scores decay by
+the same factor, so ordering by the stored score is ordering by the decayed
+score, and an update is a plain increment on an indexed column. ``decayed()``
+turns a stored score into "units, decayed to now".
+
+The weights grow by a factor of 2 per half-life and overflow a double after
+about a thousand half-lives (~19 years at 7 days); long before that, move
+TRENDING_EPOCH forward and divide the stored scores by the same factor.
+Changing the half-life needs the same rescaling.
+"""
+from django.conf import settings
+from django.db.models import Case, F, FloatField, IntegerField, When
+from django.utils import timezone
+
+SECONDS_PER_DAY = 86400
+
+
+def weight(moment):
+    """Score added by one unit sold at ``moment``."""
+    half_lives = (moment - settings.TRENDING_EPOCH).total_seconds() / (settings.TRENDING_HALF_LIFE_DAYS * SECONDS_PER_DAY)
+    return 2.0 ** half_lives
+
+
+def decayed(score, now=None):
+    """A stored trending_score as units, decayed to ``now``."""
+    return score / weight(now or timezone.now())
+
+
+def sales_updates(units, moment):
+    """
+    Update kwargs adding ``units`` ({product_id: units sold, negative for
+    cancellations}) sold at ``moment`` to the counters, for a queryset
+    ``update()`` over those products.
+    """
+    moment_weight = weight(moment)
+    return {
+        'sales_count': Case(
+            *(When(pk=product_id, then=F('sales_count') + count) for product_id, count in units.items()),
+            default=F('sales_count'),
+            output_field=IntegerField(),
+        ),
+        'trending_score': Case(
+            *(When(pk=product_id, then=F('trending_score') + count * moment_weight) for product_id, count in units.items()),
+            default=F('trending_score'),
+            output_field=FloatField(),
+        ),
+    }
@@ -0,0 +1,164 @@
+"""
+"Frequently bought together" recommendations from OrderItem co-occurrence.
+
+``build_recommendations`` streams (order_id, product_id) pairs ordered by
+order, counts how often every two products share a basket and keeps the top
+RECOMMENDATIONS_TOP_K neighbours of each product. The result is written to
+RECOMMENDATIONS_FILE in a flat binary layout (little-endian):
+
+    header      magic, top_k, product count, neighbour count, version
+    products    uint32[n]      sorted product ids
+    offsets     uint32[n + 1]  start of each product's neighbours
+    neighbours  uint32[m]      neighbour ids, best first
+    scores      uint32[m]      co-occurrence counts
+
+Web workers memory-map the file and read it through ``memoryview`` casts, so
+a lookup is a bisect over the product ids plus one slice, without touching the
+database or deserializing anything. A rebuild replaces the file atomically;
+workers pick the new one up within RECOMMENDATIONS_CHECK_INTERVAL seconds
+(see store/datafiles.py) while readers of the old mapping finish undisturbed.
+"""
+import bisect
+import heapq
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from array import array
+
+from .datafiles import VersionedFile
+
+MAGIC = b'FBT1'
+# Neighbours returned when the caller does not ask for a number
+DEFAULT_LIMIT = 10
+CART_LIMIT = 5
+HEADER = struct.Struct('<4sIIIQ')
+
+
+class Recommendations:
+    def __init__(self, version, products, offsets, neighbours, scores):
+        self.version = version
+        self.products = products
+        self.offsets = offsets
+        self.neighbours = neighbours
+        self.scores = scores
+
+    def __len__(self):
+        return len(self.products)
+
+    def _span(self, product_id):
+        index = bisect.bisect_left(self.products, product_id)
+        if index == len(self.products) or self.products[index] != product_id:
+            return 0, 0
+        return self.offsets[index], self.offsets[index + 1]
+
+    def for_product(self, product_id, limit):
+        """[(product_id, score)] of the products most often bought with ``product_id``."""
+        start, end = self._span(product_id)
+        end = min(end, start + limit)
+        return list(zip(self.neighbours[start:end].tolist(), self.scores[start:end].tolist()))
+
+    def for_cart(self, product_ids, limit):
+        """Neighbours of every product in a cart, scores summed, excluding the cart's own products."""
+        in_cart = set(product_ids)
+        totals = {}
+        for product_id in in_cart:
+            start, end = self._span(product_id)
+            for neighbour, score in zip(self.neighbours[start:end].tolist(), self.scores[start:end].tolist()):
+                if neighbour not in in_cart:
+                    totals[neighbour] = totals.get(neighbour, 0) + score
+        return heapq.nlargest(limit, totals.items(), key=lambda item: (item[1], -item[0]))
+
+
+EMPTY = Recommendations('', (), (0,), array('I'), array('I'))
+
+
+def _map(path):
+    with open(path, 'rb') as fh:
+        return mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _parse(mapped):
+    magic, top_k, count, total, version = HEADER.unpack_from(mapped)
+    if magic != MAGIC:
+        raise ValueError('Not a recommendations file')
+    words = memoryview(mapped)[HEADER.size:].cast('I')
+    products = words[:count]
+    offsets = words[count:2 * count + 1]
+    neighbours = words[2 * count + 1:2 * count + 1 + total]
+    scores = words[2 * count + 1 + total:2 * count + 1 + 2 * total]
+    return Recommendations(str(version), products, offsets, neighbours, scores)
+
+
+_file = VersionedFile(
+    'RECOMMENDATIONS_FILE', 'RECOMMENDATIONS_CHECK_INTERVAL', _parse, load=_map, missing=lambda: EMPTY,
+)
+
+
+def get_recommendations():
+    return _file.get()
+
+
+def invalidate():
+    _file.invalidate()
+
+
+def count_pairs(pairs, max_basket):
+    """
+    Count co-occurrences from (order_id, product_id) pairs sorted by order.
+    Returns {product_id: {neighbour_id: count}}. Baskets larger than
+    ``max_basket`` distinct products are skipped: they add pairs quadratically
+    and say little about what goes together.
+    """
+    counts = {}
+    basket, current = set(), None
+    for order_id, product_id in pairs:
+        if order_id != current:
+            _count_basket(counts, basket, max_basket)
+            basket, current = set(), order_id
+        basket.add(product_id)
+    _count_basket(counts, basket, max_basket)
+    return counts
+
+
+def _count_basket(counts, basket, max_basket):
+    if len(basket) < 2 or len(basket) > max_basket:
+        return
+    for product_id in basket:
+        row = counts.get(product_id)
+        if row is None:
+            row = counts[product_id] = {}
+        for other in basket:
+            if other != product_id:
+                row[other] = row.get(other, 0) + 1
+
+
+def write(path, counts, top_k):
+    """Write the top ``top_k`` neighbours of each product in ``counts`` to ``path``, atomically."""
+    if sys.byteorder != 'little' or array('I').itemsize != 4:
+        raise RuntimeError('The recommendations file needs little-endian 4-byte unsigned ints')
+    products = array('I', sorted(counts))
+    offsets = array('I', [0])
+    neighbours, scores = array('I'), array('I')
+    for product_id in products:
+        # Best first; ties go to the lower id so rebuilds are deterministic
+        best = heapq.nsmallest(top_k, counts[product_id].items(), key=lambda item: (-item[1], item[0]))
+        neighbours.extend(neighbour for neighbour, _ in best)
+        scores.extend(score for _, score in best)
+        offsets.append(len(neighbours))
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, temporary = tempfile.mkstemp(dir=directory, prefix='.recommendations-')
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write(HEADER.pack(MAGIC, top_k, len(products), len(neighbours), time.time_ns()))
+            for part in (products, offsets, neighbours, scores):
+                part.tofile(fh)
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+    return len(products), len(neighbours)
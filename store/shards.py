@@ -0,0 +1,291 @@
+"""
+Optional sharding of carts and orders by user.
+
+Cart, CartItem, Order and OrderItem rows of a user live on the database alias
+``ORDER_SHARDS[user_id % len(ORDER_SHARDS)]``; everything else (users, the
+catalog, stock, the change feed, the outbox, pick lists) stays on ``default``,
+which is also shard 0. ORDER_SHARD_URLS adds the other shards; without it
+ORDER_SHARDS is ``['default']`` and nothing changes.
+
+- OrderShardRouter sends saves of a sharded row to its owner's shard and
+  related lookups to the database of the row they start from; so do
+  ``objects.create()`` and ``bulk_create()`` of the sharded models
+  (ShardedQuerySet). Querysets have
+  no owner to route by: code reading carts or orders picks the alias with
+  ``for_user()`` / ``for_pk()`` and ``.using()``, or fans out with
+  ``fan_out()``.
+- Every table exists on every shard. After migrate, the foreign key
+  constraints from sharded rows to users, products and pick lists are
+  dropped on the other shards, and those from stock movements to orders on
+  default; without shards every constraint stays. JOINs across aliases are
+  impossible: ``related()`` picks select_related() on default and
+  prefetch_related() elsewhere. Deleting a user or product does not cascade
+  into the other shards.
+- Primary keys of shard k start at ``k << SHARD_BITS`` (set after migrate),
+  so they are unique across shards and ``for_pk()`` finds a row's shard from
+  its id alone.
+- ``atomic(alias)`` opens a transaction on default and on the shard. Two
+  databases cannot commit atomically: the shard commits first, so a crash in
+  between leaves an order without its outbox event and stock movements, never
+  the other way round.
+"""
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, connections, migrations, router, transaction
+from django.db.migrations.state import ProjectState
+from django.db.models import Prefetch, QuerySet
+from django.db.models.signals import post_migrate
+from django.dispatch import receiver
+
+SHARDED = {'store.cart', 'store.cartitem', 'store.order', 'store.orderitem'}
+# Foreign keys to rows on another database, by where their table is: sharded rows point
+# to default, stock movements (on default) to orders on any shard
+CROSS_KEYS_ON_SHARDS = [
+    ('store.cart', 'user'), ('store.cartitem', 'product'), ('store.order', 'user'),
+    ('store.order', 'pick_list'), ('store.orderitem', 'product'),
+]
+CROSS_KEYS_ON_DEFAULT = [('store.stockmovement', 'order')]
+# Ids of shard k start above k << SHARD_BITS; leaves 2**48 rows per table and shard
+SHARD_BITS = 48
+# Chunks a stream() reader thread may read ahead of its consumer
+READ_AHEAD = 2
+
+
+def enabled():
+    return len(settings.ORDER_SHARDS) > 1
+
+
+def for_user(user_id):
+    """The alias holding the carts and orders of ``user_id``."""
+    return settings.ORDER_SHARDS[user_id % len(settings.ORDER_SHARDS)]
+
+
+def for_pk(pk):
+    """The alias holding the cart, order or item with primary key ``pk``."""
+    return settings.ORDER_SHARDS[pk >> SHARD_BITS]
+
+
+def index(alias):
+    return settings.ORDER_SHARDS.index(alias)
+
+
+class OrderShardRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.label_lower not in SHARDED:
+            return DEFAULT_DB_ALIAS
+        instance = hints.get('instance')
+        if instance is None:
+            return None
+        if instance._meta.label_lower in SHARDED and instance._state.db:
+            return instance._state.db
+        if instance._meta.label == settings.AUTH_USER_MODEL:
+            return for_user(instance.pk)
+        if getattr(instance, 'user_id', None) is not None:
+            return for_user(instance.user_id)
+        return None
+
+    db_for_write = db_for_read
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if obj1._meta.label_lower in SHARDED or obj2._meta.label_lower in SHARDED:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Every table on every shard: migrations stay plain, and tests use the same schema
+        return None
+
+
+class ShardedQuerySet(QuerySet):
+    def create(self, **kwargs):
+        # Without using(), the row goes to its owner's shard like save() would send it
+        if self._db is None:
+            return self.using(router.db_for_write(self.model, instance=self.model(**kwargs))).create(**kwargs)
+        return super().create(**kwargs)
+
+    def bulk_create(self, objs, *args, **kwargs):
+        if self._db is not None:
+            return super().bulk_create(objs, *args, **kwargs)
+        objs = list(objs)
+        by_alias = {}
+        for obj in objs:
+            by_alias.setdefault(router.db_for_write(self.model, instance=obj), []).append(obj)
+        for alias, members in by_alias.items():
+            self.using(alias).bulk_create(members, *args, **kwargs)
+        return objs
+
+
+@contextmanager
+def atomic(alias, savepoint=True):
+    """transaction.atomic() on default and, when it is another database, on shard ``alias``."""
+    with transaction.atomic(savepoint=savepoint):
+        if alias == DEFAULT_DB_ALIAS:
+            yield
+        else:
+            with transaction.atomic(using=alias, savepoint=savepoint):
+                yield
+
+
+def set_rollback(alias):
+    """transaction.set_rollback(True) for both transactions of atomic(alias)."""
+    transaction.set_rollback(True)
+    if alias != DEFAULT_DB_ALIAS:
+        transaction.set_rollback(True, using=alias)
+
+
+def related(queryset, field, columns=None):
+    """
+    Load the ``field`` relation of ``queryset`` (from default) with it: one JOIN
+    when ``queryset`` reads from default, else a second query there. ``columns``
+    limits the related columns loaded; returned are the queryset and the names
+    to pass to ``only()`` for them.
+    """
+    if queryset.db == DEFAULT_DB_ALIAS:
+        return queryset.select_related(field), [f'{field}__{column}' for column in columns or ()]
+    model = queryset.model._meta.get_field(field).related_model
+    related_queryset = model.objects.all() if columns is None else model.objects.only(*columns)
+    return queryset.prefetch_related(Prefetch(field, queryset=related_queryset)), [field]
+
+
+def _inline(aliases):
+    # Other connections would not see the writes of a transaction open on this thread
+    return len(aliases) == 1 or any(connections[alias].in_atomic_block for alias in aliases)
+
+
+def fan_out(function, aliases=None):
+    """
+    ``function(alias)`` for every shard, in a thread each when there are
+    several; returns the results in shard order. Each thread closes its own
+    connections when done. Inside a transaction on any of the shards the calls
+    run one after the other on this thread.
+    """
+    aliases = aliases or settings.ORDER_SHARDS
+    if _inline(aliases):
+        return [function(alias) for alias in aliases]
+
+    def run(alias):
+        try:
+            return function(alias)
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=len(aliases)) as pool:
+        return list(pool.map(run, aliases))
+
+
+def stream(querysets, chunk_size):
+    """
+    An iterator over each of ``querysets`` (one per shard). With several, each
+    is read in a thread of its own once iteration starts, up to READ_AHEAD
+    chunks ahead of its consumer, so the shards run their queries at the same
+    time. Closing an iterator stops its thread.
+    """
+    if _inline([queryset.db for queryset in querysets]):
+        return [queryset.iterator(chunk_size=chunk_size) for queryset in querysets]
+    return [_stream(queryset, chunk_size) for queryset in querysets]
+
+
+_END = object()
+
+
+def _stream(queryset, chunk_size):
+    chunks = queue.Queue(maxsize=READ_AHEAD)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def read():
+        try:
+            chunk = []
+            for row in queryset.iterator(chunk_size=chunk_size):
+                chunk.append(row)
+                if len(chunk) == chunk_size:
+                    if not put(chunk):
+                        return
+                    chunk = []
+            if put(chunk):
+                put(_END)
+        except Exception as exc:
+            put(exc)
+        finally:
+            connections.close_all()
+
+    threading.Thread(target=read, daemon=True).start()
+    try:
+        while (chunk := chunks.get()) is not _END:
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield from chunk
+    finally:
+        stop.set()
+
+
+@receiver(post_migrate)
+def drop_cross_keys(sender, using, **kwargs):
+    """
+    Drop the foreign key constraints that rows on another database would
+    violate. Runs before reserve_ids(): rebuilding an empty SQLite table
+    forgets its sequence.
+    """
+    if sender.label != 'store' or not enabled() or using not in settings.ORDER_SHARDS:
+        return
+    connection = connections[using]
+    keys = CROSS_KEYS_ON_DEFAULT if using == DEFAULT_DB_ALIAS else CROSS_KEYS_ON_SHARDS
+    # Altered like a migration would, so each change starts from the previous one
+    state = ProjectState.from_apps(apps)
+    with connection.schema_editor() as editor:
+        for label, name in keys:
+            app_label, model_name = label.split('.')
+            model = state.apps.get_model(label)
+            field = model._meta.get_field(name)
+            with connection.cursor() as cursor:
+                constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+            if not any(c['foreign_key'] and c['columns'] == [field.column] for c in constraints.values()):
+                continue
+            unconstrained = field.clone()
+            unconstrained.db_constraint = False
+            operation = migrations.AlterField(model_name, name, unconstrained)
+            altered = state.clone()
+            operation.state_forwards(app_label, altered)
+            operation.database_forwards(app_label, editor, state, altered)
+            state = altered
+
+
+@receiver(post_migrate)
+def reserve_ids(sender, using, **kwargs):
+    """Start the sharded tables of shard k at ``k << SHARD_BITS``."""
+    if sender.label != 'store' or using not in settings.ORDER_SHARDS or not index(using):
+        return
+    start = index(using) << SHARD_BITS
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        for label in sorted(SHARDED):
+            table = apps.get_model(label)._meta.db_table
+            if connection.vendor == 'sqlite':
+                cursor.execute('DELETE FROM sqlite_sequence WHERE name = %s AND seq < %s', [table, start])
+                cursor.execute(
+                    'INSERT INTO sqlite_sequence (name, seq) SELECT %s, %s '
+                    'WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = %s)',
+                    [table, start, table],
+                )
+            elif connection.vendor == 'postgresql':
+                cursor.execute(
+                    f'SELECT setval(pg_get_serial_sequence(%s, %s), '
+                    f'GREATEST(%s, (SELECT COALESCE(MAX(id), 0) FROM {connection.ops.quote_name(table)})))',
+                    [table, 'id', start],
+                )
+            else:
+                raise ImproperlyConfigured(f'Order shards need SQLite or PostgreSQL, not {connection.vendor}')
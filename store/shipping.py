@@ -0,0 +1,167 @@
+"""
+Shipping quotes from product weight and dimensions.
+
+A cart ships as one parcel billed on the greater of its actual weight and its
+dimensional weight (volume / ``dim_divisor``), both summed in a single pass over
+the cart's products. Each zone's weight bands are kept as a sorted list of upper
+limits, so finding the band is a bisect; parcels above the last band pay
+``per_kg_over`` for every started kilogram.
+
+Rates come from SHIPPING_RATES_FILE (see store/datafiles.py for reloading) and
+are quoted in the file's currency, the base currency. Quotes are cached in the
+shared cache under a hash of the cart contents, the zone, the rate table version
+and the catalog version, so editing a product or the rate file never serves a
+stale quote.
+"""
+import bisect
+import hashlib
+from collections import namedtuple
+from decimal import ROUND_CEILING, Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache import aget_version, get_version
+from .datafiles import VersionedFile
+from .models import Product
+from .signals import CATALOG
+
+GRAMS_PER_KG = Decimal(1000)
+WEIGHT_PLACES = Decimal('0.001')
+
+Quote = namedtuple('Quote', 'zone actual_weight_kg dimensional_weight_kg billable_weight_kg price')
+
+
+class UnknownZone(ValueError):
+    pass
+
+
+class ZoneRates:
+    __slots__ = ('limits', 'prices', 'per_kg_over')
+
+    def __init__(self, bands, per_kg_over):
+        bands = sorted((Decimal(limit), Decimal(price)) for limit, price in bands)
+        self.limits = [limit for limit, _ in bands]
+        self.prices = [price for _, price in bands]
+        self.per_kg_over = Decimal(per_kg_over)
+
+    def price(self, weight_kg):
+        band = bisect.bisect_left(self.limits, weight_kg)
+        if band < len(self.limits):
+            return self.prices[band]
+        extra_kg = (weight_kg - self.limits[-1]).to_integral_value(rounding=ROUND_CEILING)
+        return self.prices[-1] + extra_kg * self.per_kg_over
+
+
+class RateTable:
+    def __init__(self, version, currency, dim_divisor, default_item_weight_g, zones):
+        self.version = version
+        self.currency = currency
+        self.dim_divisor = dim_divisor
+        self.default_item_weight_g = default_item_weight_g
+        self.zones = zones
+
+    def quote(self, zone, lines):
+        """Quote ``lines`` of (product, quantity) shipped together to ``zone``."""
+        actual_g = volume_cm3 = Decimal(0)
+        for product, quantity in lines:
+            weight = product.weight if product.weight is not None else self.default_item_weight_g
+            actual_g += weight * quantity
+            if product.length and product.width and product.height:
+                volume_cm3 += product.length * product.width * product.height * quantity
+        actual_kg = (actual_g / GRAMS_PER_KG).quantize(WEIGHT_PLACES)
+        dimensional_kg = (volume_cm3 / self.dim_divisor).quantize(WEIGHT_PLACES)
+        billable_kg = max(actual_kg, dimensional_kg)
+        return Quote(zone, actual_kg, dimensional_kg, billable_kg, self.zones[zone].price(billable_kg))
+
+
+def _parse(data):
+    return RateTable(
+        str(data['version']),
+        data.get('currency', 'USD').upper(),
+        Decimal(data['dim_divisor']),
+        Decimal(data['default_item_weight_g']),
+        {name.upper(): ZoneRates(zone['bands'], zone['per_kg_over']) for name, zone in data['zones'].items()},
+    )
+
+
+_rates_file = VersionedFile('SHIPPING_RATES_FILE', 'SHIPPING_RATES_CHECK_INTERVAL', _parse)
+
+
+def get_rates():
+    return _rates_file.get()
+
+
+def invalidate():
+    _rates_file.invalidate()
+
+
+def normalize_zone(zone):
+    """Upper-case ``zone`` (default SHIPPING_DEFAULT_ZONE) and check it has rates; raises UnknownZone."""
+    if zone is not None and not isinstance(zone, str):
+        raise UnknownZone(zone)
+    zone = (zone or settings.SHIPPING_DEFAULT_ZONE).strip().upper()
+    if zone not in get_rates().zones:
+        raise UnknownZone(zone)
+    return zone
+
+
+def _quantities(items):
+    quantities = {}
+    for product_id, quantity in items:
+        quantities[product_id] = quantities.get(product_id, 0) + quantity
+    return quantities
+
+
+def _cache_key(table, catalog_version, zone, quantities):
+    contents = ','.join(f'{product_id}x{quantity}' for product_id, quantity in sorted(quantities.items()))
+    digest = hashlib.sha1(f'{table.version}|{catalog_version}|{zone}|{contents}'.encode()).hexdigest()
+    return f'shipping:quote:{digest}'
+
+
+def _empty_quote(zone):
+    zero = Decimal('0.000')
+    return Quote(zone, zero, zero, zero, Decimal('0.00'))
+
+
+def _compute(table, zone, quantities, products):
+    missing = quantities.keys() - products.keys()
+    if missing:
+        raise Product.DoesNotExist(f'Product not found: {min(missing)}')
+    return table.quote(zone, ((products[product_id], quantity) for product_id, quantity in quantities.items()))
+
+
+def quote(items, zone, products=None):
+    """
+    Quote shipping for ``items`` of (product_id, quantity) to ``zone``. Pass
+    ``products`` ({id: Product}) when they are already loaded; otherwise they are
+    fetched in one query, and only on a cache miss.
+    """
+    quantities = _quantities(items)
+    if not quantities:
+        return _empty_quote(zone)
+    table = get_rates()
+    key = _cache_key(table, get_version(CATALOG), zone, quantities)
+    result = cache.get(key)
+    if result is None:
+        if products is None:
+            products = Product.objects.filter(is_active=True).only(
+                'id', 'weight', 'length', 'width', 'height',
+            ).in_bulk(quantities)
+        result = _compute(table, zone, quantities, products)
+        cache.set(key, result, settings.SHIPPING_QUOTE_TIMEOUT)
+    return result
+
+
+async def aquote(items, zone, products):
+    """Async quote() for callers that already hold the products."""
+    quantities = _quantities(items)
+    if not quantities:
+        return _empty_quote(zone)
+    table = get_rates()
+    key = _cache_key(table, await aget_version(CATALOG), zone, quantities)
+    result = await cache.aget(key)
+    if result is None:
+        result = _compute(table, zone, quantities, products)
+        await cache.aset(key, result, settings.SHIPPING_QUOTE_TIMEOUT)
+    return result
@@ -0,0 +1,164 @@
+"""
+Cache invalidation: bump the shared version of whatever a write makes stale.
+
+Bumps run on commit, so no process can rebuild from the old rows under the new
+version. Queryset ``update()``/``delete()`` skip these signals; callers doing
+bulk writes bump the version themselves.
+
+The same saves and deletes of Product, Category and Order are appended to the
+change feed (store/changes.py), inside the writer's transaction, and order
+creations and status changes to the webhook outbox (store/outbox.py).
+"""
+import threading
+from functools import partial
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import changes, outbox
+from .cache import bump_version, user_scope
+from .catalog import invalidate_products
+from .models import Cart, CartItem, Category, Order, OrderItem, Product, Promotion
+
+CATALOG = 'catalog'
+PROMOTIONS = 'promotions'
+# Bumped by store/inventory.py when stock changes through queryset updates
+STOCK = 'stock'
+
+
+@receiver([post_save, post_delete], sender=Promotion)
+def promotions_changed(sender, **kwargs):
+    transaction.on_commit(partial(bump_version, PROMOTIONS))
+
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=Category)
+def catalog_changed(sender, **kwargs):
+    transaction.on_commit(partial(bump_version, CATALOG))
+
+
+@receiver([post_save, post_delete], sender=Product)
+def product_changed(sender, instance, **kwargs):
+    transaction.on_commit(partial(invalidate_products, [instance.pk]))
+
+
+@receiver([post_save, post_delete], sender=Category)
+def category_changed(sender, instance, **kwargs):
+    # Cached products embed their category's name
+    transaction.on_commit(partial(_invalidate_category_products, instance.pk))
+
+
+def _invalidate_category_products(category_id):
+    invalidate_products(Product.objects.filter(category_id=category_id).values_list('pk', flat=True))
+
+
+class _PendingUsers(threading.local):
+    """
+    Per database alias, the users (or carts/orders whose owner is not loaded) to
+    invalidate when its transaction commits: (users, carts, orders).
+    """
+
+    def __init__(self):
+        self.by_alias = {}
+
+
+_pending = _PendingUsers()
+
+
+def invalidate_user(user_id):
+    """
+    Bump ``user_id``'s response cache version now and again on commit. The first
+    bump makes the writer's own next read miss, even inside an outer transaction;
+    the second evicts anything another request cached from the pre-commit state.
+    """
+    bump_version(user_scope(user_id))
+    invalidate_user_on_commit(user_id=user_id)
+
+
+def invalidate_user_on_commit(user_id=None, cart_id=None, order_id=None, using=DEFAULT_DB_ALIAS):
+    """
+    Bump the response cache version of ``user_id``, or of the owner of
+    ``cart_id``/``order_id``, when the current transaction on ``using`` (the
+    order shard written to, see store/shards.py) commits. Everything pending is
+    flushed together, with owners resolved in at most one query per model, so
+    deleting many cart items still costs a constant number of queries.
+    """
+    users, carts, orders = _pending.by_alias.setdefault(using, (set(), set(), set()))
+    if user_id is not None:
+        users.add(user_id)
+    if cart_id is not None:
+        carts.add(cart_id)
+    if order_id is not None:
+        orders.add(order_id)
+    transaction.on_commit(partial(_flush_pending_users, using), using=using)
+
+
+def _flush_pending_users(using):
+    if using not in _pending.by_alias:
+        # Already flushed by an earlier callback of the same transaction
+        return
+    users, carts, orders = _pending.by_alias.pop(using)
+    if carts:
+        users.update(Cart.objects.using(using).filter(pk__in=carts).values_list('user_id', flat=True))
+    if orders:
+        users.update(Order.objects.using(using).filter(pk__in=orders).values_list('user_id', flat=True))
+    for user_id in users:
+        bump_version(user_scope(user_id))
+
+
+@receiver([post_save, post_delete], sender=Cart)
+@receiver([post_save, post_delete], sender=Order)
+def owner_changed(sender, instance, using, **kwargs):
+    invalidate_user_on_commit(user_id=instance.user_id, using=using)
+
+
+@receiver([post_save, post_delete], sender=CartItem)
+def cart_item_changed(sender, instance, using, **kwargs):
+    if CartItem.cart.is_cached(instance):
+        invalidate_user_on_commit(user_id=instance.cart.user_id, using=using)
+    else:
+        invalidate_user_on_commit(cart_id=instance.cart_id, using=using)
+
+
+@receiver([post_save, post_delete], sender=OrderItem)
+def order_item_changed(sender, instance, using, **kwargs):
+    if OrderItem.order.is_cached(instance):
+        invalidate_user_on_commit(user_id=instance.order.user_id, using=using)
+    else:
+        invalidate_user_on_commit(order_id=instance.order_id, using=using)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Order)
+def record_save(sender, instance, created, **kwargs):
+    _record(instance, 'insert' if created else 'update')
+
+
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Order)
+def record_delete(sender, instance, **kwargs):
+    _record(instance, 'delete')
+
+
+def _record(instance, action):
+    # Written in the caller's transaction, so the feed never shows a rolled-back change
+    if isinstance(instance, Order):
+        changes.record('order', [instance.order_id], action, user_id=instance.user_id)
+    else:
+        changes.record(instance._meta.model_name, [instance.pk], action)
+
+
+@receiver(post_save, sender=Order)
+def publish_order(sender, instance, created, raw=False, **kwargs):
+    # Order.save() runs this inside its atomic block, so the event commits with the order
+    if raw:
+        return
+    previous = getattr(instance, '_loaded_status', None)
+    if created:
+        outbox.record('order.created', instance)
+    elif previous is not None and previous != instance.status:
+        outbox.record('order.status_changed', instance, previous_status=previous)
+    instance._loaded_status = instance.status
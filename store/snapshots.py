@@ -0,0 +1,212 @@
+"""
+Static catalog snapshots: the whole active catalog as prebuilt JSON files
+served by WhiteNoise, for clients that mirror it.
+
+``build_catalog_snapshot`` writes the active products, ordered by id, in pages
+of CATALOG_SNAPSHOT_PAGE_SIZE to ``STATIC_ROOT/<CATALOG_SNAPSHOT_DIR>/``:
+
+    products-<hash>.json    {"products": [...]}, each product as products/<id>/ returns it
+    manifest-<hash>.json    {"count", "page_size", "pages": [page urls]}
+
+Names are content hashes, so files never change once written: pages the
+catalog did not touch keep their name and are reused, and every file is
+served with far-future immutable cache headers (see
+store.middleware.StaticFilesMiddleware). Each file is written next to its
+precompressed variants, which WhiteNoise serves without compressing anything
+per request.
+
+The current manifest is recorded in the pointer file CATALOG_SNAPSHOT_POINTER,
+replaced atomically after the files it names exist; ``catalog/snapshot/``
+reads it through a VersionedFile. Files referenced by none of the last
+CATALOG_SNAPSHOT_KEEP manifests are deleted, so clients that just read an
+older manifest can still finish downloading it.
+
+Rebuilds follow the change feed (store/changes.py): the snapshot is stale once
+a product or category entry newer than the sequence it was built at exists.
+``--if-stale`` and ``--watch`` only rebuild once the catalog has been quiet
+for CATALOG_SNAPSHOT_DEBOUNCE seconds, or CATALOG_SNAPSHOT_MAX_DELAY seconds
+after the first pending change, so a bulk import triggers one build.
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from . import catalog, changes, compression
+from .datafiles import VersionedFile
+from .models import ChangeLogEntry, Product
+
+# Names this module writes, and only those: never anything collectstatic put there
+SNAPSHOT_NAME = re.compile(r'(products|manifest)-[0-9a-f]{16}\.json')
+SUFFIXES = {'gzip': '.gz', 'br': '.br'}
+# Unreferenced files younger than this are left alone: a concurrent build may be writing them
+COLLECT_GRACE = 600
+
+
+class Pointer:
+    def __init__(self, manifest, version, built_at, sequence, count, history):
+        self.manifest = manifest
+        self.version = version
+        self.built_at = built_at
+        self.sequence = sequence
+        self.count = count
+        self.history = history
+
+
+# Nothing built yet
+NONE = Pointer(None, '', None, 0, 0, [])
+
+
+def _parse(data):
+    return Pointer(
+        data['manifest'], data['version'], data['built_at'], data['sequence'], data['count'], data['history'],
+    )
+
+
+_pointer = VersionedFile('CATALOG_SNAPSHOT_POINTER', 'CATALOG_SNAPSHOT_CHECK_INTERVAL', _parse, missing=lambda: NONE)
+
+
+def current():
+    return _pointer.get()
+
+
+def invalidate():
+    _pointer.invalidate()
+
+
+def directory():
+    return os.path.join(settings.STATIC_ROOT, settings.CATALOG_SNAPSHOT_DIR)
+
+
+def url_prefix():
+    return f'{settings.STATIC_URL}{settings.CATALOG_SNAPSHOT_DIR}/'
+
+
+def _write_file(path, data):
+    fd, temporary = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.snapshot-')
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write(data)
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def _write(kind, payload):
+    """Write ``payload`` as ``<kind>-<hash>.json`` unless it exists already; returns the name."""
+    data = json.dumps(payload, separators=(',', ':')).encode()
+    name = f'{kind}-{hashlib.sha256(data).hexdigest()[:16]}.json'
+    path = os.path.join(directory(), name)
+    if not os.path.exists(path):
+        for encoding in compression.available_encodings():
+            _write_file(path + SUFFIXES[encoding], compression.compress(data, encoding, cached=True))
+        # Last: a snapshot file that exists always has its compressed variants
+        _write_file(path, data)
+    return name
+
+
+def _pages():
+    products = (
+        Product.objects.filter(is_active=True).select_related('category').order_by('id')
+        .iterator(chunk_size=settings.CATALOG_SNAPSHOT_PAGE_SIZE)
+    )
+    page = []
+    for product in products:
+        page.append(catalog.product_data(product))
+        if len(page) == settings.CATALOG_SNAPSHOT_PAGE_SIZE:
+            yield page
+            page = []
+    if page:
+        yield page
+
+
+def build():
+    """Write a snapshot of the active catalog and point catalog/snapshot/ at it. Returns the new Pointer."""
+    # Read first: a change committed while the pages are written makes the
+    # snapshot stale, never silently out of date
+    sequence = changes.latest()
+    os.makedirs(directory(), exist_ok=True)
+    prefix = url_prefix()
+    pages, count = [], 0
+    for page in _pages():
+        pages.append(prefix + _write('products', {'products': page}))
+        count += len(page)
+    name = _write('manifest', {'count': count, 'page_size': settings.CATALOG_SNAPSHOT_PAGE_SIZE, 'pages': pages})
+    manifest = prefix + name
+
+    previous = _read_pointer()
+    history = [manifest] + [url for url in previous.history if url != manifest]
+    pointer = Pointer(
+        manifest, name[len('manifest-'):-len('.json')], timezone.now().isoformat(), sequence, count,
+        history[:settings.CATALOG_SNAPSHOT_KEEP],
+    )
+    path = settings.CATALOG_SNAPSHOT_POINTER
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    _write_file(path, json.dumps(vars(pointer), indent=2).encode())
+    invalidate()
+    collect(pointer.history)
+    return pointer
+
+
+def _read_pointer():
+    """The pointer as on disk now, not as cached by this process."""
+    try:
+        with open(settings.CATALOG_SNAPSHOT_POINTER) as fh:
+            return _parse(json.load(fh))
+    except FileNotFoundError:
+        return NONE
+
+
+def collect(manifests):
+    """Delete snapshot files referenced by none of ``manifests`` (urls). Returns the number deleted."""
+    root = directory()
+    prefix = url_prefix()
+    keep = set()
+    for url in manifests:
+        name = url[len(prefix):]
+        keep.add(name)
+        try:
+            with open(os.path.join(root, name)) as fh:
+                keep.update(page[len(prefix):] for page in json.load(fh)['pages'])
+        except FileNotFoundError:
+            pass
+    deleted = 0
+    horizon = time.time() - COLLECT_GRACE
+    for entry in os.scandir(root):
+        name = entry.name
+        for suffix in SUFFIXES.values():
+            name = name.removesuffix(suffix)
+        if SNAPSHOT_NAME.fullmatch(name) and name not in keep and entry.stat().st_mtime < horizon:
+            os.unlink(entry.path)
+            deleted += 1
+    return deleted
+
+
+def is_due(now=None):
+    """
+    Whether a rebuild is due: never built, or catalog changes are pending and
+    the catalog has been quiet for CATALOG_SNAPSHOT_DEBOUNCE seconds, or the
+    oldest pending change is CATALOG_SNAPSHOT_MAX_DELAY seconds old.
+    """
+    pointer = _read_pointer()
+    if pointer.manifest is None:
+        return True
+    pending = ChangeLogEntry.objects.filter(model__in=['product', 'category'], id__gt=pointer.sequence).aggregate(
+        first=Min('created_at'), last=Max('created_at'),
+    )
+    if pending['first'] is None:
+        return False
+    now = now or timezone.now()
+    return (
+        now - pending['last'] >= timedelta(seconds=settings.CATALOG_SNAPSHOT_DEBOUNCE)
+        or now - pending['first'] >= timedelta(seconds=settings.CATALOG_SNAPSHOT_MAX_DELAY)
+    )
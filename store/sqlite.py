@@ -0,0 +1,33 @@
+"""
+SQLite production profile, for small deployments and CI on ``db.sqlite3``.
+
+With SQLite's defaults every write transaction starts as a reader and upgrades
+to the write lock at its first write; two writers that both read first can
+deadlock, and SQLite then fails one at once with "database is locked" instead
+of waiting. Each new connection therefore gets:
+
+- ``journal_mode=WAL``: readers no longer block the writer or each other;
+- ``synchronous=NORMAL``: no fsync per commit in WAL mode (a power loss can
+  drop the last commits, never corrupt the file);
+- ``busy_timeout``: wait for the write lock instead of failing;
+- ``cache_size`` and ``mmap_size``: keep hot pages in memory;
+- ``BEGIN IMMEDIATE`` transactions: the write lock is taken when the
+  transaction starts, where busy_timeout applies, so the upgrade deadlock
+  cannot happen.
+
+Enabled by settings.SQLITE_TUNED (any sqlite:// DATABASE_URL unless
+SQLITE_PROFILE=default); ``bench_sqlite`` compares both profiles.
+"""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+@receiver(connection_created)
+def tune(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite' or not settings.SQLITE_TUNED:
+        return
+    for pragma, value in settings.SQLITE_PRAGMAS.items():
+        connection.connection.execute(f'PRAGMA {pragma} = {value}')
+    # Read by the backend every time it opens a transaction (Django's OPTIONS['transaction_mode'])
+    connection.transaction_mode = settings.SQLITE_TRANSACTION_MODE
@@ -0,0 +1,91 @@
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from . import shards
+from .models import Cart, CartItem, Category, Order, OrderItem, Product
+from .paginators import EstimatedCountPaginator
+
+
+class AdminChangelistTestCase(TestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', password='adminpass')
+        self.client.force_login(self.admin)
+        self.category = Category.objects.create(name='Electronics')
+        self.product_seq = 0
+
+    def add_rows(self, count, using=None):
+        users = []
+        for _ in range(count):
+            self.product_seq += 1
+            user = User.objects.create_user(username=f'user{self.product_seq}')
+            product = Product.objects.create(
+                name=f'Product {self.product_seq}', description='', price=10,
+                category=self.category, stock_quantity=10, sku=f'SKU-{self.product_seq}',
+            )
+            cart = Cart.objects.using(using).create(user=user)
+            CartItem.objects.create(cart=cart, product=product, quantity=2)
+            order = Order.objects.using(using).create(user=user)
+            OrderItem.objects.create(order=order, product=product, quantity=2, price=10)
+            users.append(user)
+        return users
+
+    def changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        urls = [
+            '/admin/store/product/', '/admin/store/cart/', '/admin/store/cartitem/',
+            '/admin/store/order/', '/admin/store/orderitem/',
+        ]
+        self.add_rows(2)
+        small = {url: self.changelist_queries(url) for url in urls}
+        self.add_rows(20)
+        large = {url: self.changelist_queries(url) for url in urls}
+        self.assertEqual(small, large)
+
+    def test_cart_totals_are_annotated(self):
+        user, = self.add_rows(1)
+        # The changelist lists one shard
+        shard = f'?shard={shards.for_user(user.pk)}' if shards.enabled() else ''
+        response = self.client.get(f'/admin/store/cart/{shard}')
+        self.assertContains(response, '$20')
+
+    @override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=0)
+    def test_estimated_count_only_for_unfiltered_querysets(self):
+        # Estimates are per table: every order on default, even with order shards
+        self.add_rows(3, using='default')
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(EstimatedCountPaginator(Order.objects.all(), 10).count, 3)
+        self.assertNotIn('COUNT(', ctx.captured_queries[0]['sql'])
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(EstimatedCountPaginator(Order.objects.filter(status='DELIVERED'), 10).count, 0)
+        self.assertIn('COUNT(', ctx.captured_queries[0]['sql'])
+
+    @skipUnless(connection.vendor == 'sqlite', 'Rewrites sqlite_stat1')
+    @override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=0)
+    def test_estimated_count_ignores_partial_indexes(self):
+        self.add_rows(4, using='default')
+        # cart_one_active_per_user only indexes the one cart left active
+        Cart.objects.exclude(pk=Cart.objects.order_by('pk').first().pk).update(is_active=False)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+            # Put the partial index's row first, as ANALYZE may
+            cursor.execute(
+                'CREATE TEMP TABLE stats AS SELECT * FROM sqlite_stat1 WHERE tbl = %s '
+                'ORDER BY idx != %s', ['store_cart', 'cart_one_active_per_user'],
+            )
+            cursor.execute('DELETE FROM sqlite_stat1 WHERE tbl = %s', ['store_cart'])
+            cursor.execute('INSERT INTO sqlite_stat1 SELECT * FROM stats')
+            cursor.execute('DROP TABLE stats')
+        self.assertEqual(EstimatedCountPaginator(Cart.objects.all(), 10).count, 4)
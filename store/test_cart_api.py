@@ -1,10 +1,15 @@
+from datetime import timedelta
+
 from django.contrib.auth.models import User
 from django.test import Client, TestCase
+from django.utils import timezone
 
-from .models import CartItem, Category, Product
+from .models import CartItem, Category, Order, Product
 
 
 class CartAPITestCase(TestCase):
+    databases = '__all__'
+
     def setUp(self):
         # Create a user and log in
         self.user = User.objects.create_user(username='testuser', password='testpass')
@@ -49,4 +54,11 @@ class CartAPITestCase(TestCase):
         self.assertEqual(response.status_code, 200)
         cart_data = response.json()
         self.assertEqual(cart_data['total_items'], 0)
-        self.assertEqual(len(cart_data['items']), 0) 
\ No newline at end of file
+        self.assertEqual(len(cart_data['items']), 0)
+
+    def test_order_id_skips_numbers_taken_concurrently(self):
+        first = Order.objects.create(user=self.user)
+        # As if another checkout had taken the next number after this one read the last order
+        taken = Order.objects.create(user=self.user, order_id=first.order_id[:-4] + '0002')
+        Order.objects.using(taken._state.db).filter(pk=taken.pk).update(created_at=timezone.now() - timedelta(days=1))
+        self.assertEqual(Order.objects.create(user=self.user).order_id, first.order_id[:-4] + '0003')
@@ -0,0 +1,56 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from .models import Category, Product
+
+
+class ProductCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.category = Category.objects.create(name='Electronics')
+        self.products = Product.objects.bulk_create([
+            Product(name=f'Product {n}', description='', price=10, category=self.category, sku=f'SKU-{n}')
+            for n in range(50)
+        ])
+
+    def batch(self, products):
+        return self.client.get('/api/products/batch/', {'ids': ','.join(str(product.id) for product in products)})
+
+    def test_batch_costs_at_most_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.batch(self.products)
+        self.assertEqual([product['id'] for product in response.json()['products']], [p.id for p in self.products])
+        with self.assertNumQueries(0):
+            self.batch(self.products)
+        # Only the misses are loaded, still in one query
+        cache.delete(f'product:{self.products[0].id}')
+        with self.assertNumQueries(1):
+            self.batch(reversed(self.products))
+
+    def test_detail_and_missing_products(self):
+        product = self.products[0]
+        self.assertEqual(self.client.get(f'/api/products/{product.id}/').json()['name'], 'Product 0')
+        self.assertEqual(self.client.get('/api/products/999999/').status_code, 404)
+        response = self.client.get('/api/products/batch/', {'ids': f'{product.id},999999'})
+        self.assertEqual(response.json()['missing'], [999999])
+        self.assertEqual(self.client.get('/api/products/batch/', {'ids': 'a,b'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/products/batch/', {'ids': ','.join(map(str, range(1, 200)))}).status_code, 400)
+
+    def test_saves_invalidate(self):
+        product = self.products[0]
+        self.client.get(f'/api/products/{product.id}/')
+        with self.captureOnCommitCallbacks(execute=True):
+            product.name = 'Renamed'
+            product.save()
+        self.assertEqual(self.client.get(f'/api/products/{product.id}/').json()['name'], 'Renamed')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.name = 'Gadgets'
+            self.category.save()
+        self.assertEqual(self.client.get(f'/api/products/{product.id}/').json()['category']['name'], 'Gadgets')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            product.is_active = False
+            product.save()
+        self.assertEqual(self.client.get(f'/api/products/{product.id}/').status_code, 404)
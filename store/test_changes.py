@@ -0,0 +1,100 @@
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from . import changes
+from .models import Cart, CartItem, Category, ChangeLogEntry, Product
+
+
+@override_settings(CHANGE_FEED_LAG=0)
+class ChangeFeedTestCase(TestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.start = self.client.get('/api/changes/').json()['cursor']
+        self.category = Category.objects.create(name='Electronics')
+        self.phone = Product.objects.create(
+            name='Phone', description='', category=self.category, price=Decimal('100.00'), stock_quantity=10, sku='PHONE',
+        )
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.other = User.objects.create_user(username='other', password='testpass')
+
+    def feed(self, since=None, **params):
+        return self.client.get('/api/changes/', {'since': self.start if since is None else since, **params}).json()
+
+    def summary(self, data):
+        return [(change['model'], change['id'], change['action']) for change in data['changes']]
+
+    def checkout(self, username):
+        self.client.login(username=username, password='testpass')
+        cart = Cart.objects.create(user=User.objects.get(username=username))
+        CartItem.objects.create(cart=cart, product=self.phone, quantity=1, price=self.phone.price)
+        order_id = self.client.post('/api/checkout/', json.dumps({}), content_type='application/json').json()['order_id']
+        self.client.logout()
+        return order_id
+
+    def test_saves_and_deletes_are_sequenced(self):
+        self.phone.name = 'Phone 2'
+        self.phone.save()
+        phone_id = self.phone.id
+        self.phone.delete()
+        self.assertEqual(self.summary(self.feed()), [
+            ('category', self.category.id, 'insert'),
+            ('product', phone_id, 'insert'),
+            ('product', phone_id, 'update'),
+            ('product', phone_id, 'delete'),
+        ])
+
+        first = self.feed(limit=2)
+        self.assertTrue(first['has_more'])
+        rest = self.feed(first['cursor'])
+        self.assertEqual(len(rest['changes']), 2)
+        self.assertFalse(rest['has_more'])
+        self.assertEqual(self.feed(rest['cursor'])['changes'], [])
+
+    def test_orders_are_visible_to_their_owner_and_staff(self):
+        mine, theirs = self.checkout('testuser'), self.checkout('other')
+        self.client.login(username='testuser', password='testpass')
+        orders = [change['id'] for change in self.feed(models='order')['changes']]
+        self.assertEqual(orders, [mine])
+        # Stock changes of the checkouts are in the feed too
+        self.assertIn(('product', self.phone.id, 'update'), self.summary(self.feed(models='product')))
+
+        User.objects.filter(pk=self.user.pk).update(is_staff=True)
+        orders = {change['id'] for change in self.feed(models='order')['changes']}
+        self.assertEqual(orders, {mine, theirs})
+        self.client.logout()
+        self.assertEqual(self.feed(models='order')['changes'], [])
+
+    @override_settings(CHANGE_FEED_LAG=60)
+    def test_recent_entries_are_held_back(self):
+        data = self.feed()
+        self.assertEqual((data['changes'], data['cursor'], data['has_more']), ([], self.start, True))
+
+    def test_compaction_and_retention(self):
+        for stock in (5, 6, 7):
+            self.phone.stock_quantity = stock
+            self.phone.save()
+        self.assertEqual(changes.compact(), (3, 0))
+        self.assertEqual(self.summary(self.feed()), [
+            ('category', self.category.id, 'insert'),
+            ('product', self.phone.id, 'update'),
+        ])
+
+        ChangeLogEntry.objects.update(created_at=timezone.now() - timedelta(days=31))
+        self.assertEqual(changes.compact(), (0, 2))
+        response = self.client.get('/api/changes/', {'since': self.start})
+        self.assertEqual(response.status_code, 410)
+        self.assertEqual(self.feed(response.json()['cursor'])['changes'], [])
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get('/api/changes/?since=abc').status_code, 400)
+        self.assertEqual(self.client.get('/api/changes/?since=0&limit=0').status_code, 400)
+        self.assertEqual(self.client.get('/api/changes/?since=0&models=user').status_code, 400)
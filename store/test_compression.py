@@ -0,0 +1,63 @@
+import gzip
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from . import compression
+from .models import Category, Product
+
+
+class NegotiationTestCase(TestCase):
+    def test_negotiate(self):
+        with mock.patch.object(compression, 'brotli', None):
+            self.assertEqual(compression.negotiate('gzip, deflate, br'), 'gzip')
+            self.assertIsNone(compression.negotiate('gzip;q=0, identity'))
+            self.assertEqual(compression.negotiate('*'), 'gzip')
+        with mock.patch.object(compression, 'brotli', object()):
+            self.assertEqual(compression.negotiate('gzip, br'), 'br')
+            self.assertEqual(compression.negotiate('gzip, br;q=0.5'), 'gzip')
+        self.assertIsNone(compression.negotiate(''))
+
+
+@mock.patch.object(compression, 'brotli', None)
+class CompressionMiddlewareTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.category = Category.objects.create(name='Electronics')
+        Product.objects.bulk_create([
+            Product(name=f'Product {n}', description='A product ' * 10, price=10, category=self.category, sku=f'SKU-{n}')
+            for n in range(20)
+        ])
+
+    def test_large_bodies_are_compressed(self):
+        plain = self.client.get('/api/products/')
+        response = self.client.get('/api/products/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertIn('comp;dur=', response['Server-Timing'])
+
+    def test_small_bodies_are_not_compressed(self):
+        response = self.client.get('/api/auth/status/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_cacheable_bodies_are_compressed_once_per_version(self):
+        with mock.patch.object(compression, 'compress', wraps=compression.compress) as compress:
+            first = self.client.get('/api/products/', HTTP_ACCEPT_ENCODING='gzip')
+            second = self.client.get('/api/products/', HTTP_ACCEPT_ENCODING='gzip')
+            self.assertEqual(compress.call_count, 1)
+            self.assertEqual(first.content, second.content)
+            self.assertIn('gzip cached', second['Server-Timing'])
+
+            with self.captureOnCommitCallbacks(execute=True):
+                Product.objects.create(name='New', description='', price=5, category=self.category, sku='NEW')
+            third = self.client.get('/api/products/', HTTP_ACCEPT_ENCODING='gzip')
+            self.assertEqual(compress.call_count, 2)
+            self.assertIn(b'"New"', gzip.decompress(third.content))
+
+    @override_settings(COMPRESSION_MIN_SIZE=10 ** 9)
+    def test_min_size_setting(self):
+        response = self.client.get('/api/products/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
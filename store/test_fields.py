@@ -0,0 +1,82 @@
+import json
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from .models import Cart, CartItem, Category, Order, OrderItem, Product
+
+
+class SparseFieldsTestCase(TestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client.login(username='testuser', password='testpass')
+        category = Category.objects.create(name='Electronics')
+        self.product = Product.objects.create(
+            name='Phone', description='A long description ' * 50, category=category,
+            price=Decimal('100.00'), stock_quantity=10, sku='PHONE',
+        )
+
+    def get(self, path):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response, ' '.join(query['sql'] for query in queries)
+
+    def test_product_list_loads_only_requested_columns(self):
+        full, _ = self.get('/api/products/')
+        response, sql = self.get('/api/products/?fields=id,name,price&currency=EUR')
+        self.assertEqual(list(response.json()['products'][0]), ['id', 'name', 'price'])
+        self.assertTrue(response.json()['products'][0]['price'].startswith('EUR '))
+        self.assertNotIn('description', sql)
+        self.assertNotIn('store_category', sql)
+        self.assertLess(len(response.content) * 5, len(full.content))
+
+    def test_paginated_fields(self):
+        response, _ = self.get('/api/products/?fields=id&sort=bestselling&limit=1')
+        self.assertEqual(response.json()['products'], [{'id': self.product.id}])
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get('/api/products/?fields=id,secret')
+        self.assertEqual((response.status_code, response.json()['error']), (400, 'Unknown field: secret'))
+        self.assertEqual(self.client.get('/api/cart/?fields=items.nope').status_code, 400)
+
+    def test_cart_fields_skip_pricing_and_shipping(self):
+        cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=cart, product=self.product, quantity=2, price=self.product.price)
+        full, full_sql = self.get('/api/cart/')
+        response, sql = self.get('/api/cart/?fields=cart_id,items.product_id,items.quantity')
+        self.assertEqual(response.json(), {
+            'cart_id': cart.id, 'items': [{'product_id': self.product.id, 'quantity': 2}],
+        })
+        self.assertNotIn('store_promotion', sql)
+        self.assertIn('store_promotion', full_sql)
+        # Whole nested list when asked for by name
+        response, _ = self.get('/api/cart/?fields=items,items.quantity,grand_total')
+        self.assertEqual(response.json()['items'], full.json()['items'])
+        self.assertEqual(response.json()['grand_total'], full.json()['grand_total'])
+
+    def test_orders(self):
+        order = Order.objects.create(user=self.user, total_price=Decimal('200.00'))
+        OrderItem.objects.create(order=order, product=self.product, quantity=2, price=Decimal('100.00'))
+        response, sql = self.get('/api/orders/?fields=order_id,status')
+        self.assertEqual(response.json()['orders'], [{'order_id': order.order_id, 'status': 'PENDING'}])
+        self.assertNotIn('store_orderitem', sql)
+
+        full, _ = self.get(f'/api/orders/{order.order_id}/')
+        response, sql = self.get(f'/api/orders/{order.order_id}/?fields=total_price,items.product_id,items.total_price')
+        self.assertEqual(response.json(), {
+            'total_price': '200.00', 'items': [{'product_id': self.product.id, 'total_price': '200.00'}],
+        })
+        self.assertNotIn('shipping_address', sql)
+        self.assertNotIn('store_product', sql)
+        response, _ = self.get(f'/api/orders/{order.order_id}/?fields=status')
+        self.assertEqual(response.json(), {'status': 'PENDING'})
+        self.assertEqual(json.loads(full.content)['items'][0]['product_name'], 'Phone')
@@ -0,0 +1,71 @@
+import json
+import os
+import tempfile
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from . import fx, shards
+from .models import Cart, CartItem, Category, Order, Product
+
+
+class FxTestCase(TestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        fx.invalidate()
+        self.addCleanup(fx.invalidate)
+
+    def write_rates(self, version, rates):
+        handle = tempfile.NamedTemporaryFile('w', suffix='.json', delete=False)
+        with handle:
+            json.dump({'version': version, 'base': 'USD', 'rates': rates}, handle)
+        self.addCleanup(os.unlink, handle.name)
+        return handle.name
+
+    def test_rounding_rules(self):
+        path = self.write_rates('v1', {'USD': '1', 'JPY': '150.123', 'CHF': '0.9'})
+        with override_settings(FX_RATES_FILE=path):
+            self.assertEqual(fx.convert_many([('10.01', 'USD')], 'JPY'), [Decimal('1503')])
+            # 9.99 * 0.9 = 8.991 -> cash-rounded to 9.00
+            self.assertEqual(fx.convert_many([('9.99', 'USD')], 'CHF'), [Decimal('9.00')])
+            self.assertEqual(fx.convert_many([('1503', 'JPY')], 'USD'), [Decimal('10.01')])
+
+    def test_table_is_swapped_only_on_new_version(self):
+        path = self.write_rates('v1', {'USD': '1', 'EUR': '0.5'})
+        with override_settings(FX_RATES_FILE=path, FX_RATES_CHECK_INTERVAL=0):
+            first = fx.get_rates()
+            self.assertIs(fx.get_rates(), first)
+            with open(path, 'w') as fh:
+                json.dump({'version': 'v1', 'base': 'USD', 'rates': {'USD': '1', 'EUR': '0.75'}}, fh)
+            self.assertIs(fx.get_rates(), first)
+            with open(path, 'w') as fh:
+                json.dump({'version': 'v2', 'base': 'USD', 'rates': {'USD': '1', 'EUR': '0.75', 'GBP': '0.7'}}, fh)
+            self.assertEqual(fx.get_rates().version, 'v2')
+            self.assertEqual(fx.normalize_currency('gbp'), 'GBP')
+
+    def test_cart_and_checkout_in_requested_currency(self):
+        path = self.write_rates('v1', {'USD': '1', 'EUR': '0.5'})
+        user = User.objects.create_user(username='testuser', password='testpass')
+        category = Category.objects.create(name='Electronics')
+        product = Product.objects.create(name='Phone', category=category, price=Decimal('10.01'), sku='PHONE-1', stock_quantity=10)
+        cart = Cart.objects.create(user=user)
+        CartItem.objects.create(cart=cart, product=product, quantity=3, price=product.price)
+        self.client.login(username='testuser', password='testpass')
+
+        with override_settings(FX_RATES_FILE=path):
+            response = self.client.get('/api/cart/', {'currency': 'eur'})
+            self.assertEqual(response.json()['currency'], 'EUR')
+            self.assertEqual(response.json()['items'][0]['price_per_unit'], '5.01')
+            self.assertEqual(response.json()['total_price'], '15.03')
+            self.assertEqual(self.client.get('/api/cart/', {'currency': 'XXX'}).status_code, 400)
+            for body in ('{"currency": 5}', '{"currency": ["EUR"]}', '{', '[]'):
+                response = self.client.post('/api/checkout/', body, content_type='application/json')
+                self.assertEqual(response.status_code, 400, body)
+
+            response = self.client.post('/api/checkout/', json.dumps({'currency': 'EUR'}), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        order = Order.objects.using(shards.for_user(user.pk)).get(order_id=response.json()['order_id'])
+        self.assertEqual((order.currency, order.total_price - order.shipping_price), ('EUR', Decimal('15.03')))
+        self.assertEqual(order.items.get().price, Decimal('5.01'))
@@ -0,0 +1,76 @@
+"""
+EXPLAIN checks for the hot queries: each must be answered from an index, never a
+full table scan. Runs on SQLite and Postgres; on Postgres sequential scans are
+disabled for the check so the planner picks an index whenever one is usable,
+regardless of how small the test tables are.
+"""
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Sum
+from django.test import TestCase
+from django.utils import timezone
+
+from . import shards
+from .models import Cart, Category, Order, Product
+
+
+class HotQueryIndexTestCase(TestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.category = Category.objects.create(name='Electronics')
+
+    def explain(self, queryset):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+    def assertNoFullScan(self, queryset, index_name):
+        plan = self.explain(queryset)
+        if connection.vendor == 'sqlite':
+            full_scans = [
+                line for line in plan.splitlines()
+                if ' SCAN ' in f' {line} ' and 'USING' not in line
+            ]
+            self.assertEqual(full_scans, [], f'Full table scan:\n{plan}')
+            self.assertIn(index_name, plan)
+        elif connection.vendor == 'postgresql':
+            self.assertNotIn('Seq Scan', plan, f'Full table scan:\n{plan}')
+
+    def test_active_cart_lookup(self):
+        self.assertNoFullScan(Cart.objects.filter(user=self.user, is_active=True), 'cart_one_active_per_user')
+
+    def test_user_carts(self):
+        # Inactive carts too: the foreign key index covers them, no (user, is_active) index needed
+        self.assertNoFullScan(Cart.objects.filter(user=self.user, is_active=False), 'store_cart_user_id')
+
+    def test_list_orders(self):
+        queryset = (
+            Order.objects.filter(user=self.user)
+            .annotate(total_items=Sum('items__quantity'))
+            .order_by('-created_at')
+        )
+        self.assertNoFullScan(queryset, 'order_user_created_idx')
+
+    def test_daily_order_id_lookup(self):
+        now = timezone.now()
+        queryset = Order.objects.filter(created_at__gte=now, created_at__lt=now + timedelta(days=1)).order_by('-id')[:1]
+        self.assertNoFullScan(queryset, 'order_created_idx')
+
+    def test_catalog_by_category(self):
+        queryset = Product.objects.filter(is_active=True, category=self.category).order_by('-created_at')
+        self.assertNoFullScan(queryset, 'product_active_category_idx')
+
+    def test_active_catalog(self):
+        queryset = Product.objects.filter(is_active=True).order_by('-created_at')
+        self.assertNoFullScan(queryset, 'product_active_created_idx')
+
+    def test_one_active_cart_per_user(self):
+        Cart.objects.create(user=self.user, is_active=True)
+        Cart.objects.create(user=self.user, is_active=False)
+        with self.assertRaises(IntegrityError), transaction.atomic(using=shards.for_user(self.user.pk)):
+            Cart.objects.create(user=self.user, is_active=True)
@@ -0,0 +1,118 @@
+import json
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from . import inventory, shards
+from .models import Cart, CartItem, Category, LowStockAlert, Order, Product, StockMovement
+
+
+@override_settings(INVENTORY_CURSOR_LAG=0, LOW_STOCK_THRESHOLD=5)
+class InventoryTestCase(TestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.category = Category.objects.create(name='Electronics')
+        self.phone = Product.objects.create(
+            name='Phone', description='', category=self.category, price=Decimal('100.00'), stock_quantity=10, sku='PHONE',
+        )
+        self.case = Product.objects.create(
+            name='Case', description='', category=self.category, price=Decimal('10.00'), stock_quantity=20, sku='CASE',
+        )
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client.login(username='testuser', password='testpass')
+
+    def movements(self, product):
+        return list(StockMovement.objects.filter(product=product).values_list('delta', 'reason'))
+
+    def checkout(self, *lines):
+        cart, _ = Cart.objects.using(shards.for_user(self.user.pk)).get_or_create(user=self.user, is_active=True)
+        for product, quantity in lines:
+            CartItem.objects.create(cart=cart, product=product, quantity=quantity, price=product.price)
+        return self.client.post('/api/checkout/', json.dumps({}), content_type='application/json')
+
+    def test_product_saves_are_recorded(self):
+        phone = Product.objects.get(pk=self.phone.pk)
+        phone.stock_quantity = 7
+        phone.save()
+        phone.name = 'Phone 2'
+        phone.save()
+        phone.save(update_fields=['name'])
+        self.assertEqual(self.movements(self.phone), [(10, 'INITIAL'), (-3, 'ADJUSTMENT')])
+
+    def test_edits_keep_sales_made_since_loading(self):
+        phone = Product.objects.get(pk=self.phone.pk)
+        self.assertEqual(self.checkout((self.phone, 2)).status_code, 200)
+        phone.stock_quantity = 15
+        phone.save()
+        self.assertEqual(phone.stock_quantity, 13)
+        self.assertEqual(self.movements(self.phone)[-1], (5, 'ADJUSTMENT'))
+        out = StringIO()
+        call_command('process_inventory', '--verify', stdout=out)
+        self.assertIn('Ledger mismatches: 0', out.getvalue())
+
+    def test_movements_are_append_only(self):
+        movement = StockMovement.objects.get(product=self.phone)
+        with self.assertRaises(ValueError):
+            movement.save()
+        with self.assertRaises(ValueError):
+            movement.delete()
+
+    def test_checkout_takes_stock_and_cancel_returns_it(self):
+        response = self.checkout((self.phone, 2), (self.case, 3))
+        self.assertEqual(response.status_code, 200)
+        self.phone.refresh_from_db()
+        self.assertEqual(self.phone.stock_quantity, 8)
+        self.assertEqual(self.movements(self.case)[-1], (-3, 'SALE'))
+
+        order_id = response.json()['order_id']
+        self.assertEqual(self.client.post(f'/api/orders/{order_id}/cancel/').status_code, 200)
+        self.assertEqual(self.client.post(f'/api/orders/{order_id}/cancel/').status_code, 400)
+        self.phone.refresh_from_db()
+        self.assertEqual(self.phone.stock_quantity, 10)
+        self.assertEqual(self.movements(self.phone)[-1], (2, 'CANCELLATION'))
+
+    def test_checkout_rejects_short_stock_without_changes(self):
+        cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=cart, product=self.phone, quantity=5, price=self.phone.price)
+        CartItem.objects.create(cart=cart, product=self.case, quantity=1, price=self.case.price)
+        # Sold elsewhere after it went into the cart
+        Product.objects.filter(pk=self.phone.pk).update(stock_quantity=4)
+
+        response = self.client.post('/api/checkout/', json.dumps({}), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Phone', response.json()['error'])
+        self.assertFalse(Order.objects.using(cart._state.db).exists())
+        self.case.refresh_from_db()
+        self.assertEqual(self.case.stock_quantity, 20)
+        self.assertEqual(cart.items.count(), 2)
+
+    def test_snapshots_are_incremental_and_rebuild_stock(self):
+        self.assertEqual(inventory.take_snapshots(), 2)
+        self.assertEqual(inventory.take_snapshots(), 0)
+        self.checkout((self.phone, 4))
+        # Only the product that moved is snapshotted again
+        self.assertEqual(inventory.take_snapshots(), 1)
+        self.checkout((self.phone, 1))
+        self.assertEqual(inventory.ledger_stock([self.phone.pk, self.case.pk]), {self.phone.pk: 5, self.case.pk: 20})
+        out = StringIO()
+        call_command('process_inventory', '--verify', stdout=out)
+        self.assertIn('Ledger mismatches: 0', out.getvalue())
+
+    def test_low_stock_alerts_open_once_and_resolve(self):
+        self.assertEqual(inventory.detect_low_stock(), (0, 0))
+        order_id = self.checkout((self.phone, 6)).json()['order_id']
+        self.assertEqual(inventory.detect_low_stock(), (1, 0))
+        self.checkout((self.phone, 1))
+        self.assertEqual(inventory.detect_low_stock(), (0, 0))
+        self.assertEqual(LowStockAlert.objects.get().stock_quantity, 4)
+
+        self.client.post(f'/api/orders/{order_id}/cancel/')
+        self.assertEqual(inventory.detect_low_stock(), (0, 1))
+        self.assertFalse(LowStockAlert.objects.filter(resolved_at__isnull=True).exists())
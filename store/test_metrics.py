@@ -0,0 +1,57 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from . import warmup
+
+from .metrics import registry
+from .models import Category, Product
+
+
+class PerformanceMiddlewareTestCase(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name='Electronics')
+        Product.objects.create(name='iPhone', description='A smartphone', price=100, category=category)
+
+    def test_server_timing_header(self):
+        response = self.client.get('/api/products/')
+        self.assertEqual(response.status_code, 200)
+        timing = response['Server-Timing']
+        self.assertIn('db;dur=', timing)
+        self.assertIn('desc="1 queries"', timing)
+        self.assertIn('ser;dur=', timing)
+        self.assertIn('total;dur=', timing)
+
+    def test_metrics_endpoint_is_internal(self):
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 401)
+        User.objects.create_user(username='customer', password='pass')
+        self.client.login(username='customer', password='pass')
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+        self.client.logout()
+        with override_settings(METRICS_TOKEN='scrape-secret'):
+            self.assertEqual(self.client.get('/api/metrics/', headers={'Authorization': 'Bearer nope'}).status_code, 401)
+            response = self.client.get('/api/metrics/', headers={'Authorization': 'Bearer scrape-secret'})
+            self.assertEqual(response.status_code, 200)
+
+    def test_warmup_requests_are_not_recorded(self):
+        def count():
+            series = registry.metrics['store_request_duration_seconds'][2].get('product-list')
+            return sum(series.counts) if series else 0
+
+        before = count()
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            self.assertEqual(warmup.prime_paths(['/api/products/']), {'/api/products/': 200})
+        self.assertEqual(count(), before)
+        self.client.get('/api/products/')
+        self.assertEqual(count(), before + 1)
+
+    def test_metrics_endpoint_exposes_histograms(self):
+        self.client.get('/api/products/')
+        User.objects.create_user(username='staff', password='pass', is_staff=True)
+        self.client.login(username='staff', password='pass')
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('# TYPE store_request_duration_seconds histogram', body)
+        self.assertIn('store_request_queries_bucket{view="product-list",le="+Inf"}', body)
+        self.assertIn('store_request_db_seconds_count{view="product-list"}', body)
@@ -0,0 +1,179 @@
+import hashlib
+import hmac
+import json
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from . import outbox, shards
+from .models import Cart, CartItem, Category, Order, OutboxEvent, Product, WebhookDelivery, WebhookSubscription
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """Records each POST; answers with the next queued status, 200 once they run out."""
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.server.requests.append((self.headers['X-Webhook-Signature'], body))
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        self.send_response(status)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(WEBHOOK_OUTBOX_LAG=0, WEBHOOK_BATCH_SIZE=2, WEBHOOK_LANES_PER_SUBSCRIPTION=2)
+class OutboxTestCase(TestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StandIn)
+        self.server.requests, self.server.statuses = [], []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.subscription = WebhookSubscription.objects.create(
+            url=f'http://127.0.0.1:{self.server.server_port}/hooks', secret='s3cret',
+        )
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client.login(username='testuser', password='testpass')
+        category = Category.objects.create(name='Electronics')
+        self.product = Product.objects.create(
+            name='Phone', description='', category=category, price=Decimal('100.00'), stock_quantity=100, sku='PHONE',
+        )
+
+    def checkout(self):
+        cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=cart, product=self.product, quantity=1, price=self.product.price)
+        return self.client.post('/api/checkout/', json.dumps({}), content_type='application/json').json().get('order_id')
+
+    def dispatch(self):
+        call_command('dispatch_webhooks', '--once', stdout=StringIO())
+
+    def received(self):
+        return [
+            (event['type'], event['order_id'], event['data']['status'])
+            for _, body in self.server.requests
+            for event in json.loads(body)['events']
+        ]
+
+    def test_events_are_written_with_the_order_change(self):
+        order_id = self.checkout()
+        self.client.post(f'/api/orders/{order_id}/cancel/')
+        order = Order.objects.using(shards.for_user(self.user.pk)).get(order_id=order_id)
+        order.save()  # No status change, no event
+        order.status = 'DELIVERED'
+        order.save()
+        self.assertEqual(
+            list(OutboxEvent.objects.values_list('event_type', 'payload__status', 'payload__previous_status')),
+            [('order.created', 'PENDING', None), ('order.status_changed', 'CANCELLED', 'PENDING'),
+             ('order.status_changed', 'DELIVERED', 'CANCELLED')],
+        )
+
+    def test_rolled_back_checkout_leaves_no_event(self):
+        Product.objects.filter(pk=self.product.pk).update(stock_quantity=0)
+        self.assertIsNone(self.checkout())
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_batched_signed_delivery(self):
+        first, second, third = self.checkout(), self.checkout(), self.checkout()
+        self.client.post(f'/api/orders/{first}/cancel/')
+        WebhookSubscription.objects.create(url=self.subscription.url, secret='x', event_types='order.status_changed')
+        self.dispatch()
+
+        self.assertEqual(WebhookDelivery.objects.filter(status='DELIVERED').count(), 5)
+        for signature, body in self.server.requests:
+            self.assertLessEqual(len(json.loads(body)['events']), 2)
+        self.assertEqual(len(self.server.requests), len({signature for signature, _ in self.server.requests}))
+        signature, body = next(
+            (signature, body) for signature, body in self.server.requests if b'order.created' in body
+        )
+        self.assertEqual(signature, 'sha256=' + hmac.new(b's3cret', body, hashlib.sha256).hexdigest())
+        received = self.received()
+        self.assertEqual(sorted(received), sorted([
+            ('order.created', first, 'PENDING'), ('order.created', second, 'PENDING'),
+            ('order.created', third, 'PENDING'), ('order.status_changed', first, 'CANCELLED'),
+            ('order.status_changed', first, 'CANCELLED'),
+        ]))
+        self.dispatch()
+        self.assertEqual(len(self.received()), 5)
+
+    def test_failures_back_off_and_keep_order_per_order(self):
+        order_id = self.checkout()
+        self.client.post(f'/api/orders/{order_id}/cancel/')
+        self.server.statuses = [503]
+        self.dispatch()
+        created, cancelled = WebhookDelivery.objects.order_by('id')
+        self.assertEqual((created.status, created.attempts, created.last_error), ('PENDING', 1, 'HTTP 503'))
+        self.assertGreater(created.next_attempt_at, timezone.now())
+        # The cancellation was in the same batch: it failed with it and waits behind it
+        self.assertEqual(cancelled.attempts, 1)
+
+        # Only the cancellation is due; it must not overtake the creation
+        WebhookDelivery.objects.filter(pk=cancelled.pk).update(next_attempt_at=timezone.now())
+        self.dispatch()
+        self.assertEqual(len(self.server.requests), 1)
+
+        WebhookDelivery.objects.update(next_attempt_at=timezone.now())
+        self.dispatch()
+        self.assertEqual(self.received()[-2:], [('order.created', order_id, 'PENDING'), ('order.status_changed', order_id, 'CANCELLED')])
+        self.assertFalse(WebhookDelivery.objects.exclude(status='DELIVERED').exists())
+
+    def test_interleaved_claims_keep_order_per_order(self):
+        order_id = self.checkout()
+        self.client.post(f'/api/orders/{order_id}/cancel/')
+        outbox.fan_out()
+        created, cancelled = WebhookDelivery.objects.order_by('id')
+
+        # Dispatcher A has locked the creation but not committed its lease yet:
+        # SKIP LOCKED hides that row from dispatcher B, which must not take the cancellation
+        def skip_created(queryset, **kwargs):
+            return queryset.exclude(pk=created.pk)
+
+        with mock.patch.object(connection.features, 'has_select_for_update_skip_locked', True), \
+                mock.patch.object(QuerySet, 'select_for_update', skip_created):
+            self.assertEqual(outbox.claim(10), [])
+        # A claims the order's deliveries together
+        self.assertEqual([delivery.pk for delivery in outbox.claim(10)], [created.pk, cancelled.pk])
+        self.assertEqual(outbox.claim(10), [])
+
+    @override_settings(WEBHOOK_BATCH_SIZE=1, WEBHOOK_LANES_PER_SUBSCRIPTION=1, WEBHOOK_TIMEOUT=10)
+    def test_lease_covers_sending_the_whole_lane(self):
+        order_id = self.checkout()
+        self.client.post(f'/api/orders/{order_id}/cancel/')
+        outbox.fan_out()
+        before = timezone.now()
+        claimed = outbox.claim(10, connections=1)
+        # Two batches in one lane, each perhaps waiting for the only connection, plus a margin
+        self.assertEqual(outbox.lease_seconds(claimed, 1), 50)
+        for delivery in WebhookDelivery.objects.all():
+            self.assertGreaterEqual(delivery.next_attempt_at, before + timedelta(seconds=50))
+
+    @override_settings(WEBHOOK_MAX_ATTEMPTS=2)
+    def test_gives_up_after_max_attempts(self):
+        self.subscription.url = 'http://127.0.0.1:1/unreachable'
+        self.subscription.save()
+        self.checkout()
+        self.dispatch()
+        WebhookDelivery.objects.update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+        self.dispatch()
+        delivery = WebhookDelivery.objects.get()
+        self.assertEqual((delivery.status, delivery.attempts), ('FAILED', 2))
+        self.assertIn('Cannot connect', delivery.last_error)
@@ -0,0 +1,86 @@
+import csv
+import io
+import json
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from . import shards
+from .models import ChangeLogEntry, Category, Order, OrderItem, OutboxEvent, PickList, Product
+
+
+class PickListTestCase(TestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        self.staff = User.objects.create_user(username='warehouse', password='pass', is_staff=True)
+        self.customer = User.objects.create_user(username='customer', password='pass')
+        self.shard = shards.for_user(self.customer.pk)
+        phones, cables = Category.objects.create(name='Phones'), Category.objects.create(name='Cables')
+        self.phone = Product.objects.create(name='Phone', description='', price=100, category=phones, sku='PH-1')
+        self.cable = Product.objects.create(name='Cable', description='', price=5, category=cables, sku='CB-1')
+        self.orders = []
+        for n, status in enumerate(['PENDING', 'ACCEPTED', 'PENDING', 'DELIVERED']):
+            order = Order.objects.create(user=self.customer, total_price=Decimal('110.00'), status=status)
+            OrderItem.objects.create(order=order, product=self.phone, quantity=1, price=100)
+            OrderItem.objects.create(order=order, product=self.cable, quantity=n + 1, price=5)
+            self.orders.append(order)
+        self.client.force_login(self.staff)
+
+    def pick(self, data=None, output='json'):
+        response = self.client.post(
+            f'/api/fulfillment/picklist/?format={output}', json.dumps(data or {}), content_type='application/json',
+        )
+        return response, b''.join(response.streaming_content).decode() if response.streaming else None
+
+    def test_wave_is_aggregated_and_packed(self):
+        response, body = self.pick({'limit': 2})
+        self.assertEqual(response.status_code, 200)
+        pick_list = json.loads(body)
+        self.assertEqual(pick_list['order_count'], 2)
+        # Sorted by category: cables before phones
+        self.assertEqual(
+            [(line['sku'], line['quantity'], line['orders']) for line in pick_list['lines']],
+            [('CB-1', 3, 2), ('PH-1', 2, 2)],
+        )
+        self.assertEqual(
+            list(Order.objects.using(self.shard).order_by('id').values_list('status', flat=True)),
+            ['PACKED', 'PACKED', 'PENDING', 'DELIVERED'],
+        )
+        self.assertEqual(
+            sorted(OutboxEvent.objects.filter(event_type='order.status_changed').values_list('payload__previous_status', flat=True)),
+            ['ACCEPTED', 'PENDING'],
+        )
+        self.assertEqual(
+            ChangeLogEntry.objects.filter(model='order', action='update', user_id=self.customer.pk).count(), 2,
+        )
+
+        # The next wave only gets what is still waiting, then nothing is
+        response, body = self.pick(output='csv')
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual([(row['sku'], row['quantity']) for row in rows], [('CB-1', '3'), ('PH-1', '1')])
+        self.assertEqual(self.pick()[0].status_code, 404)
+
+        reprint = self.client.get(f'/api/fulfillment/picklist/?id={pick_list["pick_list"]}')
+        self.assertEqual(json.loads(b''.join(reprint.streaming_content)), pick_list)
+
+    def test_status_filter_and_validation(self):
+        _, body = self.pick({'status': ['ACCEPTED']})
+        self.assertEqual(json.loads(body)['order_count'], 1)
+        self.assertEqual(self.pick({'status': ['DELIVERED']})[0].status_code, 400)
+        self.assertEqual(self.pick({'limit': 0})[0].status_code, 400)
+        self.assertEqual(self.pick({'created_before': 'soon'})[0].status_code, 400)
+        self.assertEqual(self.pick({'created_before': '2000-01-01'})[0].status_code, 404)
+        self.client.force_login(self.customer)
+        self.assertEqual(self.pick()[0].status_code, 403)
+
+    def test_management_command(self):
+        out, err = StringIO(), StringIO()
+        call_command('pick_orders', '--format', 'json', stdout=out, stderr=err)
+        pick_list = PickList.objects.get()
+        self.assertEqual(json.loads(out.getvalue())['order_count'], 3)
+        self.assertIn(f'Pick list #{pick_list.pk}: 3 orders', err.getvalue())
+        self.assertFalse(Order.objects.using(self.shard).filter(status__in=['PENDING', 'ACCEPTED']).exists())
@@ -0,0 +1,96 @@
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from . import fx, promotions, shards
+from .models import Cart, CartItem, Category, Order, Product, Promotion
+
+
+def rule(kind, **fields):
+    return Promotion(name=fields.pop('name', kind), kind=kind, **fields)
+
+
+class PromotionIndexTestCase(SimpleTestCase):
+    def price(self, rules, lines, currency='USD'):
+        index = promotions.PromotionIndex('v1', rules, timezone.now())
+        return index.price([(p, c, Decimal(unit), q) for p, c, unit, q in lines], currency)
+
+    def test_best_line_rule_wins(self):
+        pricing = self.price(
+            [
+                rule('PERCENT', name='10% phones', category_id=1, percent_off=10),
+                rule('PERCENT', name='25% one phone', product_id=7, percent_off=25),
+                rule('BUY_X_GET_Y', name='2+1', product_id=8, buy_quantity=2, get_quantity=1),
+            ],
+            [(7, 1, '10.00', 2), (8, 1, '3.00', 7), (9, 2, '5.00', 1)],
+        )
+        self.assertEqual([line.discount for line in pricing.lines], [Decimal('5.00'), Decimal('6.00'), Decimal('0.00')])
+        self.assertEqual([line.promotion for line in pricing.lines], ['25% one phone', '2+1', None])
+        self.assertEqual((pricing.subtotal, pricing.total), (Decimal('46.00'), Decimal('35.00')))
+
+    def test_threshold_uses_best_qualifying_rule_on_discounted_subtotal(self):
+        rules = [
+            rule('THRESHOLD', name='5 off 50', min_subtotal=50, amount_off=5),
+            rule('THRESHOLD', name='10% off 100', min_subtotal=100, percent_off=10),
+            rule('THRESHOLD', name='30 off 500', min_subtotal=500, amount_off=30),
+            rule('PERCENT', product_id=1, percent_off=50),
+        ]
+        self.assertEqual(self.price(rules, [(2, 1, '40.00', 1)]).cart_promotion, None)
+        pricing = self.price(rules, [(2, 1, '60.00', 2)])
+        self.assertEqual((pricing.cart_promotion, pricing.cart_discount), ('10% off 100', Decimal('12.00')))
+        # 200 of product 1 is 100 after its line discount, which still qualifies
+        pricing = self.price(rules, [(1, 1, '200.00', 1)])
+        self.assertEqual((pricing.discount, pricing.total), (Decimal('110.00'), Decimal('90.00')))
+
+    def test_fixed_amounts_follow_the_price_currency(self):
+        rules = [rule('THRESHOLD', min_subtotal=100, amount_off=10)]
+        self.assertIsNone(self.price(rules, [(1, 1, '9000', 1)], 'JPY').cart_promotion)
+        pricing = self.price(rules, [(1, 1, '20000', 1)], 'JPY')
+        self.assertEqual(pricing.cart_discount, fx.convert_many([(10, 'USD')], 'JPY')[0])
+
+    def test_scheduled_rules_expire_the_index(self):
+        now = timezone.now()
+        index = promotions.PromotionIndex('v1', [
+            rule('PERCENT', percent_off=10, ends_at=now + timedelta(hours=1)),
+            rule('PERCENT', percent_off=50, starts_at=now + timedelta(minutes=5)),
+        ], now)
+        self.assertEqual(index.everywhere.percent.percent, Decimal('0.1'))
+        self.assertEqual(index.valid_until, now + timedelta(minutes=5))
+
+
+class PromotionApiTestCase(TestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.category = Category.objects.create(name='Electronics')
+        self.product = Product.objects.create(
+            name='Phone', description='', category=self.category, price=Decimal('100.00'), stock_quantity=10,
+        )
+        cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=cart, product=self.product, quantity=2, price=self.product.price)
+        self.client.login(username='testuser', password='testpass')
+
+    def test_saving_a_promotion_reprices_carts(self):
+        self.assertEqual(self.client.get('/api/cart/').json()['discount'], '0.00')
+        with self.captureOnCommitCallbacks(execute=True):
+            Promotion.objects.create(name='Phones 10%', kind='PERCENT', category=self.category, percent_off=10)
+        data = self.client.get('/api/cart/').json()
+        self.assertEqual((data['discount'], data['total_price']), ('20.00', '180.00'))
+        self.assertEqual(data['items'][0]['promotion'], 'Phones 10%')
+
+    def test_checkout_records_discounts(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Promotion.objects.create(name='Phones 10%', kind='PERCENT', category=self.category, percent_off=10)
+            Promotion.objects.create(name='5 off 150', kind='THRESHOLD', min_subtotal=150, amount_off=5)
+        response = self.client.post('/api/checkout/', json.dumps({}), content_type='application/json')
+        order = Order.objects.using(shards.for_user(self.user.pk)).get(order_id=response.json()['order_id'])
+        self.assertEqual((order.total_price - order.shipping_price, order.discount_total), (Decimal('175.00'), Decimal('25.00')))
+        self.assertEqual(order.items.get().get_total_price(), Decimal('180.00'))
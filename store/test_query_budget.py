@@ -0,0 +1,378 @@
+"""
+Query budgets for every endpoint in store/urls.py.
+
+Each scenario seeds 1, 10 and 100 rows (cart lines, orders, order items or
+products) and checks that the endpoint runs the same number of queries at every
+size. The normalized SQL is compared with the snapshot in store/query_snapshots/,
+so a new or changed query shows up as a readable diff in review.
+
+Run with UPDATE_QUERY_SNAPSHOTS=1 to record a new endpoint's snapshot or rewrite
+the snapshots after an intended change; a missing snapshot fails otherwise.
+Snapshots are recorded on SQLite without order shards; on other backends, or
+with ORDER_SHARD_URLS set, only the counts are checked (on every shard).
+"""
+import difflib
+import os
+import re
+import tempfile
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.conf import settings
+from django.db import connection, connections
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from . import inventory, shards, snapshots
+from .models import Cart, CartItem, Category, ChangeLogEntry, Order, OrderItem, Product
+from .urls import urlpatterns
+
+SIZES = (1, 10, 100)
+SNAPSHOT_DIR = Path(__file__).resolve().parent / 'query_snapshots'
+UPDATE_SNAPSHOTS = os.environ.get('UPDATE_QUERY_SNAPSHOTS') == '1'
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?(?:e[+-]?\d+)?\b')
+_IN_LIST = re.compile(r'IN \((?:\?, )*\?\)')
+_VALUES_ROWS = re.compile(r'VALUES \([?, ]+\)(?:, \([?, ]+\))+')
+_SAVEPOINT = re.compile(r'"s\d+_x\d+"')
+
+
+def normalize_sql(sql):
+    """Replace literals so the same query shape always normalizes to the same text."""
+    sql = _SAVEPOINT.sub('"sp"', sql)
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _VALUES_ROWS.sub('VALUES (...), ...', sql)
+    return _IN_LIST.sub('IN (...)', sql)
+
+
+def snapshots_compared():
+    """Snapshots are recorded on SQLite without order shards; elsewhere only the counts are checked."""
+    return connection.vendor == 'sqlite' and not shards.enabled()
+
+
+class QueryBudgetTestCase(TestCase):
+    """One test per URL name; ``test_every_endpoint_has_a_budget`` keeps the list complete."""
+    databases = '__all__'
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.category = Category.objects.create(name='Electronics')
+        self.product_seq = 0
+
+    # Seeding helpers
+
+    def make_products(self, count):
+        products = []
+        for _ in range(count):
+            self.product_seq += 1
+            products.append(Product(
+                name=f'Product {self.product_seq}',
+                description='Description',
+                price=10,
+                category=self.category,
+                stock_quantity=1000,
+                sku=f'SKU-{self.product_seq}',
+                weight=100,
+            ))
+        return Product.objects.bulk_create(products)
+
+    def make_cart(self, lines):
+        cart = Cart.objects.create(user=self.user, is_active=True)
+        CartItem.objects.bulk_create([
+            CartItem(cart=cart, product=product, quantity=1, price=product.price)
+            for product in self.make_products(lines)
+        ])
+        return cart
+
+    def make_orders(self, count, items_per_order=1, status='PENDING'):
+        orders = Order.objects.bulk_create([
+            Order(user=self.user, order_id=f'ORD-TEST-{n:04d}', status=status, total_price=10)
+            for n in range(count)
+        ])
+        products = self.make_products(items_per_order)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=product, quantity=2, price=product.price)
+            for order in orders
+            for product in products
+        ])
+        return orders
+
+    def login(self):
+        self.client.force_login(self.user)
+
+    def login_staff(self):
+        self.user.is_staff = True
+        self.user.save(update_fields=['is_staff'])
+        self.login()
+
+    def get_streamed(self, path):
+        """GET a streaming response and consume it, so its queries are captured."""
+        response = self.client.get(path)
+        b''.join(response.streaming_content)
+        return response
+
+    def post_streamed(self, path, data):
+        response = self.client.post(path, data, content_type='application/json')
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response
+
+    # Harness
+
+    def assertQueryBudget(self, name, scenario):
+        """
+        Run ``scenario(size)`` in a fresh savepoint for every size. The scenario seeds
+        data and returns a callable that performs the request under test. The cache
+        starts empty every time, so the snapshot records the cold path (e.g. the
+        promotion index being compiled).
+        """
+        captured = {}
+        shard_connections = [connections[alias] for alias in settings.ORDER_SHARDS]
+        for size in SIZES:
+            cache.clear()
+            sids = [shard_connection.savepoint() for shard_connection in shard_connections]
+            try:
+                request = scenario(size)
+                with ExitStack() as stack:
+                    contexts = [
+                        stack.enter_context(CaptureQueriesContext(shard_connection))
+                        for shard_connection in shard_connections
+                    ]
+                    response = request()
+                self.assertLess(response.status_code, 500, f'{name} failed at size {size}')
+                captured[size] = [normalize_sql(query['sql']) for ctx in contexts for query in ctx.captured_queries]
+            finally:
+                for shard_connection, sid in zip(shard_connections, sids):
+                    shard_connection.savepoint_rollback(sid)
+                self.client.logout()
+
+        counts = {size: len(queries) for size, queries in captured.items()}
+        self.assertEqual(
+            len(set(counts.values())), 1,
+            f'{name}: query count depends on data size {counts}',
+        )
+        self.assertSnapshot(name, captured[SIZES[-1]])
+
+    def assertSnapshot(self, name, queries):
+        if not snapshots_compared():
+            return
+        path = SNAPSHOT_DIR / f'{name}.sql'
+        actual = f'-- {len(queries)} queries\n' + ''.join(f'{sql};\n' for sql in queries)
+        if UPDATE_SNAPSHOTS:
+            SNAPSHOT_DIR.mkdir(exist_ok=True)
+            path.write_text(actual)
+            return
+        if not path.exists():
+            self.fail(f'No query snapshot for {name}; record it with UPDATE_QUERY_SNAPSHOTS=1.\n{actual}')
+        expected = path.read_text()
+        if actual != expected:
+            diff = ''.join(difflib.unified_diff(
+                expected.splitlines(keepends=True), actual.splitlines(keepends=True),
+                fromfile=f'{path.name} (snapshot)', tofile=f'{path.name} (actual)',
+            ))
+            self.fail(f'Queries for {name} changed; rerun with UPDATE_QUERY_SNAPSHOTS=1 if intended.\n{diff}')
+
+    # Scenarios
+
+    def test_every_endpoint_has_a_budget(self):
+        for pattern in urlpatterns:
+            test_name = 'test_' + pattern.name.replace('-', '_')
+            self.assertTrue(hasattr(self, test_name), f'No query budget test for {pattern.name!r}')
+
+    def test_missing_snapshot_fails(self):
+        if UPDATE_SNAPSHOTS or not snapshots_compared():
+            self.skipTest('Snapshots are being recorded, or not compared here')
+        with self.assertRaisesMessage(AssertionError, 'No query snapshot for no-such-endpoint'):
+            self.assertSnapshot('no-such-endpoint', ['SELECT 1'])
+        self.assertFalse((SNAPSHOT_DIR / 'no-such-endpoint.sql').exists())
+
+    def test_login_user(self):
+        def scenario(size):
+            return lambda: self.client.post(
+                '/api/auth/login/', {'username': 'testuser', 'password': 'testpass'},
+                content_type='application/json',
+            )
+        self.assertQueryBudget('login-user', scenario)
+
+    def test_logout_user(self):
+        def scenario(size):
+            self.login()
+            return lambda: self.client.post('/api/auth/logout/')
+        self.assertQueryBudget('logout-user', scenario)
+
+    def test_check_auth_status(self):
+        def scenario(size):
+            self.login()
+            return lambda: self.client.get('/api/auth/status/')
+        self.assertQueryBudget('check-auth-status', scenario)
+
+    def test_product_list(self):
+        def scenario(size):
+            self.make_products(size)
+            return lambda: self.client.get('/api/products/')
+        self.assertQueryBudget('product-list', scenario)
+
+    def test_product_list_page(self):
+        def scenario(size):
+            self.make_products(size)
+            return lambda: self.client.get('/api/products/?sort=bestselling&limit=10')
+        self.assertQueryBudget('product-list-page', scenario)
+
+    def test_product_list_fields(self):
+        def scenario(size):
+            self.make_products(size)
+            return lambda: self.client.get('/api/products/?fields=id,name,price')
+        self.assertQueryBudget('product-list-fields', scenario)
+
+    def test_product_detail(self):
+        def scenario(size):
+            product = self.make_products(size)[-1]
+            return lambda: self.client.get(f'/api/products/{product.id}/')
+        self.assertQueryBudget('product-detail', scenario)
+
+    def test_product_batch(self):
+        def scenario(size):
+            ids = ','.join(str(product.id) for product in self.make_products(size))
+            return lambda: self.client.get(f'/api/products/batch/?ids={ids}')
+        self.assertQueryBudget('product-batch', scenario)
+
+    def test_product_recommendations(self):
+        def scenario(size):
+            product = self.make_products(size)[-1]
+            return lambda: self.client.get(f'/api/products/{product.id}/recommendations/')
+        self.assertQueryBudget('product-recommendations', scenario)
+
+    def test_catalog_snapshot(self):
+        root = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(
+            STATIC_ROOT=root, CATALOG_SNAPSHOT_POINTER=os.path.join(root, 'catalog-snapshot.json'),
+        ))
+        self.addCleanup(snapshots.invalidate)
+
+        def scenario(size):
+            self.make_products(size)
+            snapshots.build()
+            return lambda: self.client.get('/api/catalog/snapshot/')
+        self.assertQueryBudget('catalog-snapshot', scenario)
+
+    def test_get_cart(self):
+        def scenario(size):
+            self.make_cart(size)
+            self.login()
+            return lambda: self.client.get('/api/cart/')
+        self.assertQueryBudget('get-cart', scenario)
+
+    def test_get_cart_fields(self):
+        def scenario(size):
+            self.make_cart(size)
+            self.login()
+            return lambda: self.client.get('/api/cart/?fields=cart_id,items.product_id,items.quantity')
+        self.assertQueryBudget('get-cart-fields', scenario)
+
+    def test_add_to_cart(self):
+        def scenario(size):
+            self.make_cart(size)
+            product = self.make_products(1)[0]
+            self.login()
+            return lambda: self.client.post(
+                '/api/cart/add/', {'product_id': product.id, 'quantity': 1},
+                content_type='application/json',
+            )
+        self.assertQueryBudget('add-to-cart', scenario)
+
+    def test_delete_cart_item(self):
+        def scenario(size):
+            cart = self.make_cart(size)
+            item = cart.items.first()
+            self.login()
+            return lambda: self.client.delete(f'/api/cart/delete/{item.id}/')
+        self.assertQueryBudget('delete-cart-item', scenario)
+
+    def test_shipping_quote(self):
+        def scenario(size):
+            items = [{'product_id': product.id, 'quantity': 2} for product in self.make_products(size)]
+            return lambda: self.client.post(
+                '/api/shipping/quote/', {'items': items}, content_type='application/json',
+            )
+        self.assertQueryBudget('shipping-quote', scenario)
+
+    def test_checkout(self):
+        def scenario(size):
+            self.make_cart(size)
+            self.login()
+            return lambda: self.client.post(
+                '/api/checkout/', {'shipping_address': '1 Main St'}, content_type='application/json',
+            )
+        self.assertQueryBudget('checkout', scenario)
+
+    def test_list_orders(self):
+        def scenario(size):
+            self.make_orders(size, items_per_order=3)
+            self.login()
+            return lambda: self.client.get('/api/orders/')
+        self.assertQueryBudget('list-orders', scenario)
+
+    def test_order_detail(self):
+        def scenario(size):
+            order = self.make_orders(1, items_per_order=size)[0]
+            self.login()
+            return lambda: self.client.get(f'/api/orders/{order.order_id}/')
+        self.assertQueryBudget('order-detail', scenario)
+
+    def test_order_detail_fields(self):
+        def scenario(size):
+            order = self.make_orders(1, items_per_order=size)[0]
+            self.login()
+            return lambda: self.client.get(f'/api/orders/{order.order_id}/?fields=status,items.product_id')
+        self.assertQueryBudget('order-detail-fields', scenario)
+
+    def test_cancel_order(self):
+        def scenario(size):
+            order = self.make_orders(1, items_per_order=size)[0]
+            # Sold through the ledger, so the cancellation restocks every item
+            inventory.take_stock(order, order.items.values_list('product_id', 'quantity'))
+            self.login()
+            return lambda: self.client.post(f'/api/orders/{order.order_id}/cancel/')
+        self.assertQueryBudget('cancel-order', scenario)
+
+    def test_list_changes(self):
+        def scenario(size):
+            ChangeLogEntry.objects.bulk_create([
+                ChangeLogEntry(model='product', object_id=str(product.id), action='insert')
+                for product in self.make_products(size)
+            ])
+            self.login()
+            return lambda: self.client.get('/api/changes/?since=0')
+        with self.settings(CHANGE_FEED_LAG=0):
+            self.assertQueryBudget('list-changes', scenario)
+
+    def test_export_orders(self):
+        def scenario(size):
+            self.make_orders(size, items_per_order=2)
+            self.login_staff()
+            return lambda: self.get_streamed('/api/export/orders/?status=PENDING')
+        self.assertQueryBudget('export-orders', scenario)
+
+    def test_export_order_items(self):
+        def scenario(size):
+            self.make_orders(size, items_per_order=2)
+            self.login_staff()
+            return lambda: self.get_streamed('/api/export/order-items/?created_after=2000-01-01')
+        self.assertQueryBudget('export-order-items', scenario)
+
+    def test_picklist(self):
+        def scenario(size):
+            self.make_orders(size, items_per_order=2)
+            self.login_staff()
+            return lambda: self.post_streamed('/api/fulfillment/picklist/', {'limit': 1000})
+        self.assertQueryBudget('picklist', scenario)
+
+    def test_metrics(self):
+        def scenario(size):
+            self.login_staff()
+            return lambda: self.client.get('/api/metrics/')
+        self.assertQueryBudget('metrics', scenario)
@@ -0,0 +1,84 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from . import inventory, rankings
+from .models import Category, Order, Product
+
+
+class RankingsTestCase(TestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.category = Category.objects.create(name='Electronics')
+        self.products = Product.objects.bulk_create([
+            Product(name=f'Product {n}', description='', category=self.category, price=Decimal('10.00'),
+                    stock_quantity=100, sku=f'SKU-{n}')
+            for n in range(5)
+        ])
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.orders = 0
+
+    def sell(self, product, quantity, days_ago=0):
+        self.orders += 1
+        order = Order.objects.create(user=self.user, order_id=f'ORD-{self.orders}', total_price=10)
+        Order.objects.using(order._state.db).filter(pk=order.pk).update(created_at=timezone.now() - timedelta(days=days_ago))
+        order.refresh_from_db()
+        inventory.take_stock(order, [(product.id, quantity)])
+        return order
+
+    def ids(self, sort, **params):
+        data = self.client.get('/api/products/', {'sort': sort, **params}).json()
+        return [product['id'] for product in data['products']], data['next_cursor']
+
+    def test_weights_halve_per_half_life(self):
+        moment = settings.TRENDING_EPOCH + timedelta(days=30)
+        later = moment + timedelta(days=settings.TRENDING_HALF_LIFE_DAYS)
+        self.assertAlmostEqual(rankings.weight(later), 2 * rankings.weight(moment))
+        self.assertAlmostEqual(rankings.decayed(rankings.weight(moment), later), 0.5)
+
+    def test_sales_and_cancellations_update_counters(self):
+        product = self.products[0]
+        order = self.sell(product, 3)
+        product.refresh_from_db()
+        self.assertEqual(product.sales_count, 3)
+        self.assertAlmostEqual(rankings.decayed(product.trending_score), 3, places=3)
+        inventory.restock(order)
+        product.refresh_from_db()
+        self.assertEqual((product.sales_count, product.stock_quantity), (0, 100))
+        self.assertAlmostEqual(product.trending_score, 0)
+
+    def test_bestselling_and_trending_orders(self):
+        old_hit, new_hit = self.products[0], self.products[1]
+        self.sell(old_hit, 10, days_ago=60)
+        self.sell(new_hit, 2)
+        self.assertEqual(self.ids('bestselling', limit=2)[0], [old_hit.id, new_hit.id])
+        self.assertEqual(self.ids('trending', limit=2)[0], [new_hit.id, old_hit.id])
+
+    def test_cursor_pagination_walks_every_product_once(self):
+        for product, quantity in zip(self.products, [1, 1, 2, 0, 5]):
+            if quantity:
+                self.sell(product, quantity)
+        for sort in ('newest', 'bestselling', 'trending'):
+            seen, cursor = [], None
+            while True:
+                page, cursor = self.ids(sort, limit=2, **({'cursor': cursor} if cursor else {}))
+                seen.extend(page)
+                if cursor is None:
+                    break
+            self.assertEqual(sorted(seen), sorted(product.id for product in self.products), sort)
+        self.assertEqual(self.ids('bestselling')[0][:2], [self.products[4].id, self.products[2].id])
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get('/api/products/?sort=cheapest').status_code, 400)
+        self.assertEqual(self.client.get('/api/products/?limit=0').status_code, 400)
+        self.assertEqual(self.client.get('/api/products/?cursor=garbage').status_code, 400)
+        # Without pagination parameters the full list is returned as before
+        self.assertNotIn('next_cursor', self.client.get('/api/products/').json())
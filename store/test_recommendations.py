@@ -0,0 +1,91 @@
+import shutil
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from . import recommendations
+from .models import Cart, CartItem, Category, Order, OrderItem, Product
+
+
+class RecommendationsTestCase(TestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        settings = override_settings(RECOMMENDATIONS_FILE=str(Path(directory) / 'recommendations.bin'))
+        settings.enable()
+        self.addCleanup(settings.disable)
+        recommendations.invalidate()
+        self.addCleanup(recommendations.invalidate)
+
+        category = Category.objects.create(name='Electronics')
+        self.phone, self.case, self.charger, self.cable = Product.objects.bulk_create([
+            Product(name=name, description='', category=category, price=Decimal('10.00'), stock_quantity=10, sku=name)
+            for name in ('Phone', 'Case', 'Charger', 'Cable')
+        ])
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        baskets = [
+            [self.phone, self.case], [self.phone, self.case], [self.phone, self.charger],
+            [self.charger, self.cable],
+        ]
+        for n, basket in enumerate(baskets):
+            self.order(n, basket)
+        # Cancelled orders do not count
+        self.order(99, [self.phone, self.cable], status='CANCELLED')
+
+    def order(self, n, products, status='DELIVERED'):
+        order = Order.objects.create(user=self.user, order_id=f'ORD-{n}', status=status, total_price=10)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=product, quantity=1, price=product.price) for product in products
+        ])
+
+    def build(self, *args):
+        call_command('build_recommendations', *args, stdout=StringIO())
+        recommendations.invalidate()
+
+    def test_missing_file_means_no_recommendations(self):
+        response = self.client.get(f'/api/products/{self.phone.id}/recommendations/')
+        self.assertEqual(response.json()['recommendations'], [])
+
+    def test_neighbours_are_ranked_without_queries(self):
+        self.build()
+        with self.assertNumQueries(0):
+            response = self.client.get(f'/api/products/{self.phone.id}/recommendations/')
+        self.assertEqual(response.json()['recommendations'], [
+            {'product_id': self.case.id, 'score': 2},
+            {'product_id': self.charger.id, 'score': 1},
+        ])
+        data = self.client.get(f'/api/products/{self.phone.id}/recommendations/?limit=1').json()
+        self.assertEqual(len(data['recommendations']), 1)
+        self.assertEqual(self.client.get(f'/api/products/{self.phone.id}/recommendations/?limit=0').status_code, 400)
+
+    def test_top_k_and_rebuilds(self):
+        self.build('--top-k', '1')
+        table = recommendations.get_recommendations()
+        # Ties go to the lower product id
+        self.assertEqual(table.for_product(self.charger.id, 10), [(self.phone.id, 1)])
+        self.assertEqual(table.for_product(12345, 10), [])
+
+        self.order(5, [self.charger, self.cable])
+        self.build()
+        self.assertEqual(recommendations.get_recommendations().for_product(self.charger.id, 10)[0], (self.cable.id, 2))
+        # Readers holding the previous mapping are unaffected by the swap
+        self.assertEqual(table.for_product(self.charger.id, 10), [(self.phone.id, 1)])
+
+    def test_cart_recommendations_exclude_cart_items(self):
+        self.build()
+        cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=cart, product=self.phone, quantity=1, price=self.phone.price)
+        CartItem.objects.create(cart=cart, product=self.case, quantity=1, price=self.case.price)
+        self.client.login(username='testuser', password='testpass')
+        data = self.client.get('/api/cart/').json()
+        self.assertEqual(data['recommended_product_ids'], [self.charger.id])
@@ -0,0 +1,81 @@
+import json
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from . import shards
+from .cache import SharedFileCache
+from .models import Cart, CartItem, Category, Order, Product
+
+
+class ResponseCacheTestCase(TestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        category = Category.objects.create(name='Electronics')
+        self.product = Product.objects.create(
+            name='Phone', description='', category=category, price=Decimal('10.00'), stock_quantity=10, sku='PHONE',
+        )
+        self.cart = Cart.objects.create(user=self.user)
+        self.item = CartItem.objects.create(cart=self.cart, product=self.product, quantity=1, price=self.product.price)
+        self.client.force_login(self.user)
+
+    def test_polling_is_served_from_cache(self):
+        first = self.client.get('/api/cart/')
+        # Session and user only
+        with self.assertNumQueries(2):
+            second = self.client.get('/api/cart/')
+        self.assertEqual(first.content, second.content)
+
+    def test_mutating_views_invalidate(self):
+        self.client.get('/api/cart/')
+        self.client.post('/api/cart/add/', {'product_id': self.product.id, 'quantity': 2}, content_type='application/json')
+        self.assertEqual(self.client.get('/api/cart/').json()['total_items'], 3)
+
+        response = self.client.post('/api/checkout/', json.dumps({}), content_type='application/json')
+        order_id = response.json()['order_id']
+        self.assertEqual(len(self.client.get('/api/orders/').json()['orders']), 1)
+        self.assertEqual(self.client.get(f'/api/orders/{order_id}/').json()['status'], 'PENDING')
+        self.client.post(f'/api/orders/{order_id}/cancel/')
+        self.assertEqual(self.client.get(f'/api/orders/{order_id}/').json()['status'], 'CANCELLED')
+        self.assertEqual(self.client.get('/api/orders/').json()['orders'][0]['status'], 'CANCELLED')
+
+    def test_admin_writes_invalidate_through_signals(self):
+        alias = shards.for_user(self.user.pk)
+        self.client.get('/api/cart/')
+        with self.captureOnCommitCallbacks(using=alias, execute=True):
+            # Loaded without its cart, so the owner is resolved on commit
+            item = CartItem.objects.using(alias).get(pk=self.item.pk)
+            item.quantity = 5
+            item.save()
+        self.assertEqual(self.client.get('/api/cart/').json()['total_items'], 5)
+
+        order = Order.objects.create(user=self.user, order_id='ORD-TEST-0001')
+        self.client.get(f'/api/orders/{order.order_id}/')
+        with self.captureOnCommitCallbacks(using=alias, execute=True):
+            Order.objects.using(alias).filter(pk=order.pk).get().delete()
+        self.assertEqual(self.client.get(f'/api/orders/{order.order_id}/').status_code, 404)
+
+    def test_responses_are_per_user(self):
+        self.client.get('/api/cart/')
+        other = User.objects.create_user(username='other', password='testpass')
+        self.client.force_login(other)
+        self.assertTrue(self.client.get('/api/cart/').json()['is_empty'])
+
+
+class SharedFileCacheTestCase(SimpleTestCase):
+    def test_concurrent_bumps_are_not_lost(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # One instance per thread, like one per worker process
+            caches = [SharedFileCache(directory, {}) for _ in range(4)]
+            caches[0].add('version', 0)
+            with ThreadPoolExecutor(max_workers=len(caches)) as pool:
+                list(pool.map(lambda c: [c.incr('version') for _ in range(50)], caches))
+            self.assertEqual(caches[0].get('version'), 200)
@@ -0,0 +1,129 @@
+import csv
+import io
+import json
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connections
+from django.test import TransactionTestCase
+
+from . import shards
+from .models import Cart, Category, Order, OrderItem, Product, StockMovement
+
+
+@skipUnless(
+    len(settings.ORDER_SHARDS) > 1,
+    'Needs order shards, e.g. ORDER_SHARD_URLS=sqlite:///db-shard-1.sqlite3',
+)
+class OrderShardTestCase(TransactionTestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        # One customer per shard, in shard order
+        customers = {}
+        while len(customers) < len(settings.ORDER_SHARDS):
+            user = User.objects.create_user(username=f'customer{User.objects.count()}', password='pass')
+            customers.setdefault(shards.for_user(user.pk), user)
+        self.customers = {alias: customers[alias] for alias in settings.ORDER_SHARDS}
+        self.staff = User.objects.create_user(username='staff', password='pass', is_staff=True, is_superuser=True)
+        category = Category.objects.create(name='Phones')
+        self.product = Product.objects.create(
+            name='Phone', description='', price=Decimal('100.00'), category=category, stock_quantity=10, sku='PH-1',
+        )
+
+    def place_order(self, user, quantity=2):
+        self.client.force_login(user)
+        self.client.post(
+            '/api/cart/add/', json.dumps({'product_id': self.product.pk, 'quantity': quantity}),
+            content_type='application/json',
+        )
+        cart = self.client.get('/api/cart/').json()
+        self.assertEqual((cart['total_items'], cart['items'][0]['product_name']), (quantity, 'Phone'))
+        response = self.client.post('/api/checkout/', '{}', content_type='application/json')
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()['order_id']
+
+    def test_orders_live_on_their_users_shard(self):
+        for alias, user in self.customers.items():
+            order_id = self.place_order(user)
+            order = Order.objects.using(alias).get(order_id=order_id)
+            self.assertEqual(shards.for_pk(order.pk), alias)
+            self.assertEqual(OrderItem.objects.using(alias).get(order=order).product_id, self.product.pk)
+            self.assertFalse(Cart.objects.using(alias).filter(user=user, is_active=True).exists())
+            for other in settings.ORDER_SHARDS:
+                if other != alias:
+                    self.assertFalse(Order.objects.using(other).filter(user=user).exists())
+            # Stock and its ledger stay on default
+            self.assertTrue(StockMovement.objects.filter(order_id=order.pk, reason='SALE').exists())
+
+            self.assertEqual([o['order_id'] for o in self.client.get('/api/orders/').json()['orders']], [order_id])
+            detail = self.client.get(f'/api/orders/{order_id}/?fields=status,items.product_name').json()
+            self.assertEqual(detail, {'status': 'PENDING', 'items': [{'product_name': 'Phone'}]})
+            response = self.client.post(f'/api/orders/{order_id}/cancel/')
+            self.assertEqual(response.json()['status'], 'CANCELLED')
+
+        # Every sale went back to stock
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_quantity, 10)
+        # Order numbers are unique across shards
+        order_ids = [
+            order_id for alias in settings.ORDER_SHARDS
+            for order_id in Order.objects.using(alias).values_list('order_id', flat=True)
+        ]
+        self.assertEqual(len(set(order_ids)), len(settings.ORDER_SHARDS))
+
+    def test_reports_cover_every_shard(self):
+        order_ids = {self.place_order(user, quantity=n + 1) for n, user in enumerate(self.customers.values())}
+        self.client.force_login(self.staff)
+
+        response = self.client.get('/api/export/orders/')
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual({row['order_id'] for row in rows}, order_ids)
+        alias = settings.ORDER_SHARDS[-1]
+        response = self.client.get(f'/api/export/order-items/?user={self.customers[alias].username}')
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual([(row['product_sku'], row['quantity']) for row in rows], [('PH-1', str(len(self.customers)))])
+
+        response = self.client.post('/api/fulfillment/picklist/', '{}', content_type='application/json')
+        pick_list = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(pick_list['order_count'], len(self.customers))
+        total = sum(range(1, len(self.customers) + 1))
+        self.assertEqual(
+            [(line['sku'], line['quantity'], line['orders']) for line in pick_list['lines']],
+            [('PH-1', total, len(self.customers))],
+        )
+
+        order = Order.objects.using(alias).get()
+        response = self.client.get(f'/admin/store/order/?shard={alias}')
+        self.assertContains(response, f'{alias} (1)')
+        self.assertContains(response, f'/admin/store/order/{order.pk}/change/')
+        self.assertEqual(self.client.get(f'/admin/store/order/{order.pk}/change/').status_code, 200)
+
+    def test_streams_read_every_shard(self):
+        for user in self.customers.values():
+            self.place_order(user)
+        querysets = [Order.objects.using(alias).order_by('id') for alias in settings.ORDER_SHARDS]
+        streams = shards.stream(querysets, chunk_size=1)
+        self.assertEqual(
+            [[order.pk for order in stream] for stream in streams],
+            [[order.pk for order in queryset] for queryset in querysets],
+        )
+        # Stopped early, like a client leaving halfway through an export
+        stream = shards.stream(querysets, chunk_size=1)[0]
+        self.assertEqual(next(stream).pk, querysets[0][0].pk)
+        stream.close()
+
+    def test_only_cross_database_keys_lose_their_constraints(self):
+        def foreign_keys(alias, model):
+            connection = connections[alias]
+            with connection.cursor() as cursor:
+                constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+            return {column for c in constraints.values() if c['foreign_key'] for column in c['columns']}
+
+        self.assertEqual(foreign_keys('default', Order), {'user_id', 'pick_list_id'})
+        self.assertEqual(foreign_keys('default', StockMovement), {'product_id'})
+        for alias in settings.ORDER_SHARDS[1:]:
+            self.assertEqual(foreign_keys(alias, Order), set())
+            self.assertEqual(foreign_keys(alias, OrderItem), {'order_id'})
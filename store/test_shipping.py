@@ -0,0 +1,81 @@
+import json
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from . import shards, shipping
+from .models import Cart, CartItem, Category, Order, Product
+
+
+class ShippingTestCase(TestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.category = Category.objects.create(name='Electronics')
+        # 800 g but 40x30x20 cm: 4.8 kg dimensional
+        self.box = Product.objects.create(
+            name='Box', description='', category=self.category, price=Decimal('20.00'), stock_quantity=10,
+            sku='BOX', weight=800, length=40, width=30, height=20,
+        )
+        self.anvil = Product.objects.create(
+            name='Anvil', description='', category=self.category, price=Decimal('90.00'), stock_quantity=10,
+            sku='ANVIL', weight=9_000, length=10, width=10, height=10,
+        )
+
+    def quote(self, items, **data):
+        return self.client.post(
+            '/api/shipping/quote/', json.dumps({'items': items, **data}), content_type='application/json',
+        )
+
+    def test_rate_bands(self):
+        rates = shipping.get_rates().zones['DOMESTIC']
+        self.assertEqual(rates.price(Decimal('0.5')), Decimal('4.99'))
+        self.assertEqual(rates.price(Decimal('0.501')), Decimal('6.49'))
+        # Two started kilograms over the last 20 kg band
+        self.assertEqual(rates.price(Decimal('21.2')), Decimal('29.99') + 2 * Decimal('1.25'))
+
+    def test_billable_weight_is_the_greater_of_actual_and_dimensional(self):
+        data = self.quote([{'product_id': self.box.id, 'quantity': 1}]).json()
+        self.assertEqual(data['billable_weight_kg'], '4.800')
+        self.assertEqual(data['price'], '12.99')
+        data = self.quote([{'product_id': self.anvil.id, 'quantity': 3}], zone='regional').json()
+        self.assertEqual((data['zone'], data['billable_weight_kg']), ('REGIONAL', '27.000'))
+
+    def test_quotes_are_cached_per_contents_until_the_catalog_changes(self):
+        items = [{'product_id': self.box.id, 'quantity': 1}, {'product_id': self.anvil.id, 'quantity': 1}]
+        self.quote(items)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.quote(list(reversed(items))).status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.box.weight = 9_000
+            self.box.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.quote(items).json()['actual_weight_kg'], '18.000')
+
+    def test_errors(self):
+        self.assertEqual(self.quote([{'product_id': 999}]).status_code, 404)
+        self.assertEqual(self.quote([{'product_id': self.box.id}], zone='MOON').status_code, 400)
+        self.assertEqual(self.quote([]).status_code, 400)
+        for body in ('{"items": [', '[]', 'null'):
+            response = self.client.post('/api/shipping/quote/', body, content_type='application/json')
+            self.assertEqual(response.status_code, 400, body)
+        for zone in (5, {}, ['DOMESTIC']):
+            self.assertEqual(self.quote([{'product_id': self.box.id}], zone=zone).status_code, 400, zone)
+
+    def test_cart_and_checkout_include_shipping(self):
+        user = User.objects.create_user(username='testuser', password='testpass')
+        cart = Cart.objects.create(user=user)
+        CartItem.objects.create(cart=cart, product=self.box, quantity=1, price=self.box.price)
+        self.client.login(username='testuser', password='testpass')
+
+        data = self.client.get('/api/cart/').json()
+        self.assertEqual((data['shipping']['price'], data['grand_total']), ('12.99', '32.99'))
+        response = self.client.post('/api/checkout/', json.dumps({'shipping_zone': {}}), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post('/api/checkout/', json.dumps({}), content_type='application/json')
+        order = Order.objects.using(shards.for_user(user.pk)).get(order_id=response.json()['order_id'])
+        self.assertEqual((order.shipping_zone, order.shipping_price, order.total_price), ('DOMESTIC', Decimal('12.99'), Decimal('32.99')))
@@ -0,0 +1,92 @@
+import gzip
+import json
+import os
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from . import snapshots
+from .models import Category, Product
+
+
+class CatalogSnapshotTestCase(TestCase):
+    def setUp(self):
+        root = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(
+            STATIC_ROOT=os.path.join(root, 'static'),
+            CATALOG_SNAPSHOT_POINTER=os.path.join(root, 'catalog-snapshot.json'),
+            CATALOG_SNAPSHOT_PAGE_SIZE=2,
+        ))
+        os.makedirs(os.path.join(root, 'static'))
+        snapshots.invalidate()
+        self.addCleanup(snapshots.invalidate)
+        category = Category.objects.create(name='Electronics')
+        self.products = [
+            Product.objects.create(
+                name=f'Product {n}', description='', category=category, price=Decimal('10.00'),
+                stock_quantity=5, sku=f'SKU-{n}',
+            )
+            for n in range(3)
+        ]
+
+    def build(self):
+        call_command('build_catalog_snapshot', stdout=StringIO())
+        return self.client.get('/api/catalog/snapshot/').json()
+
+    def test_no_snapshot_yet(self):
+        self.assertEqual(self.client.get('/api/catalog/snapshot/').status_code, 404)
+
+    def test_snapshot_is_served_as_immutable_static_files(self):
+        Product.objects.filter(pk=self.products[1].pk).update(is_active=False)
+        pointer = self.build()
+        self.assertEqual(pointer['count'], 2)
+
+        response = self.client.get(pointer['manifest'])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response['Cache-Control'])
+        manifest = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(len(manifest['pages']), 1)
+
+        response = self.client.get(manifest['pages'][0], HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        page = json.loads(gzip.decompress(b''.join(response.streaming_content)))
+        self.assertEqual([product['sku'] for product in page['products']], ['SKU-0', 'SKU-2'])
+        self.assertEqual(page['products'][0], self.client.get(f'/api/products/{self.products[0].pk}/').json())
+
+    def test_unchanged_pages_are_reused_and_old_ones_collected(self):
+        first = json.loads(b''.join(self.client.get(self.build()['manifest']).streaming_content))
+        product = self.products[2]
+        product.name = 'Renamed'
+        product.save()
+        with override_settings(CATALOG_SNAPSHOT_KEEP=1), mock.patch.object(snapshots, 'COLLECT_GRACE', -60):
+            second = json.loads(b''.join(self.client.get(self.build()['manifest']).streaming_content))
+
+        self.assertEqual(first['pages'][0], second['pages'][0])
+        self.assertNotEqual(first['pages'][1], second['pages'][1])
+        # The replaced page is gone, even though the middleware had indexed it
+        self.assertEqual(self.client.get(first['pages'][1]).status_code, 404)
+        self.assertEqual(self.client.get(second['pages'][1]).status_code, 200)
+
+    def test_rebuilds_wait_for_the_catalog_to_settle(self):
+        self.assertTrue(snapshots.is_due())
+        self.build()
+        self.assertFalse(snapshots.is_due())
+
+        product = self.products[0]
+        product.price = Decimal('12.00')
+        product.save()
+        now = timezone.now()
+        self.assertFalse(snapshots.is_due(now))
+        self.assertTrue(snapshots.is_due(now + timedelta(seconds=31)))
+        with override_settings(CATALOG_SNAPSHOT_DEBOUNCE=3600):
+            self.assertTrue(snapshots.is_due(now + timedelta(seconds=301)))
+
+        out = StringIO()
+        call_command('build_catalog_snapshot', '--if-stale', stdout=out)
+        self.assertIn('up to date', out.getvalue())
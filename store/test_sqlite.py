@@ -0,0 +1,26 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from .sqlite import tune
+
+
+@skipUnless(connection.vendor == 'sqlite', 'SQLite profile')
+class SQLiteProfileTestCase(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    @override_settings(SQLITE_TUNED=True, SQLITE_PRAGMAS={'busy_timeout': 1234, 'cache_size': -2000})
+    def test_connections_are_tuned(self):
+        tune(sender=connection.__class__, connection=connection)
+        self.assertEqual((self.pragma('busy_timeout'), self.pragma('cache_size')), (1234, -2000))
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+
+    @override_settings(SQLITE_TUNED=False, SQLITE_PRAGMAS={'busy_timeout': 1234})
+    def test_default_profile_is_untouched(self):
+        before = self.pragma('busy_timeout')
+        tune(sender=connection.__class__, connection=connection)
+        self.assertEqual(self.pragma('busy_timeout'), before)
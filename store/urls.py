@@ -11,12 +11,31 @@ urlpatterns = [
     
     # This pattern maps the 'products/' URL to our product_list view
     path('products/', views.product_list, name='product-list'),
+    path('products/batch/', views.product_batch, name='product-batch'),
+    path('products/<int:product_id>/', views.product_detail, name='product-detail'),
+    path('products/<int:product_id>/recommendations/', views.product_recommendations, name='product-recommendations'),
+    # Where the current static catalog snapshot is
+    path('catalog/snapshot/', views.catalog_snapshot, name='catalog-snapshot'),
     # This pattern maps the 'cart/' URL to our get_cart view
     path('cart/', views.get_cart, name='get-cart'),
     path('cart/add/', views.add_to_cart, name='add-to-cart'),
     path('cart/delete/<int:item_id>/', views.delete_cart_item, name='delete-cart-item'),
+    path('shipping/quote/', views.shipping_quote, name='shipping-quote'),
     path('checkout/', views.checkout, name='checkout'),
     path('orders/', views.list_orders, name='list-orders'),
     path('orders/<str:order_id>/', views.order_detail, name='order-detail'),
     path('orders/<str:order_id>/cancel/', views.cancel_order, name='cancel-order'),
+
+    # Incremental sync: what changed since a cursor
+    path('changes/', views.list_changes, name='list-changes'),
+
+    # Streaming CSV exports for finance (staff only)
+    path('export/orders/', views.export_orders, name='export-orders'),
+    path('export/order-items/', views.export_order_items, name='export-order-items'),
+
+    # Warehouse pick lists (staff only)
+    path('fulfillment/picklist/', views.picklist, name='picklist'),
+
+    # Prometheus scrape endpoint for the per-process request metrics
+    path('metrics/', views.metrics, name='metrics'),
 ] 
\ No newline at end of file
@@ -1,14 +1,25 @@
+import hmac
 import json
+from datetime import datetime, time
+from decimal import Decimal
 
+from django.conf import settings
 from django.contrib.auth import authenticate, login, logout
-from django.db import transaction
-from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse
+from django.db.models import Prefetch, Sum
+from django.http import HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import render
 from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.dateparse import parse_date
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 
-from .models import Cart, CartItem, Order, OrderItem, Product, User
+from . import catalog, changes, compression, exports, fields, fx, inventory, outbox, paginators, picking, promotions, recommendations, shards, shipping, snapshots
+from . import metrics as store_metrics
+from .cache import aget_versions, cache_per_user
+from .metrics import JsonResponse
+from .models import Cart, CartItem, ChangeLogEntry, Order, OrderItem, PickList, Product, User
+from .signals import CATALOG, PROMOTIONS, STOCK, invalidate_user
 
 # Create your views here.
 
@@ -94,88 +105,314 @@ def check_auth_status(request):
             'user': None
         })
 
-def product_list(request):
+# ?sort= of products/ -> the field pages are ordered by (descending, then -id)
+PRODUCT_SORTS = {
+    'newest': 'created_at',
+    'bestselling': 'sales_count',
+    'trending': 'trending_score',
+}
+
+async def product_list(request):
     """
     API view to list all products with their categories.
+    Async so that slow clients and slow queries do not hold a worker under ASGI.
+    Optional ?currency=EUR converts the displayed prices.
+    With ?sort=newest|bestselling|trending, ?limit= or ?cursor= the list is paginated
+    by keyset: pass 'next_cursor' back as ?cursor= for the next page.
+    Optional ?fields=id,name,price loads and returns only those fields.
     """
+    try:
+        selection = fields.parse(request, catalog.PRODUCT_FIELDS)
+    except fields.InvalidFields as exc:
+        return JsonResponse({'error': f'Unknown field: {exc}'}, status=400)
+    currency = request.GET.get('currency')
+    if currency:
+        try:
+            currency = fx.normalize_currency(currency)
+        except fx.UnsupportedCurrency:
+            return JsonResponse({'error': f'Unsupported currency: {currency}'}, status=400)
+    paginate = any(param in request.GET for param in ('sort', 'limit', 'cursor'))
+    sort = request.GET.get('sort', 'newest')
+    if sort not in PRODUCT_SORTS:
+        return JsonResponse({'error': f"sort must be one of: {', '.join(PRODUCT_SORTS)}"}, status=400)
+    try:
+        limit = int(request.GET.get('limit', settings.PRODUCT_PAGE_SIZE))
+    except ValueError:
+        return JsonResponse({'error': 'limit must be an integer'}, status=400)
+    if not 1 <= limit <= settings.PRODUCT_PAGE_MAX:
+        return JsonResponse({'error': f'limit must be between 1 and {settings.PRODUCT_PAGE_MAX}'}, status=400)
+
+    # Read before the products, so a concurrent catalog or stock change can only make the key older
+    catalog_version, stock_version = await aget_versions([CATALOG, STOCK])
+
     # Fetch all product objects, and pre-fetch the related category
     # to avoid extra database queries.
-    products = Product.objects.all().select_related('category')
+    products = Product.objects.all()
+    if 'category' in selection:
+        products = products.select_related('category')
+    if not selection.everything:
+        # Pagination reads the sort field and id of the last row
+        paging = (PRODUCT_SORTS[sort],) if paginate else ()
+        products = products.only('id', *paging, *selection.columns(catalog.PRODUCT_COLUMNS))
+    cursor = None
+    if paginate:
+        try:
+            page = paginators.keyset_page(products, PRODUCT_SORTS[sort], request.GET.get('cursor'), limit)
+        except paginators.InvalidCursor:
+            return JsonResponse({'error': 'Invalid cursor'}, status=400)
+        products, cursor = paginators.next_cursor(
+            [product async for product in page.aiterator()], PRODUCT_SORTS[sort], limit,
+        )
+    else:
+        products = [product async for product in products.aiterator()]
+    if 'price' not in selection:
+        prices = [None] * len(products)
+    elif currency:
+        # One batched conversion for the whole page
+        converted = fx.convert_many(((product.price, fx.BASE_CURRENCY) for product in products), currency)
+        prices = [f"{currency} {price}" for price in converted]
+    else:
+        prices = [product.get_display_price() for product in products]  # Use model method for currency
     
     # Prepare the data in a list of dictionaries
     data = {
-        'products': [
-            {
-                'id': product.id,
-                'name': product.name,
-                'description': product.description,
-                'price': product.get_display_price(),  # Use model method for currency
-                'category': {
-                    'id': product.category.id,
-                    'name': product.category.name,
-                },
-                'stock_quantity': product.stock_quantity,
-                'is_active': product.is_active,
-                'sku': product.sku,
-                # Add units to dimensions
-                'weight': f"{product.weight} g" if product.weight is not None else None,
-                'length': f"{product.length} cm" if product.length is not None else None,
-                'width': f"{product.width} cm" if product.width is not None else None,
-                'height': f"{product.height} cm" if product.height is not None else None,
-                # Format timestamps to be human-readable
-                'created_at': timezone.localtime(product.created_at).strftime("%B %d, %Y, %I:%M %p"),
-                'updated_at': timezone.localtime(product.updated_at).strftime("%B %d, %Y, %I:%M %p"),
-            }
-            for product in products
-        ]
+        'products': [catalog.product_data(product, price, selection) for product, price in zip(products, prices)]
     }
+    if paginate:
+        data['next_cursor'] = cursor
     
-    # Return the data as a JSON response
-    return JsonResponse(data)
+    # Return the data as a JSON response; its compressed body is reused until the catalog,
+    # the stock or the FX rates change
+    return compression.mark_cacheable(
+        JsonResponse(data),
+        f'product-list:{catalog_version}:{stock_version}:{fx.get_rates().version}:{request.get_full_path()}',
+    )
+
+async def product_detail(request, product_id):
+    """
+    API view to get one active product, served from the per-product cache.
+    """
+    products = await catalog.aget_products([product_id])
+    if product_id not in products:
+        return JsonResponse({'error': 'Product not found'}, status=404)
+    return JsonResponse(products[product_id])
+
+async def product_batch(request):
+    """
+    API view to get several active products at once: /api/products/batch/?ids=1,2,3
+    Cached products cost no query; all misses are loaded with one query.
+    Products are returned in the requested order; unknown or inactive ids are listed in 'missing'.
+    """
+    try:
+        product_ids = list(dict.fromkeys(int(value) for value in request.GET.get('ids', '').split(',') if value.strip()))
+    except ValueError:
+        return JsonResponse({'error': 'ids must be a comma-separated list of product ids'}, status=400)
+    if not product_ids:
+        return JsonResponse({'error': 'ids is required'}, status=400)
+    if len(product_ids) > settings.PRODUCT_BATCH_MAX:
+        return JsonResponse({'error': f'At most {settings.PRODUCT_BATCH_MAX} ids per request'}, status=400)
+
+    products = await catalog.aget_products(product_ids)
+    return JsonResponse({
+        'products': [products[product_id] for product_id in product_ids if product_id in products],
+        'missing': [product_id for product_id in product_ids if product_id not in products],
+    })
+
+def product_recommendations(request, product_id):
+    """
+    API view to get the products most often bought together with a product,
+    best first: /api/products/<id>/recommendations/?limit=10
+    Served from the memory-mapped file written by build_recommendations, without
+    touching the database; ids only, fetch details with products/batch/.
+    """
+    try:
+        limit = int(request.GET.get('limit', recommendations.DEFAULT_LIMIT))
+    except ValueError:
+        return JsonResponse({'error': 'limit must be an integer'}, status=400)
+    if not 1 <= limit <= settings.RECOMMENDATIONS_TOP_K:
+        return JsonResponse({'error': f'limit must be between 1 and {settings.RECOMMENDATIONS_TOP_K}'}, status=400)
+
+    table = recommendations.get_recommendations()
+    return JsonResponse({
+        'product_id': product_id,
+        'recommendations': [
+            {'product_id': neighbour, 'score': score}
+            for neighbour, score in table.for_product(product_id, limit)
+        ],
+    })
+
+def catalog_snapshot(request):
+    """
+    API view to point clients at the current static catalog snapshot: the
+    manifest listing its pages (see store/snapshots.py). The files themselves
+    are static and cached forever; only this pointer changes.
+    """
+    pointer = snapshots.current()
+    if pointer.manifest is None:
+        return JsonResponse({'error': 'No catalog snapshot has been built'}, status=404)
+    response = JsonResponse({
+        'manifest': pointer.manifest,
+        'version': pointer.version,
+        'built_at': pointer.built_at,
+        'count': pointer.count,
+    })
+    patch_cache_control(response, public=True, max_age=int(settings.CATALOG_SNAPSHOT_CHECK_INTERVAL))
+    return response
+
+def _cart_key_parts():
+    return (
+        f'{fx.get_rates().version}:{shipping.get_rates().version}:'
+        f'{recommendations.get_recommendations().version}'
+    )
+
+CART_FIELDS = (
+    'cart_id', 'total_items', 'subtotal', 'discount', 'cart_promotion', 'total_price', 'shipping',
+    'grand_total', 'currency', 'is_empty', 'items', 'recommended_product_ids',
+)
+# Item key -> formatter(item, unit price, priced line, currency)
+CART_ITEM_FIELDS = {
+    'item_id': lambda item, unit_price, line, currency: item.id,  # This is the item_id you need for deletion
+    'product_id': lambda item, unit_price, line, currency: item.product_id,
+    'product_name': lambda item, unit_price, line, currency: item.product.name,
+    'product_sku': lambda item, unit_price, line, currency: item.product.sku,
+    'quantity': lambda item, unit_price, line, currency: item.quantity,
+    'price_per_unit': lambda item, unit_price, line, currency: str(unit_price),
+    'discount': lambda item, unit_price, line, currency: str(line.discount),
+    'promotion': lambda item, unit_price, line, currency: line.promotion,
+    'total_price': lambda item, unit_price, line, currency: str(line.total),
+    'currency': lambda item, unit_price, line, currency: currency,
+    'added_at': lambda item, unit_price, line, currency: timezone.localtime(item.added_at).strftime("%B %d, %Y, %I:%M %p"),
+}
+CART_ITEM_COLUMNS = {
+    'item_id': ('id',),
+    'product_id': ('product',),
+    'product_name': ('product__name',),
+    'product_sku': ('product__sku',),
+    'quantity': ('quantity',),
+    'added_at': ('added_at',),
+}
 
-def get_cart(request):
+@cache_per_user(CATALOG, PROMOTIONS, key_parts=_cart_key_parts)
+async def get_cart(request):
     """
     API view to get the current user's cart with all items.
+    Totals are computed from the fetched items instead of re-querying the cart.
+    Optional ?currency=EUR converts prices (default: USD); optional ?zone= picks
+    the shipping zone for the quote (default: SHIPPING_DEFAULT_ZONE).
+    'recommended_product_ids' lists products often bought with the cart's items.
+    Optional ?fields=total_price,items.product_id skips pricing, the shipping quote
+    and recommendations when none of the requested fields needs them.
     """
-    if not request.user.is_authenticated:
+    user = await request.auser()
+    if not user.is_authenticated:
         return JsonResponse({'error': 'Authentication required'}, status=401)
 
     try:
-        cart = Cart.objects.get(user=request.user, is_active=True)
-        cart_items = CartItem.objects.filter(cart=cart).select_related('product')
-        
-        data = {
-            'cart_id': cart.id,
-            'total_items': cart.get_total_quantity(),
-            'total_price': str(cart.get_total_price()),
-            'is_empty': cart.is_empty(),
-            'items': [
-                {
-                    'item_id': item.id,  # This is the item_id you need for deletion
-                    'product_id': item.product.id,
-                    'product_name': item.product.name,
-                    'product_sku': item.product.sku,
-                    'quantity': item.quantity,
-                    'price_per_unit': str(item.price),
-                    'total_price': str(item.get_total_price()),
-                    'currency': item.currency,
-                    'added_at': timezone.localtime(item.added_at).strftime("%B %d, %Y, %I:%M %p"),
-                }
-                for item in cart_items
-            ]
-        }
-        
-        return JsonResponse(data)
-        
+        selection = fields.parse(request, CART_FIELDS, {'items': CART_ITEM_FIELDS})
+    except fields.InvalidFields as exc:
+        return JsonResponse({'error': f'Unknown field: {exc}'}, status=400)
+    try:
+        currency = fx.normalize_currency(request.GET.get('currency') or fx.BASE_CURRENCY)
+    except fx.UnsupportedCurrency:
+        return JsonResponse({'error': f"Unsupported currency: {request.GET['currency']}"}, status=400)
+    try:
+        zone = shipping.normalize_zone(request.GET.get('zone'))
+    except shipping.UnknownZone:
+        return JsonResponse({'error': f"Unknown shipping zone: {request.GET['zone']}"}, status=400)
+
+    db = shards.for_user(user.pk)
+    try:
+        cart = await Cart.objects.using(db).aget(user=user, is_active=True)
     except Cart.DoesNotExist:
         # User has no active cart
-        return JsonResponse({
-            'cart_id': None,
-            'total_items': 0,
-            'total_price': '0.00',
-            'is_empty': True,
-            'items': []
-        })
+        def zero():
+            return str(fx.rounder(currency)(Decimal(0)))
+
+        return JsonResponse(selection.render({
+            'cart_id': lambda: None,
+            'total_items': lambda: 0,
+            'subtotal': zero,
+            'discount': zero,
+            'cart_promotion': lambda: None,
+            'total_price': zero,
+            'shipping': lambda: _shipping_data(shipping.quote([], zone), currency),
+            'grand_total': zero,
+            'currency': lambda: currency,
+            'is_empty': lambda: True,
+            'items': lambda: [],
+            'recommended_product_ids': lambda: [],
+        }))
+
+    item_selection = selection.child('items')
+    needs_pricing = selection.wants_any('subtotal', 'discount', 'cart_promotion', 'total_price', 'grand_total') or (
+        'items' in selection and item_selection.wants_any('price_per_unit', 'discount', 'promotion', 'total_price')
+    )
+    needs_shipping = selection.wants_any('shipping', 'grand_total')
+    items = CartItem.objects.using(db).filter(cart=cart)
+    if selection.everything:
+        items, _ = shards.related(items, 'product')
+    elif selection.wants_any(*(name for name in CART_FIELDS if name not in ('cart_id', 'currency'))):
+        columns = {'id', 'product', 'quantity'}
+        if needs_pricing:
+            columns |= {'price', 'currency', 'product__category'}
+        if needs_shipping:
+            columns |= {'product__weight', 'product__length', 'product__width', 'product__height'}
+        if 'items' in selection:
+            columns.update(item_selection.columns(CART_ITEM_COLUMNS))
+        product_columns = {column.removeprefix('product__') for column in columns if column.startswith('product__')}
+        if product_columns:
+            columns = {column for column in columns if not column.startswith('product__')}
+            items, joined = shards.related(items, 'product', product_columns)
+            columns.update(joined)
+        items = items.only(*columns)
+    else:
+        items = items.none()
+    cart_items = [item async for item in items.aiterator()]
+
+    unit_prices, pricing, shipping_data = [None] * len(cart_items), None, None
+    if needs_pricing:
+        # Unit prices are converted in one batch, then discounts are applied in one pass
+        unit_prices = fx.convert_many(((item.price or 0, item.currency) for item in cart_items), currency)
+        pricing = await promotions.aprice_cart(
+            [
+                (item.product_id, item.product.category_id, unit_price, item.quantity)
+                for item, unit_price in zip(cart_items, unit_prices)
+            ],
+            currency,
+        )
+    if needs_shipping:
+        # Weights come from the products already loaded with the items
+        quote = await shipping.aquote(
+            ((item.product_id, item.quantity) for item in cart_items),
+            zone,
+            {item.product_id: item.product for item in cart_items},
+        )
+        shipping_data = _shipping_data(quote, currency)
+    lines = pricing.lines if pricing else [None] * len(cart_items)
+
+    data = selection.render({
+        'cart_id': lambda: cart.id,
+        'total_items': lambda: sum(item.quantity for item in cart_items),
+        'subtotal': lambda: str(pricing.subtotal),
+        'discount': lambda: str(pricing.discount),
+        'cart_promotion': lambda: pricing.cart_promotion,
+        'total_price': lambda: str(pricing.total),
+        'shipping': lambda: shipping_data,
+        'grand_total': lambda: str(pricing.total + Decimal(shipping_data['price'])),
+        'currency': lambda: currency,
+        'is_empty': lambda: not cart_items,
+        'items': lambda: [
+            item_selection.render(CART_ITEM_FIELDS, item, unit_price, line, currency)
+            for item, unit_price, line in zip(cart_items, unit_prices, lines)
+        ],
+        'recommended_product_ids': lambda: [
+            product_id for product_id, _ in recommendations.get_recommendations().for_cart(
+                [item.product_id for item in cart_items], recommendations.CART_LIMIT,
+            )
+        ],
+    })
+    
+    return JsonResponse(data)
 
 @csrf_exempt
 @require_POST
@@ -204,10 +441,13 @@ def add_to_cart(request):
     except Product.DoesNotExist:
         return JsonResponse({'error': 'Product not found'}, status=404)
 
-    with transaction.atomic():
-        cart, _ = Cart.objects.get_or_create(user=request.user, is_active=True)
+    db = shards.for_user(request.user.pk)
+    with shards.atomic(db):
+        # The cart row lock serializes adds to one cart (no lost quantity updates) and
+        # orders them against checkout, which deactivates the cart under the same lock
+        cart, _ = Cart.objects.using(db).select_for_update().get_or_create(user=request.user, is_active=True)
         
-        cart_item, created = CartItem.objects.get_or_create(
+        cart_item, created = CartItem.objects.using(db).get_or_create(
             cart=cart,
             product=product
         )
@@ -222,6 +462,8 @@ def add_to_cart(request):
 
         cart_item.quantity = final_quantity
         cart_item.save()
+        # Cached cart/order responses of this user are stale now
+        invalidate_user(request.user.id)
 
     return JsonResponse({
         'message': f'{product.name} added to cart successfully',
@@ -243,7 +485,8 @@ def delete_cart_item(request, item_id):
 
     try:
         # Get the cart item and ensure it belongs to the current user
-        cart_item = CartItem.objects.select_related('cart', 'product').get(
+        items, _ = shards.related(CartItem.objects.using(shards.for_user(request.user.pk)).select_related('cart'), 'product')
+        cart_item = items.get(
             id=item_id,
             cart__user=request.user,
             cart__is_active=True
@@ -257,6 +500,7 @@ def delete_cart_item(request, item_id):
     
     # Delete the cart item
     cart_item.delete()
+    invalidate_user(request.user.id)
     
     # Get updated cart info
     cart = cart_item.cart
@@ -267,147 +511,516 @@ def delete_cart_item(request, item_id):
         'cart_total_price': str(cart.get_total_price()),
     })
 
+def _convert_shipping(quote, currency):
+    return fx.convert_many([(quote.price, shipping.get_rates().currency)], currency)[0]
+
+def _shipping_data(quote, currency):
+    return {
+        'zone': quote.zone,
+        'actual_weight_kg': str(quote.actual_weight_kg),
+        'dimensional_weight_kg': str(quote.dimensional_weight_kg),
+        'billable_weight_kg': str(quote.billable_weight_kg),
+        'price': str(_convert_shipping(quote, currency)),
+        'currency': currency,
+    }
+
+
+def _not_string(data, *names):
+    """The first of ``names`` set in the JSON object ``data`` to something other than a string, or None."""
+    return next((name for name in names if data.get(name) is not None and not isinstance(data[name], str)), None)
+
+
+@csrf_exempt
+@require_POST
+def shipping_quote(request):
+    """
+    API view to quote shipping for a list of items, with or without a cart.
+    Body: {"items": [{"product_id": 1, "quantity": 2}], "zone": "DOMESTIC", "currency": "EUR"}
+    """
+    try:
+        data = json.loads(request.body or '{}')
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON data'}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({'error': 'Body must be a JSON object'}, status=400)
+    try:
+        items = [(int(item['product_id']), int(item.get('quantity', 1))) for item in data.get('items') or []]
+    except (KeyError, TypeError, ValueError):
+        return JsonResponse({'error': 'items must be a list of {product_id, quantity}'}, status=400)
+    if not items or any(quantity < 1 for _, quantity in items):
+        return JsonResponse({'error': 'items must be a non-empty list with positive quantities'}, status=400)
+    wrong = _not_string(data, 'currency', 'zone')
+    if wrong:
+        return JsonResponse({'error': f'{wrong} must be a string'}, status=400)
+    try:
+        currency = fx.normalize_currency(data.get('currency') or fx.BASE_CURRENCY)
+        zone = shipping.normalize_zone(data.get('zone'))
+    except fx.UnsupportedCurrency:
+        return JsonResponse({'error': f"Unsupported currency: {data.get('currency')}"}, status=400)
+    except shipping.UnknownZone:
+        return JsonResponse({'error': f"Unknown shipping zone: {data.get('zone')}"}, status=400)
+
+    try:
+        quote = shipping.quote(items, zone)
+    except Product.DoesNotExist as exc:
+        return JsonResponse({'error': str(exc)}, status=404)
+    return JsonResponse(_shipping_data(quote, currency))
+
+
 @csrf_exempt
 @require_POST
 def checkout(request):
     """
     API view to perform checkout (COD only).
     - Creates an Order and OrderItems from the user's cart.
+    - Takes the ordered quantities out of stock (400 if any product is short).
     - Deletes CartItems after successful order creation.
     - Returns the new Order details.
     """
     if not request.user.is_authenticated:
         return JsonResponse({'error': 'Authentication required'}, status=401)
 
+    db = shards.for_user(request.user.pk)
     try:
-        cart = Cart.objects.get(user=request.user, is_active=True)
-        cart_items = CartItem.objects.filter(cart=cart).select_related('product')
-        if not cart_items.exists():
-            return JsonResponse({'error': 'Cart is empty'}, status=400)
+        cart = Cart.objects.using(db).get(user=request.user, is_active=True)
     except Cart.DoesNotExist:
         return JsonResponse({'error': 'No active cart found'}, status=400)
+    # Fetched once; totals and order items are built from this list
+    cart_items = list(shards.related(CartItem.objects.using(db).filter(cart=cart), 'product')[0])
+    if not cart_items:
+        return JsonResponse({'error': 'Cart is empty'}, status=400)
 
     # For now, only support COD
-    data = json.loads(request.body or '{}')
+    try:
+        data = json.loads(request.body or '{}')
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON data'}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({'error': 'Body must be a JSON object'}, status=400)
+    wrong = _not_string(data, 'currency', 'shipping_zone')
+    if wrong:
+        return JsonResponse({'error': f'{wrong} must be a string'}, status=400)
     shipping_address = data.get('shipping_address', '')
     billing_address = data.get('billing_address', shipping_address)
     cod = data.get('cod', True)
+    try:
+        currency = fx.normalize_currency(data.get('currency') or fx.BASE_CURRENCY)
+    except fx.UnsupportedCurrency:
+        return JsonResponse({'error': f"Unsupported currency: {data.get('currency')}"}, status=400)
+    try:
+        zone = shipping.normalize_zone(data.get('shipping_zone'))
+    except shipping.UnknownZone:
+        return JsonResponse({'error': f"Unknown shipping zone: {data.get('shipping_zone')}"}, status=400)
 
-    with transaction.atomic():
-        # Create the order
-        order = Order.objects.create(
-            user=request.user,
-            total_price=cart.get_total_price(),
-            currency='USD',
-            shipping_address=shipping_address,
-            billing_address=billing_address,
-            cod=cod,
-            status='PENDING',
-        )
-        # Create order items and delete cart items
-        for cart_item in cart_items:
-            OrderItem.objects.create(
-                order=order,
-                product=cart_item.product,
-                quantity=cart_item.quantity,
-                price=cart_item.price,
-                currency=cart_item.currency,
+    # The order is placed in the requested currency; prices are converted in one batch
+    # and discounted in one pass
+    unit_prices = fx.convert_many(((item.price or 0, item.currency) for item in cart_items), currency)
+    pricing = promotions.price_cart(
+        [
+            (item.product_id, item.product.category_id, unit_price, item.quantity)
+            for item, unit_price in zip(cart_items, unit_prices)
+        ],
+        currency,
+    )
+    quote = shipping.quote(
+        ((item.product_id, item.quantity) for item in cart_items),
+        zone,
+        {item.product_id: item.product for item in cart_items},
+    )
+    shipping_price = _convert_shipping(quote, currency)
+
+    try:
+        with shards.atomic(db):
+            # Claim the cart before anything else: a concurrent checkout of it finds nothing
+            # to claim, and a line added since it was read makes the prices stale
+            if not Cart.objects.using(db).filter(pk=cart.pk, is_active=True).update(is_active=False, updated_at=timezone.now()):
+                return JsonResponse({'error': 'Cart was already checked out'}, status=409)
+            lines = set(CartItem.objects.using(db).filter(cart=cart).order_by().values_list('pk', 'quantity'))
+            if lines != {(item.pk, item.quantity) for item in cart_items}:
+                shards.set_rollback(db)
+                return JsonResponse({'error': 'Cart changed during checkout, please retry'}, status=409)
+            # Create the order
+            order = Order.objects.using(db).create(
+                user=request.user,
+                total_price=pricing.total + shipping_price,
+                discount_total=pricing.discount,
+                shipping_price=shipping_price,
+                shipping_zone=zone,
+                currency=currency,
+                shipping_address=shipping_address,
+                billing_address=billing_address,
+                cod=cod,
+                status='PENDING',
             )
-            cart_item.delete()
-        # Optionally, mark cart as inactive
-        cart.is_active = False
-        cart.save()
+            # One conditional UPDATE for all lines; raises (rolling the order back) if any is short
+            inventory.take_stock(order, ((item.product_id, item.quantity) for item in cart_items))
+            # Create order items and delete cart items in bulk
+            OrderItem.objects.using(db).bulk_create([
+                OrderItem(
+                    order=order,
+                    product=cart_item.product,
+                    quantity=cart_item.quantity,
+                    price=unit_price,
+                    discount=line.discount,
+                    currency=currency,
+                )
+                for cart_item, unit_price, line in zip(cart_items, unit_prices, pricing.lines)
+            ])
+            CartItem.objects.using(db).filter(cart=cart).delete()
+            # Order items were bulk-created and the cart updated without signals
+            invalidate_user(request.user.id)
+    except inventory.InsufficientStock as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
 
     return JsonResponse({
         'message': 'Order placed successfully',
         'order_id': order.order_id,
         'order_status': order.status,
         'total_price': str(order.total_price),
+        'discount': str(order.discount_total),
+        'shipping_price': str(order.shipping_price),
+        'shipping_zone': order.shipping_zone,
+        'currency': order.currency,
         'cod': order.cod,
     })
 
+def _timestamp(value):
+    return timezone.localtime(value).strftime("%B %d, %Y, %I:%M %p")
+
+# Key -> formatter(order) for list_orders
+ORDER_SUMMARY_FIELDS = {
+    'order_id': lambda order: order.order_id,
+    'status': lambda order: order.status,
+    'total_price': lambda order: str(order.total_price),
+    'currency': lambda order: order.currency,
+    'cod': lambda order: order.cod,
+    'created_at': lambda order: _timestamp(order.created_at),
+    'total_items': lambda order: order.total_items or 0,
+}
+# Key -> formatter(order) for order_detail; 'items' is rendered separately
+ORDER_FIELDS = {
+    'order_id': lambda order: order.order_id,
+    'status': lambda order: order.status,
+    'total_price': lambda order: str(order.total_price),
+    'discount': lambda order: str(order.discount_total),
+    'shipping_price': lambda order: str(order.shipping_price),
+    'shipping_zone': lambda order: order.shipping_zone,
+    'currency': lambda order: order.currency,
+    'cod': lambda order: order.cod,
+    'created_at': lambda order: _timestamp(order.created_at),
+    'shipping_address': lambda order: order.shipping_address,
+    'billing_address': lambda order: order.billing_address,
+}
+ORDER_COLUMNS = {
+    'order_id': ('order_id',),
+    'status': ('status',),
+    'total_price': ('total_price',),
+    'discount': ('discount_total',),
+    'shipping_price': ('shipping_price',),
+    'shipping_zone': ('shipping_zone',),
+    'currency': ('currency',),
+    'cod': ('cod',),
+    'created_at': ('created_at',),
+    'shipping_address': ('shipping_address',),
+    'billing_address': ('billing_address',),
+}
+ORDER_ITEM_FIELDS = {
+    'product_id': lambda item: item.product_id,
+    'product_name': lambda item: item.product.name,
+    'quantity': lambda item: item.quantity,
+    'price': lambda item: str(item.price),
+    'discount': lambda item: str(item.discount),
+    'currency': lambda item: item.currency,
+    'total_price': lambda item: str(item.get_total_price()),
+}
+ORDER_ITEM_COLUMNS = {
+    'product_id': ('product',),
+    'product_name': ('product__name',),
+    'quantity': ('quantity',),
+    'price': ('price',),
+    'discount': ('discount',),
+    'currency': ('currency',),
+    'total_price': ('price', 'quantity', 'discount'),
+}
+
 @csrf_exempt
-def list_orders(request):
+@cache_per_user()
+async def list_orders(request):
     """
     API view to list all orders for the authenticated user, summary only (no order items, no addresses).
+    Item counts are aggregated in the same query rather than once per order.
+    Optional ?fields=order_id,status loads and returns only those fields.
     """
-    if not request.user.is_authenticated:
+    user = await request.auser()
+    if not user.is_authenticated:
         return JsonResponse({'error': 'Authentication required'}, status=401)
+    try:
+        selection = fields.parse(request, ORDER_SUMMARY_FIELDS)
+    except fields.InvalidFields as exc:
+        return JsonResponse({'error': f'Unknown field: {exc}'}, status=400)
 
-    orders = Order.objects.filter(user=request.user).order_by('-created_at')
+    orders = Order.objects.using(shards.for_user(user.pk)).filter(user=user).order_by('-created_at')
+    if 'total_items' in selection:
+        orders = orders.annotate(total_items=Sum('items__quantity'))
+    if not selection.everything:
+        orders = orders.only('id', *selection.columns(ORDER_COLUMNS))
     data = {
-        'orders': [
-            {
-                'order_id': order.order_id,
-                'status': order.status,
-                'total_price': str(order.total_price),
-                'currency': order.currency,
-                'cod': order.cod,
-                'created_at': timezone.localtime(order.created_at).strftime("%B %d, %Y, %I:%M %p"),
-                'total_items': order.get_total_quantity(),
-            }
-            for order in orders
-        ]
+        'orders': [selection.render(ORDER_SUMMARY_FIELDS, order) async for order in orders.aiterator()]
     }
     return JsonResponse(data)
 
 @csrf_exempt
-def order_detail(request, order_id):
+@cache_per_user(CATALOG)
+async def order_detail(request, order_id):
     """
     API view to get details of a specific order for the authenticated user.
+    Optional ?fields=status,items.product_id loads and returns only those fields.
     """
-    if not request.user.is_authenticated:
+    user = await request.auser()
+    if not user.is_authenticated:
         return JsonResponse({'error': 'Authentication required'}, status=401)
+    try:
+        selection = fields.parse(request, ORDER_FIELDS, {'items': ORDER_ITEM_FIELDS})
+    except fields.InvalidFields as exc:
+        return JsonResponse({'error': f'Unknown field: {exc}'}, status=400)
 
+    db = shards.for_user(user.pk)
+    orders = Order.objects.using(db)
+    item_selection = selection.child('items')
+    if selection.everything:
+        orders = orders.prefetch_related('items__product')
+    else:
+        orders = orders.only('id', *selection.columns(ORDER_COLUMNS))
+        if 'items' in selection:
+            columns = ['order', *item_selection.columns(ORDER_ITEM_COLUMNS)]
+            items = OrderItem.objects.using(db)
+            if 'product_name' in item_selection:
+                columns.remove('product__name')
+                items, joined = shards.related(items, 'product', ['name'])
+                columns += joined
+            items = items.only(*columns)
+            orders = orders.prefetch_related(Prefetch('items', queryset=items))
     try:
-        order = Order.objects.prefetch_related('items__product').get(user=request.user, order_id=order_id)
+        order = await orders.aget(user=user, order_id=order_id)
     except Order.DoesNotExist:
         return JsonResponse({'error': 'Order not found'}, status=404)
 
-    data = {
-        'order_id': order.order_id,
-        'status': order.status,
-        'total_price': str(order.total_price),
-        'currency': order.currency,
-        'cod': order.cod,
-        'created_at': timezone.localtime(order.created_at).strftime("%B %d, %Y, %I:%M %p"),
-        'shipping_address': order.shipping_address,
-        'billing_address': order.billing_address,
-        'items': [
-            {
-                'product_id': item.product.id,
-                'product_name': item.product.name,
-                'quantity': item.quantity,
-                'price': str(item.price),
-                'currency': item.currency,
-                'total_price': str(item.get_total_price()),
-            }
+    data = selection.render(ORDER_FIELDS, order)
+    if 'items' in selection:
+        data['items'] = [
+            item_selection.render(ORDER_ITEM_FIELDS, item)
+            # Served from the prefetch cache, so no query runs here
             for item in order.items.all()
         ]
-    }
     return JsonResponse(data)
 
 @csrf_exempt
 def cancel_order(request, order_id):
     """
     API view to cancel an order for the authenticated user.
-    Only allows cancellation if order is in PENDING or ACCEPTED status.
+    Only allows cancellation if order is in PENDING or ACCEPTED status; the items go back to stock.
     Accepts POST or DELETE methods.
     """
     if request.method not in ["POST", "DELETE"]:
         return JsonResponse({"error": "Method not allowed"}, status=405)
     if not request.user.is_authenticated:
         return JsonResponse({"error": "Authentication required"}, status=401)
+    db = shards.for_user(request.user.pk)
     try:
-        order = Order.objects.get(user=request.user, order_id=order_id)
+        order = Order.objects.using(db).get(user=request.user, order_id=order_id)
     except Order.DoesNotExist:
         return JsonResponse({"error": "Order not found"}, status=404)
     if order.status not in ["PENDING", "ACCEPTED"]:
         return JsonResponse({"error": f"Order cannot be cancelled in its current status: {order.status}"}, status=400)
-    order.status = "CANCELLED"
-    order.save()
+    with shards.atomic(db):
+        # Conditional, so two concurrent cancellations cannot both restock
+        cancelled = Order.objects.using(db).filter(pk=order.pk, status__in=["PENDING", "ACCEPTED"]).update(
+            status="CANCELLED", updated_at=timezone.now(),
+        )
+        if not cancelled:
+            return JsonResponse({"error": "Order cannot be cancelled in its current status"}, status=400)
+        previous_status, order.status = order.status, "CANCELLED"
+        changes.record('order', [order.order_id], 'update', user_id=order.user_id)
+        outbox.record('order.status_changed', order, previous_status=previous_status)
+        inventory.restock(order)
+    invalidate_user(request.user.id)
     return JsonResponse({
         "message": f"Order {order.order_id} cancelled successfully.",
         "order_id": order.order_id,
         "status": order.status
     })
+
+def _change_data(entry):
+    return {
+        'seq': entry.id,
+        'model': entry.model,
+        # Orders are addressed by order_id in the API, everything else by pk
+        'id': entry.object_id if entry.model == 'order' else int(entry.object_id),
+        'action': entry.action,
+        'at': entry.created_at.isoformat(),
+    }
+
+def list_changes(request):
+    """
+    API view to get the inserts, updates and deletes of products, categories and
+    orders after a cursor: /api/changes/?since=<cursor>&limit=500&models=product,order
+    Without ?since, returns the current cursor: read it, download in full, then poll with it.
+    Staff see every order; other users only their own. 410 means the cursor is
+    older than the retained log and the client must resync in full.
+    """
+    entries = changes.visible_to(request.user)
+    models = request.GET.get('models')
+    if models:
+        models = models.split(',')
+        unknown = set(models) - {name for name, _ in ChangeLogEntry.MODEL_CHOICES}
+        if unknown:
+            return JsonResponse({'error': f"Unknown models: {', '.join(sorted(unknown))}"}, status=400)
+        entries = entries.filter(model__in=models)
+    if 'since' not in request.GET:
+        return JsonResponse({'changes': [], 'cursor': changes.latest(), 'has_more': False})
+    try:
+        since = int(request.GET['since'])
+        limit = int(request.GET.get('limit', settings.CHANGE_FEED_PAGE_SIZE))
+    except ValueError:
+        return JsonResponse({'error': 'since and limit must be integers'}, status=400)
+    if since < 0 or not 1 <= limit <= settings.CHANGE_FEED_PAGE_MAX:
+        return JsonResponse({'error': f'since must be >= 0 and limit between 1 and {settings.CHANGE_FEED_PAGE_MAX}'}, status=400)
+
+    try:
+        rows, cursor, has_more = changes.page(entries, since, limit)
+    except changes.ExpiredCursor:
+        return JsonResponse({'error': 'Cursor expired, resync in full', 'cursor': changes.latest()}, status=410)
+    return JsonResponse({
+        'changes': [_change_data(entry) for entry in rows],
+        'cursor': cursor,
+        'has_more': has_more,
+    })
+
+def _order_export_filters(request, prefix=''):
+    """
+    Build ORM filters for the export endpoints from the query string:
+    status (comma separated), user (username), currency, created_after/created_before (YYYY-MM-DD).
+    ``prefix`` points the filters at the order from a related model, e.g. 'order__'.
+    Raises ValueError for malformed dates.
+    """
+    filters = {}
+    if request.GET.get('status'):
+        filters[f'{prefix}status__in'] = request.GET['status'].split(',')
+    if request.GET.get('user'):
+        if shards.enabled():
+            # Users live on default only: no JOIN from a shard
+            user_id = User.objects.filter(username=request.GET['user']).values_list('pk', flat=True).first()
+            filters[f'{prefix}user_id'] = user_id or 0
+        else:
+            filters[f'{prefix}user__username'] = request.GET['user']
+    if request.GET.get('currency'):
+        filters[f'{prefix}currency'] = request.GET['currency']
+    for param, lookup in [('created_after', 'gte'), ('created_before', 'lt')]:
+        if request.GET.get(param):
+            day = parse_date(request.GET[param])
+            if day is None:
+                raise ValueError(param)
+            filters[f'{prefix}created_at__{lookup}'] = timezone.make_aware(datetime.combine(day, time.min))
+    return filters
+
+def _staff_required(request):
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Staff access required'}, status=403)
+    return None
+
+def export_orders(request):
+    """
+    API view streaming the filtered orders as CSV (staff only).
+    """
+    denied = _staff_required(request)
+    if denied:
+        return denied
+    try:
+        filters = _order_export_filters(request)
+    except ValueError as exc:
+        return JsonResponse({'error': f'Invalid date for {exc}, expected YYYY-MM-DD'}, status=400)
+    orders = [
+        Order.objects.using(alias).filter(**filters).order_by('created_at', 'id') for alias in settings.ORDER_SHARDS
+    ]
+    return exports.csv_response(
+        exports.export_orders(*orders, key=lambda order: (order.created_at, order.id)), 'orders.csv',
+    )
+
+def export_order_items(request):
+    """
+    API view streaming the items of the filtered orders as CSV (staff only).
+    """
+    denied = _staff_required(request)
+    if denied:
+        return denied
+    try:
+        filters = _order_export_filters(request, prefix='order__')
+    except ValueError as exc:
+        return JsonResponse({'error': f'Invalid date for {exc}, expected YYYY-MM-DD'}, status=400)
+    items = [
+        OrderItem.objects.using(alias).filter(**filters).order_by('order_id', 'id') for alias in settings.ORDER_SHARDS
+    ]
+    return exports.csv_response(
+        exports.export_order_items(*items, key=lambda item: (item.order_id, item.id)), 'order-items.csv',
+    )
+
+@csrf_exempt
+def picklist(request):
+    """
+    API view for warehouse pick lists (staff only), streamed as JSON or, with ?format=csv, as CSV.
+    POST packs a wave: the oldest orders in 'status' (default PENDING and ACCEPTED), created before
+    'created_before' (YYYY-MM-DD) and at most 'limit' of them, move to PACKED, and their items are
+    summed per product. GET ?id=<pick list id> prints an existing pick list again.
+    """
+    denied = _staff_required(request)
+    if denied:
+        return denied
+    output = request.GET.get('format', 'json')
+    if output not in ('json', 'csv'):
+        return JsonResponse({'error': 'format must be json or csv'}, status=400)
+
+    if request.method == 'GET':
+        try:
+            pick_list = PickList.objects.get(pk=int(request.GET.get('id', '')))
+        except (ValueError, PickList.DoesNotExist):
+            return JsonResponse({'error': 'Pick list not found'}, status=404)
+    elif request.method == 'POST':
+        try:
+            data = json.loads(request.body or b'{}')
+            statuses = data.get('status', picking.WAITING)
+            limit = int(data.get('limit', settings.PICKLIST_MAX_ORDERS))
+            created_before = data.get('created_before')
+        except (json.JSONDecodeError, AttributeError, TypeError, ValueError):
+            return JsonResponse({'error': 'Invalid or missing JSON data'}, status=400)
+        if not isinstance(statuses, (list, tuple)) or not statuses or any(status not in picking.WAITING for status in statuses):
+            return JsonResponse({'error': f'status must be a list of {", ".join(picking.WAITING)}'}, status=400)
+        if not 1 <= limit <= settings.PICKLIST_MAX_ORDERS:
+            return JsonResponse({'error': f'limit must be between 1 and {settings.PICKLIST_MAX_ORDERS}'}, status=400)
+        if created_before is not None:
+            day = parse_date(created_before) if isinstance(created_before, str) else None
+            if day is None:
+                return JsonResponse({'error': 'Invalid date for created_before, expected YYYY-MM-DD'}, status=400)
+            created_before = timezone.make_aware(datetime.combine(day, time.min))
+        pick_list = picking.create(statuses, limit, created_before, user=request.user)
+        if pick_list is None:
+            return JsonResponse({'error': 'No orders waiting to be packed'}, status=404)
+    else:
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+    if output == 'csv':
+        return exports.csv_response(picking.iter_csv(pick_list), f'pick-list-{pick_list.pk}.csv')
+    return StreamingHttpResponse(picking.iter_json(pick_list), content_type='application/json')
+
+def metrics(request):
+    """
+    API view exposing this worker's request histograms in Prometheus text format
+    (staff, or a scraper sending ``Authorization: Bearer <METRICS_TOKEN>``).
+    """
+    token = settings.METRICS_TOKEN
+    if not (token and hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}')):
+        denied = _staff_required(request)
+        if denied:
+            return denied
+    return HttpResponse(store_metrics.registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
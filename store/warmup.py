@@ -0,0 +1,89 @@
+"""
+Worker warmup used by the gunicorn deployment profile (see gunicorn.conf.py).
+
+Everything a cold worker would otherwise do lazily on its first requests is done
+up front: import the app modules, compile the URL resolver, open the database
+connections and push a few requests through the full middleware stack so that
+query plans and caches are primed before the worker accepts traffic.
+"""
+import logging
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.db import connections
+from django.test import Client
+from django.urls import get_resolver, reverse
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Modules that are otherwise imported on the first request that needs them
+WARMUP_IMPORTS = [
+    'store.views',
+    'store.admin',
+    'django.contrib.admin.views.main',
+    'django.contrib.auth.views',
+]
+
+
+def import_modules():
+    for module in WARMUP_IMPORTS:
+        import_module(module)
+
+
+def resolve_urls():
+    """Compile every URL pattern and build the reverse lookup tables."""
+    resolver = get_resolver()
+    resolver.url_patterns
+    resolver.reverse_dict
+    # A reverse() exercises the populated tables end to end
+    reverse('product-list')
+
+
+def open_connections():
+    for conn in connections.all():
+        conn.ensure_connection()
+
+
+def prime_paths(paths):
+    """
+    Request each path through the full middleware stack, outside the request
+    histograms; returns {path: status}.
+    """
+    host = next((h.lstrip('.') for h in settings.ALLOWED_HOSTS if h != '*'), 'localhost')
+    client = Client(HTTP_HOST=host)
+    statuses = {}
+    with metrics.not_recorded():
+        for path in paths:
+            try:
+                statuses[path] = client.get(path).status_code
+            except Exception:
+                # Warmup is best-effort: a failing path must not keep the worker from booting
+                logger.exception('Warmup request to %s failed', path)
+                statuses[path] = None
+    return statuses
+
+
+def warm_up(connect=True, prime=True):
+    """
+    Run the warmup steps and return their timings in milliseconds.
+    ``connect``/``prime`` are skipped in the gunicorn master, which must not hold
+    database connections that would be shared with forked workers.
+    """
+    timings = {}
+
+    def timed(name, func, *args):
+        started = time.perf_counter()
+        result = func(*args)
+        timings[f'{name}_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+
+    timed('imports', import_modules)
+    timed('urls', resolve_urls)
+    if connect:
+        timed('db', open_connections)
+    if prime:
+        timings['paths'] = timed('prime', prime_paths, getattr(settings, 'WARMUP_PATHS', []))
+    return timings
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+from datetime import datetime, timezone
 from pathlib import Path
 
 import dj_database_url
@@ -45,8 +46,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the whole stack (see store/middleware.py)
+    'store.middleware.PerformanceMiddleware',
+    'store.middleware.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    # WhiteNoise, plus catalog snapshots built after startup
+    'store.middleware.StaticFilesMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -81,10 +86,70 @@ WSGI_APPLICATION = 'vibe_ecommerce.wsgi.application'
 
 DATABASES = {
     'default': dj_database_url.config(
-        default=os.environ.get('DATABASE_URL')
+        default=os.environ.get('DATABASE_URL'),
+        # Keep connections open across requests so warmed workers reuse them.
+        # Set CONN_MAX_AGE=0 when serving through ASGI.
+        conn_max_age=int(os.environ.get('CONN_MAX_AGE', '600')),
+        conn_health_checks=True,
     )
 }
 
+# Order shards (store/shards.py): carts and orders of a user live on
+# ORDER_SHARDS[user_id % len(ORDER_SHARDS)]. ORDER_SHARD_URLS, comma-separated
+# database URLs, adds the aliases orders_1..N after default; their tables are
+# created with `manage.py migrate --database orders_N`.
+for number, url in enumerate(filter(None, os.environ.get('ORDER_SHARD_URLS', '').split(',')), start=1):
+    DATABASES[f'orders_{number}'] = dj_database_url.parse(
+        url.strip(),
+        conn_max_age=int(os.environ.get('CONN_MAX_AGE', '600')),
+        conn_health_checks=True,
+    )
+ORDER_SHARDS = [alias for alias in DATABASES if alias == 'default' or alias.startswith('orders_')]
+DATABASE_ROUTERS = ['store.shards.OrderShardRouter']
+
+# SQLite profile (store/sqlite.py): WAL, relaxed fsync, lock waits and BEGIN IMMEDIATE,
+# applied to every connection when DATABASE_URL is a sqlite:// URL. SQLITE_PROFILE=default
+# keeps SQLite's own settings, for comparison (see the bench_sqlite command).
+SQLITE_TUNED = (
+    DATABASES['default'].get('ENGINE') == 'django.db.backends.sqlite3'
+    and os.environ.get('SQLITE_PROFILE', 'tuned') == 'tuned'
+)
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    # Milliseconds a writer waits for the lock before "database is locked"
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', '5000')),
+    # Negative: KiB, so 64 MiB of page cache per connection
+    'cache_size': -64_000,
+    'mmap_size': 256 * 1024 * 1024,
+}
+SQLITE_TRANSACTION_MODE = 'IMMEDIATE'
+
+# Shared cache. The version counters in store/cache.py must be visible to every
+# worker, so production sets REDIS_URL (needs the redis package). CACHE_DIR shares a
+# directory between the processes of one host instead; the local-memory fallback is
+# only correct for a single process, and gunicorn.conf.py refuses more workers on it.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+elif os.environ.get('CACHE_DIR'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'store.cache.SharedFileCache',
+            'LOCATION': os.environ['CACHE_DIR'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -131,3 +196,101 @@ SESSION_COOKIE_SECURE = True
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Paths requested by each gunicorn worker before it accepts traffic (see gunicorn.conf.py).
+# Keep them bounded: they run on every boot and every max_requests recycle.
+WARMUP_PATHS = ['/api/products/?limit=20']
+
+# /api/metrics/ is for staff, or for a scraper sending "Authorization: Bearer <token>"
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# Admin changelists on tables at least this large use the database's row
+# estimate instead of COUNT(*) (see store/paginators.py)
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(os.environ.get('ADMIN_ESTIMATED_COUNT_THRESHOLD', '100000'))
+
+# Currency conversion (see store/fx.py). Rates are read from a local file and
+# re-checked for a new version at most every FX_RATES_CHECK_INTERVAL seconds.
+FX_RATES_FILE = os.environ.get('FX_RATES_FILE', str(BASE_DIR / 'store' / 'data' / 'fx_rates.json'))
+FX_RATES_CHECK_INTERVAL = float(os.environ.get('FX_RATES_CHECK_INTERVAL', '5'))
+CURRENCY_ROUNDING = {
+    'default': {'places': 2},
+    'JPY': {'places': 0},
+    # Cash rounding to the nearest 5 centimes
+    'CHF': {'places': 2, 'increment': '0.05'},
+}
+
+# Shipping quotes (see store/shipping.py)
+SHIPPING_RATES_FILE = os.environ.get('SHIPPING_RATES_FILE', str(BASE_DIR / 'store' / 'data' / 'shipping_rates.json'))
+SHIPPING_RATES_CHECK_INTERVAL = float(os.environ.get('SHIPPING_RATES_CHECK_INTERVAL', '5'))
+SHIPPING_DEFAULT_ZONE = 'DOMESTIC'
+SHIPPING_QUOTE_TIMEOUT = 3600
+
+# API response compression (see store/middleware.py and store/compression.py)
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+COMPRESSION_CACHE_TIMEOUT = 3600
+
+# Per-user cache of cart and order responses (see store/cache.py); entries are
+# invalidated by version bumps, the timeout only bounds memory
+USER_RESPONSE_CACHE_TIMEOUT = 600
+
+# Per-product cache behind products/<id>/ and products/batch/ (see store/catalog.py)
+PRODUCT_CACHE_TIMEOUT = 300
+PRODUCT_BATCH_MAX = 100
+
+# "Frequently bought together" file written by build_recommendations and memory-mapped
+# by every worker; re-checked for a new build at most every RECOMMENDATIONS_CHECK_INTERVAL seconds
+RECOMMENDATIONS_FILE = os.environ.get('RECOMMENDATIONS_FILE', str(BASE_DIR / 'store' / 'data' / 'recommendations.bin'))
+RECOMMENDATIONS_CHECK_INTERVAL = float(os.environ.get('RECOMMENDATIONS_CHECK_INTERVAL', '30'))
+RECOMMENDATIONS_TOP_K = 20
+RECOMMENDATIONS_MAX_BASKET = 50
+
+# Product rankings (see store/rankings.py); changing either needs the stored scores rescaled
+TRENDING_HALF_LIFE_DAYS = 7
+TRENDING_EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+# products/ pages when ?limit= is not given, and the largest ?limit= accepted
+PRODUCT_PAGE_SIZE = 50
+PRODUCT_PAGE_MAX = 200
+
+# Change feed (see store/changes.py and the compact_changes command)
+CHANGE_FEED_PAGE_SIZE = 500
+CHANGE_FEED_PAGE_MAX = 1000
+# Entries younger than this are held back, in case an older one is not committed yet
+CHANGE_FEED_LAG = 2
+CHANGE_LOG_RETENTION_DAYS = int(os.environ.get('CHANGE_LOG_RETENTION_DAYS', '30'))
+
+# Static catalog snapshots (see store/snapshots.py and the build_catalog_snapshot command),
+# written under STATIC_ROOT; the pointer to the current one lives outside it
+CATALOG_SNAPSHOT_DIR = 'catalog'
+CATALOG_SNAPSHOT_POINTER = os.environ.get(
+    'CATALOG_SNAPSHOT_POINTER', str(BASE_DIR / 'store' / 'data' / 'catalog-snapshot.json'),
+)
+CATALOG_SNAPSHOT_CHECK_INTERVAL = float(os.environ.get('CATALOG_SNAPSHOT_CHECK_INTERVAL', '10'))
+CATALOG_SNAPSHOT_PAGE_SIZE = 1000
+# Rebuild once the catalog has been quiet this long, or at the latest this long after the first change
+CATALOG_SNAPSHOT_DEBOUNCE = 30
+CATALOG_SNAPSHOT_MAX_DELAY = 300
+# Manifests whose files are kept, for clients still downloading an older one
+CATALOG_SNAPSHOT_KEEP = 3
+
+# Order webhooks (see store/outbox.py and the dispatch_webhooks command)
+WEBHOOK_MAX_CONNECTIONS = 50
+WEBHOOK_TIMEOUT = 10.0
+WEBHOOK_CLAIM_SIZE = 2000
+WEBHOOK_BATCH_SIZE = 100
+# Concurrent request streams per subscriber; events of one order always share a lane
+WEBHOOK_LANES_PER_SUBSCRIPTION = 4
+WEBHOOK_MAX_ATTEMPTS = 12
+WEBHOOK_BACKOFF_BASE = 5
+WEBHOOK_BACKOFF_MAX = 3600
+# Outbox events younger than this are fanned out on the next round (see CHANGE_FEED_LAG)
+WEBHOOK_OUTBOX_LAG = 2
+
+# Warehouse pick lists (see store/picking.py): orders packed per wave at most. Their ids are
+# bound parameters of one UPDATE, so stay well below SQLite's limit of 32766
+PICKLIST_MAX_ORDERS = 20000
+
+# Stock ledger jobs (see store/inventory.py and the process_inventory command)
+LOW_STOCK_THRESHOLD = int(os.environ.get('LOW_STOCK_THRESHOLD', '5'))
+# Movements younger than this are left for the next run, so a slow transaction's
+# movements are not skipped when it commits after a newer one
+INVENTORY_CURSOR_LAG = 5